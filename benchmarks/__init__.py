@@ -0,0 +1,3 @@
+"""
+pyrpc_core benchmarks, run each module with python -m benchmarks.<module>
+"""
@@ -0,0 +1,150 @@
+"""
+End to end load generator: ConsumerBootstrap against ProviderBootstrap over
+loopback with a memory registry. Sweeps concurrency, payload size, serializer
+and compressor, and prints one JSON line per run with the throughput and the
+p50, p99 and p999 latency of an echo call.
+
+    python -m benchmarks.load --concurrency 1,8,32 --payloads 64,4096 --duration 2
+"""
+import argparse
+import json
+import platform
+import random
+import string
+import threading
+import time
+from typing import List
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+from pyrpc_core.config import RpcConfig, ServerConfig, TransportConfig
+from pyrpc_core.protocol.protocol_constants import ProtocolConstants
+from pyrpc_core.registry import RegistryConfig
+
+SERVICE_NAME = 'benchmarkEchoService'
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='benchmark-load')
+
+
+class EchoService:
+    def echo(self, payload: str) -> str:
+        return payload
+
+
+def build_payload(size: int) -> str:
+    """
+    Text of size bytes, seeded so every run sends the same, and about as
+    compressible as typical text
+    """
+    rng = random.Random(size)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(64)]
+    payload = ''
+    while len(payload) < size:
+        payload += rng.choice(words) + ' '
+    return payload[:size]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(echo_service, payload: str, concurrency: int, duration: float, warmup: float) -> dict:
+    """
+    Call echo from concurrency threads as fast as they can for warmup + duration
+    seconds, only the calls started after the warmup are measured
+    """
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start = time.perf_counter()
+    measure_from = start + warmup
+    end = measure_from + duration
+
+    def call(index):
+        samples = latencies[index]
+        while True:
+            call_start = time.perf_counter()
+            if call_start >= end:
+                return
+            try:
+                echo_service.echo(payload)
+            except Exception:
+                errors[index] += 1
+                continue
+            if call_start >= measure_from:
+                samples.append(time.perf_counter() - call_start)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    if not samples:
+        return {'calls': 0, 'errors': sum(errors)}
+    return {
+        'calls': len(samples),
+        'errors': sum(errors),
+        'calls_per_sec': round(len(samples) / duration, 1),
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'p999_ms': round(percentile(samples, 0.999) * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=29001)
+    parser.add_argument('--mode', default='thread', choices=['thread', 'asyncio'])
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--payloads', default='64,4096,65536')
+    parser.add_argument('--serializers', default='json,msgpack,yaml')
+    parser.add_argument('--compressors', default='none,zlib')
+    parser.add_argument('--compress-threshold', type=int, default=1024)
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--warmup', type=float, default=0.5)
+    args = parser.parse_args()
+
+    concurrencies = [int(concurrency) for concurrency in args.concurrency.split(',')]
+    payloads = [int(size) for size in args.payloads.split(',')]
+    for compressor in args.compressors.split(','):
+        # responses are compressed by the provider, requests by the consumer
+        provider = ProviderBootstrap(ServerConfig(
+            mode=args.mode,
+            max_workers=max(concurrencies),
+            compressor_type=compressor,
+            compress_threshold=args.compress_threshold
+        ))
+        provider.add_service(SERVICE_NAME, EchoService(), '127.0.0.1', args.port, registry_config=REGISTRY_CONFIG)
+        provider.start()
+        try:
+            for serializer in args.serializers.split(','):
+                consumer = ConsumerBootstrap(TransportConfig(max_connections=max(concurrencies)))
+                consumer.add_service(SERVICE_NAME, EchoService, registry_config=REGISTRY_CONFIG, rpc_config=RpcConfig(
+                    service_name=SERVICE_NAME,
+                    serializer_type=serializer,
+                    compressor_type=compressor,
+                    compress_threshold=args.compress_threshold
+                ))
+                consumer.start()
+                try:
+                    echo_service = consumer.get_service(SERVICE_NAME)
+                    for size in payloads:
+                        payload = build_payload(size)
+                        for concurrency in concurrencies:
+                            print(json.dumps({
+                                'protocol_version': ProtocolConstants.VERSION,
+                                'python': platform.python_version(),
+                                'mode': args.mode,
+                                'serializer': serializer,
+                                'compressor': compressor,
+                                'payload_bytes': size,
+                                'concurrency': concurrency,
+                                **run(echo_service, payload, concurrency, args.duration, args.warmup)
+                            }), flush=True)
+                finally:
+                    consumer.stop()
+        finally:
+            provider.stop()
+
+
+if __name__ == '__main__':
+    main()
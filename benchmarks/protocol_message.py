@@ -0,0 +1,44 @@
+"""
+ProtocolMessage.to_bytes and from_bytes cost against body size.
+
+    python -m benchmarks.protocol_message
+"""
+import argparse
+import json
+import time
+from pyrpc_core.protocol.protocol_constants import ProtocolConstants
+from pyrpc_core.protocol.protocol_message import ProtocolMessage
+
+
+def measure(func, min_time: float) -> dict:
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        func()
+        iterations += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'ops_per_sec': round(iterations / elapsed, 1),
+        'ns_per_op': round(elapsed / iterations * 1e9, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='0,64,4096,65536,1048576')
+    parser.add_argument('--min-time', type=float, default=1.0)
+    args = parser.parse_args()
+
+    for size in [int(size) for size in args.sizes.split(',')]:
+        message = ProtocolMessage.build(ProtocolConstants.REQUEST_TYPE, 1, b'x' * size, ProtocolConstants.SERIALIZER_JSON)
+        data = message.to_bytes()
+        print(json.dumps({
+            'body_bytes': size,
+            'to_bytes': measure(message.to_bytes, args.min_time),
+            'header_bytes': measure(message.header_bytes, args.min_time),
+            'from_bytes': measure(lambda: ProtocolMessage.from_bytes(data), args.min_time)
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Registry lookup latency against instance count.
+
+For RedisRegistry, compares the per-instance EXISTS liveness check with the
+batched MGET it uses, on the uncached lookup path. Needs a running Redis:
+
+    python -m benchmarks.registry_lookup --address localhost:6379
+
+The in-process MemoryRegistry needs nothing:
+
+    python -m benchmarks.registry_lookup --registry memory
+"""
+import argparse
+import json
+import statistics
+import time
+from pyrpc_core.registry.memory_registry import MemoryRegistry
+from pyrpc_core.registry.redis_registry import RedisRegistry
+from pyrpc_core.registry.registry import ServiceInstance
+from pyrpc_core.registry.registry_config import RegistryConfig
+
+SERVICE_NAME = 'benchmarkLookupService'
+
+
+def lookup_sequential(registry: RedisRegistry, service_name: str) -> int:
+    """
+    The previous lookup: one EXISTS round trip per instance
+    """
+    client = registry._redis
+    instances = client.hgetall(registry._get_service_key(service_name))
+    return sum(
+        1 for instance_key in instances
+        if client.exists(registry._get_heartbeat_key(instance_key))
+    )
+
+
+def lookup_batched(registry: RedisRegistry, service_name: str) -> int:
+    return len(registry._fetch_instances(service_name))
+
+
+def lookup_memory(registry: MemoryRegistry, service_name: str) -> int:
+    return len(registry.list_instances(service_name))
+
+
+def measure(func, registry, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(registry, SERVICE_NAME)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'p50_ms': round(samples[len(samples) // 2], 4),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--registry', default='redis', choices=['redis', 'memory'])
+    parser.add_argument('--address', default='localhost:6379')
+    parser.add_argument('--counts', default='1,10,50,100,200')
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.registry == 'memory':
+        registry = MemoryRegistry(RegistryConfig(registry_type='memory', address='benchmark-lookup'))
+    else:
+        registry = RedisRegistry(RegistryConfig(registry_type='redis', address=args.address))
+    instances = []
+    try:
+        for count in [int(count) for count in args.counts.split(',')]:
+            while len(instances) < count:
+                instance = ServiceInstance(SERVICE_NAME, '10.0.0.1', 20000 + len(instances))
+                registry.register(instance)
+                instances.append(instance)
+            if args.registry == 'memory':
+                results = {'list_instances': measure(lookup_memory, registry, args.iterations)}
+            else:
+                results = {
+                    'sequential_exists': measure(lookup_sequential, registry, args.iterations),
+                    'batched_mget': measure(lookup_batched, registry, args.iterations)
+                }
+            print(json.dumps({'registry': args.registry, 'instances': count, **results}))
+    finally:
+        for instance in instances:
+            registry.unregister(instance)
+
+
+if __name__ == '__main__':
+    main()
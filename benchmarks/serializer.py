@@ -0,0 +1,72 @@
+"""
+Serializer throughput and payload size on a typical request/response pair.
+
+    python -m benchmarks.serializer
+"""
+import argparse
+import json
+import time
+from pyrpc_core.protocol.protocol_constants import ProtocolConstants
+from pyrpc_core.serializer.serializer_facotry import SerializerFactory
+from pyrpc_core.serializer.type_registry import TypeRegistry
+from pyrpc_core_example_common.model.user import User
+
+SERIALIZERS = {
+    'yaml': ProtocolConstants.SERIALIZER_YAML,
+    'json': ProtocolConstants.SERIALIZER_JSON,
+    'msgpack': ProtocolConstants.SERIALIZER_MSGPACK
+}
+
+
+def build_payloads(users: int):
+    """
+    A get_user style request and a list response of User dataclasses, the same
+    for every serializer: yaml dumps dataclasses as mappings too
+    """
+    request = {
+        'service_name': 'userService',
+        'method_name': 'list_users',
+        'args': [0, users],
+        'kwargs': {}
+    }
+    data = [User(id=i, name=f'user-{i}', age=20 + i % 50) for i in range(users)]
+    return request, {'status': 'success', 'data': data}
+
+
+def measure(serializer, payload, min_time: float) -> dict:
+    body = serializer.serialize(payload)
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        serializer.deserialize(serializer.serialize(payload), dict)
+        iterations += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'bytes': len(body),
+        'round_trips_per_sec': round(iterations / elapsed, 1),
+        'us_per_round_trip': round(elapsed / iterations * 1e6, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--serializers', default=','.join(SERIALIZERS))
+    parser.add_argument('--users', default='1,100,1000')
+    parser.add_argument('--min-time', type=float, default=1.0)
+    args = parser.parse_args()
+
+    TypeRegistry.register(User)
+    for users in [int(users) for users in args.users.split(',')]:
+        for name in args.serializers.split(','):
+            serializer = SerializerFactory.get_serializer(SERIALIZERS[name])
+            request, response = build_payloads(users)
+            print(json.dumps({
+                'serializer': name,
+                'users': users,
+                'request': measure(serializer, request, args.min_time),
+                'response': measure(serializer, response, args.min_time)
+            }))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,30 @@
-from .bootstrap import ProviderBootstrap, ConsumerBootstrap
+from .bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
 from .registry import RegistryConfig, Registry, ServiceInstance
-from .protocol import ProtocolConstants
+from .protocol import ProtocolConstants, RpcError, OverloadedError, DeadlineExceededError
 from .serializer import SerializerFactory
+from .cache import cacheable, pure
+from .resilience import deadline_after, idempotent
+from .metrics import MetricsRegistry, PrometheusExporter
+from .interceptor import CallContext, Interceptor
 
 __all__ = [
     'ProviderBootstrap',
     'ConsumerBootstrap',
+    'AsyncConsumerBootstrap',
     'RegistryConfig',
     'Registry',
     'ServiceInstance',
     'ProtocolConstants',
-    'SerializerFactory'
+    'RpcError',
+    'OverloadedError',
+    'DeadlineExceededError',
+    'SerializerFactory',
+    'cacheable',
+    'pure',
+    'deadline_after',
+    'idempotent',
+    'MetricsRegistry',
+    'PrometheusExporter',
+    'CallContext',
+    'Interceptor'
 ]
\ No newline at end of file
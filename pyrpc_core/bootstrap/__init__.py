@@ -1,7 +1,9 @@
 from .provider_bootstrap import ProviderBootstrap
 from .consumer_bootstrap import ConsumerBootstrap
+from .async_consumer_bootstrap import AsyncConsumerBootstrap
 
 __all__ = [
     'ProviderBootstrap',
-    'ConsumerBootstrap'
+    'ConsumerBootstrap',
+    'AsyncConsumerBootstrap'
 ]
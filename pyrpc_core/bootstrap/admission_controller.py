@@ -0,0 +1,54 @@
+import threading
+from typing import Dict
+
+
+class AdmissionController:
+    """
+    Bounds the work a provider holds: at most max_pending requests waiting for
+    or running on a worker, and at most the limit of a service running its
+    methods at once. Requests beyond a bound are rejected at once instead of
+    queueing until they time out.
+    """
+
+    def __init__(self, max_pending: int = 0):
+        self.max_pending = max_pending # 0 for no limit
+        self.pending = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._limits: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, service_name: str, limit: int) -> None:
+        """
+        Limit the concurrent calls of a service, 0 for no limit
+        """
+        with self._lock:
+            self._limits[service_name] = limit
+
+    def try_admit(self) -> bool:
+        with self._lock:
+            if self.max_pending and self.pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            self.admitted += 1
+            return True
+
+    def done(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def try_enter(self, service_name: str) -> bool:
+        with self._lock:
+            limit = self._limits.get(service_name, 0)
+            active = self._active.get(service_name, 0)
+            if limit and active >= limit:
+                self.rejected += 1
+                return False
+            self._active[service_name] = active + 1
+            return True
+
+    def leave(self, service_name: str) -> None:
+        with self._lock:
+            self._active[service_name] -= 1
@@ -0,0 +1,323 @@
+import asyncio
+import collections.abc
+import inspect
+import time
+from typing import Any, AsyncIterator, Callable, List, Optional
+from ..config.circuit_breaker_config import CircuitBreakerConfig
+from ..config.retry_config import RetryConfig
+from ..config.transport_config import TransportConfig
+from ..interceptor.call_context import CallContext
+from ..interceptor.interceptor_chain import InterceptorChain
+from ..metrics.method_metrics import MethodMetrics
+from ..metrics.metrics_registry import MetricsRegistry
+from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.rpc_error import RpcError, StaleMethodTableError
+from ..registry.registry import ServiceInstance
+from ..transport.async_connection import AsyncConnectionManager
+from .consumer_bootstrap import ConsumerBootstrap, ServiceConsumer, STREAM_ORIGINS
+
+# async streams too, a synchronous generator of the interface is iterated with async for
+ASYNC_STREAM_ORIGINS = STREAM_ORIGINS + (
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncGenerator
+)
+
+
+class AsyncConsumerBootstrap(ConsumerBootstrap):
+    """
+    Consumer bootstrap whose proxy methods are coroutines.
+    Calls of one event loop share a non-blocking connection per instance, so
+    asyncio.gather can fan out to many providers without a thread per call.
+    """
+
+    def __init__(self,
+                 transport_config: Optional[TransportConfig] = None,
+                 circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+                 retry_config: Optional[RetryConfig] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        super().__init__(transport_config, circuit_breaker_config, retry_config, metrics)
+        self._async_connections = AsyncConnectionManager(self.transport_config)
+
+    def stop(self):
+        """
+        Stop the consumer, from inside one of its event loops or outside of any
+        """
+        super().stop()
+        self._async_connections.close()
+
+    def _create_service_proxy(self, consumer: ServiceConsumer) -> Any:
+        """
+        Create service proxy instance with awaitable methods
+        """
+        service_methods = inspect.getmembers(
+            consumer.service_class,
+            predicate=inspect.isfunction
+        )
+
+        class AsyncServiceProxy:
+            def __init__(self, bootstrap, consumer):
+                self._bootstrap = bootstrap
+                self._consumer = consumer
+
+        for method_name, method in service_methods:
+            def create_stream_method(name, item_decoder):
+                def stream_method(proxy, *args, **kwargs):
+                    request = {
+                        'service_name': consumer.service_name,
+                        'method_name': name,
+                        'args': args,
+                        'kwargs': kwargs,
+                        'deadline': self._get_deadline(consumer, name)
+                    }
+                    instance = self._select_instance(consumer, request)
+
+                    return self._invoke_stream_async(instance, request, item_decoder, self._time_left(request['deadline']))
+                return stream_method
+
+            def create_proxy_method(name, result_decoder, cache):
+                async def proxy_method(proxy, *args, **kwargs):
+                    request = {
+                        'service_name': consumer.service_name,
+                        'method_name': name,
+                        'args': args,
+                        'kwargs': kwargs,
+                        'deadline': self._get_deadline(consumer, name)
+                    }
+                    if cache is not None:
+                        return await cache.get_or_load_async(
+                            self._get_cache_key(consumer, args, kwargs),
+                            lambda: self._call_async(consumer, request, result_decoder)
+                        )
+                    return await self._call_async(consumer, request, result_decoder)
+                return proxy_method
+            if method_name.startswith('_'):
+                # __init__ and private helpers of the interface are not remote methods
+                continue
+            stream, item_decoder = self._get_stream_decoder(method, ASYNC_STREAM_ORIGINS)
+            if stream:
+                setattr(AsyncServiceProxy, method_name, create_stream_method(method_name, item_decoder))
+            else:
+                setattr(AsyncServiceProxy, method_name, create_proxy_method(
+                    method_name,
+                    self._get_result_decoder(method),
+                    self._create_result_cache(consumer, method_name, method)
+                ))
+        return AsyncServiceProxy(self, consumer)
+
+    async def _call_async(self, consumer: ServiceConsumer, request: dict, result_decoder=None) -> Any:
+        result = await self._invoke_with_retries_async(consumer, request)
+        if result_decoder is not None and result is not None:
+            result = result_decoder(result)
+        return result
+
+    async def _invoke_with_retries_async(self, consumer: ServiceConsumer, request: dict) -> Any:
+        """
+        Same as _invoke_with_retries, backing off without blocking the event loop
+        """
+        policy = consumer.retry_policy
+        method_name = request['method_name']
+        idempotent = method_name in consumer.idempotent_methods
+        policy.budget.deposit()
+        tried: List[str] = []
+        error = None
+        attempt = 0
+        while True:
+            try:
+                instance = self._select_instance(consumer, request, tried)
+            except RuntimeError:
+                if error is None:
+                    raise
+                raise error
+            tried.append(instance.get_address())
+            hedge_delay = policy.get_hedge_delay(method_name) if idempotent else None
+            start = time.perf_counter()
+            try:
+                if hedge_delay is None:
+                    result = await self._invoke_remote_async(instance, request, self._time_left(request['deadline']))
+                else:
+                    result = await self._invoke_hedged_async(consumer, request, instance, hedge_delay, tried)
+            except Exception as e:
+                attempt += 1
+                backoff = policy.get_backoff(e, attempt, idempotent, request['deadline'])
+                if backoff is None:
+                    raise
+                error = e
+                await asyncio.sleep(backoff)
+                continue
+            policy.record_latency(method_name, time.perf_counter() - start)
+            return result
+
+    async def _invoke_hedged_async(self,
+                                   consumer: ServiceConsumer,
+                                   request: dict,
+                                   instance: ServiceInstance,
+                                   delay: float,
+                                   tried: List[str]) -> Any:
+        """
+        Same as _invoke_hedged with tasks, the slower attempt is cancelled
+        """
+        tasks = [asyncio.ensure_future(self._invoke_remote_async(instance, request, self._time_left(request['deadline'])))]
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and consumer.retry_policy.budget.try_withdraw():
+            try:
+                hedge = self._select_instance(consumer, request, tried)
+            except RuntimeError:
+                hedge = None
+            if hedge is not None and hedge.get_address() not in tried:
+                tried.append(hedge.get_address())
+                tasks.append(asyncio.ensure_future(
+                    self._invoke_remote_async(hedge, request, self._time_left(request['deadline']))
+                ))
+        error = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    error = error or e
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            # the slower attempt ends cancelled before the call returns, not failed by a later close
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _invoke_remote_async(self, instance: ServiceInstance, request: dict, timeout: float) -> Any:
+        """
+        Invoke remote service without blocking the event loop
+        """
+        address = instance.get_address()
+        metrics = self.metrics.get(MetricsRegistry.CONSUMER, request['service_name'], request['method_name'])
+        self._instance_stats.on_call_start(address)
+        metrics.on_call_start()
+        start = time.perf_counter()
+        error = None
+        cancelled = False
+        try:
+            chain = self._chains.get((request['service_name'], request['method_name'])) if self._chains else None
+            if chain is None:
+                return await self._transmit_async(instance, request, timeout, metrics)
+            return await chain(CallContext(
+                request['service_name'],
+                request['method_name'],
+                request,
+                instance=instance,
+                timeout=timeout
+            ))
+
+        except asyncio.CancelledError:
+            # the loser of a hedge or a cancelled caller, neither a success nor a failure
+            cancelled = True
+            raise
+        except TimeoutError as e:
+            error = e
+            raise TimeoutError(f'Remote call timed out after {timeout:.3f}s: {request["service_name"]}.{request["method_name"]}')
+        except RpcError as e:
+            error = e
+            raise
+        except Exception as e:
+            error = e
+            raise RuntimeError(f'Failed to invoke remote service: {e}') from e
+        finally:
+            if cancelled:
+                self._instance_stats.on_call_cancelled(address)
+                metrics.on_call_cancelled()
+            else:
+                latency = time.perf_counter() - start
+                self._on_call_end(address, latency, error)
+                metrics.on_call_end(latency, error is not None)
+
+    async def _transmit_async(self,
+                              instance: ServiceInstance,
+                              request: dict,
+                              timeout: float,
+                              metrics: MethodMetrics,
+                              context: Optional[CallContext] = None) -> Any:
+        for attempt in range(2):
+            start = time.perf_counter()
+            request_message = self._build_request_message(request, instance=instance)
+            sent = time.perf_counter()
+            connection = await self._async_connections.get_connection(instance)
+            response_message = await connection.call(request_message, timeout)
+            received = time.perf_counter()
+            if context is not None:
+                context.message = request_message
+                context.response_message = response_message
+            try:
+                return self._parse_response(response_message)
+            except StaleMethodTableError:
+                if attempt or not self._on_stale_table(instance):
+                    raise
+            finally:
+                metrics.record_transfer(
+                    response_message.size,
+                    request_message.size,
+                    serialize=sent - start,
+                    network=received - sent,
+                    deserialize=time.perf_counter() - received
+                )
+
+    def _compose_chain(self, service_name: str, method_name: str) -> Optional[Callable[[CallContext], Any]]:
+        return InterceptorChain.compose_async(self._interceptors, service_name, method_name, self._proceed_async)
+
+    async def _proceed_async(self, context: CallContext) -> Any:
+        metrics = self.metrics.get(MetricsRegistry.CONSUMER, context.service_name, context.method_name)
+        return await self._transmit_async(context.instance, context.request, context.timeout, metrics, context)
+
+    async def _invoke_stream_async(self,
+                                   instance: ServiceInstance,
+                                   request: dict,
+                                   item_decoder: Optional[Callable[[Any], Any]],
+                                   timeout: float) -> AsyncIterator[Any]:
+        """
+        Invoke a remote generator and yield its items as the provider streams
+        them, timeout bounds the wait for each frame
+        """
+        request = dict(request, stream=True, credit=self.transport_config.stream_window)
+        address = instance.get_address()
+        self._instance_stats.on_call_start(address)
+        start = time.perf_counter()
+        error = None
+        connection = None
+        request_message = self._build_request_message(request, instance=instance)
+        finished = False
+        try:
+            connection = await self._async_connections.get_connection(instance)
+            frames = await connection.open_stream(request_message)
+            batch = max(1, self.transport_config.stream_window // 2)
+            consumed = 0
+            while not finished:
+                message = await asyncio.wait_for(frames.get(), timeout)
+                if isinstance(message, Exception):
+                    raise message
+                finished = message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE
+                for item in self._parse_response(message) or ():
+                    yield item_decoder(item) if item_decoder is not None else item
+                if not finished:
+                    consumed += 1
+                    if consumed >= batch:
+                        await connection.send_message(self._build_credit_message(request_message, consumed))
+                        consumed = 0
+
+        except GeneratorExit:
+            raise
+        except TimeoutError as e:
+            error = e
+            raise TimeoutError(f'Remote call timed out after {timeout}s: {request["service_name"]}.{request["method_name"]}')
+        except RpcError as e:
+            error = e
+            raise
+        except Exception as e:
+            error = e
+            raise RuntimeError(f'Failed to invoke remote service: {e}') from e
+        finally:
+            if connection is not None:
+                connection.close_stream(request_message.request_id)
+                if not finished and not connection.closed:
+                    # abandoned or failed half way, cancel the stream on the provider
+                    try:
+                        connection.writer.write(self._build_credit_message(request_message, -1).to_bytes())
+                    except Exception:
+                        pass
+            self._on_call_end(address, time.perf_counter() - start, error)
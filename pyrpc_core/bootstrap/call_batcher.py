@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..registry.registry import ServiceInstance
+
+# (instance, request, result decoder, future of the result)
+Call = Tuple[ServiceInstance, dict, Optional[Callable[[Any], Any]], Future]
+
+
+class CallBatcher:
+    """
+    Collects proxy calls and sends them as batches, one message per instance.
+    Flushes once max_calls are pending or window seconds after the first
+    pending call; with neither set it only flushes when asked to.
+    """
+
+    def __init__(self,
+                 send_batch: Callable[[ServiceInstance, List[Call], bool], None],
+                 max_calls: int = 0,
+                 window: float = 0.0,
+                 parallel: bool = True):
+        self._send_batch = send_batch
+        self.max_calls = max_calls
+        self.window = window
+        self.parallel = parallel # the provider may run the calls of a batch concurrently
+        self._pending: List[Call] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, instance: ServiceInstance, request: dict, result_decoder=None) -> Future:
+        future = Future()
+        with self._lock:
+            self._pending.append((instance, request, result_decoder, future))
+            full = self.max_calls and len(self._pending) >= self.max_calls
+            if not full and self.window and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return future
+
+    def flush(self) -> None:
+        """
+        Send the pending calls, grouped by the instance selected for each
+        """
+        with self._lock:
+            calls, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        groups: Dict[ServiceInstance, List[Call]] = {}
+        for call in calls:
+            groups.setdefault(call[0], []).append(call)
+        for instance, group in groups.items():
+            self._send_batch(instance, group, self.parallel)
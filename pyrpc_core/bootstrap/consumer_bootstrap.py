@@ -1,13 +1,54 @@
+import collections.abc
+import contextlib
 import inspect
-import socket
+import itertools
+import queue
+import threading
 import time
-from typing import Type, Optional, Dict, Any
+import typing
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Type, Optional, Dict, Any, Callable, Iterator, List, Sequence, Set, Tuple
+from ..cache.cacheable import get_cache_config
+from ..cache.result_cache import ResultCache
+from ..compressor.compressor_factory import CompressorFactory
+from ..config.cache_config import CacheConfig
+from ..config.circuit_breaker_config import CircuitBreakerConfig
+from ..config.retry_config import RetryConfig
+from ..config.rpc_config import RpcConfig
+from ..config.transport_config import TransportConfig
+from ..interceptor.call_context import CallContext
+from ..interceptor.interceptor import Interceptor
+from ..interceptor.interceptor_chain import InterceptorChain
+from ..loadbalance.instance_stats import InstanceStatsTracker
+from ..loadbalance.load_balancer import LoadBalancer
+from ..loadbalance.load_balancer_factory import LoadBalancerFactory
+from ..metrics.method_metrics import MethodMetrics
+from ..metrics.metrics_registry import MetricsRegistry
 from ..registry.registry_config import RegistryConfig
 from ..registry.registry_factory import RegistryFactory
 from ..registry.registry import Registry, ServiceInstance
+from ..resilience.deadline import get_deadline
+from ..resilience.idempotent import is_idempotent
+from ..resilience.outlier_detector import OutlierDetector
+from ..resilience.retry_policy import RetryPolicy
 from ..protocol.protocol_message import ProtocolMessage
 from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.rpc_error import DeadlineExceededError, RpcError, StaleMethodTableError
+from ..serializer.codec_compiler import CodecCompiler
 from ..serializer.serializer_facotry import SerializerFactory
+from ..serializer.type_registry import TypeRegistry
+from ..transport.call_abort import CallAbort
+from ..transport.connection_pool import ConnectionPoolManager
+from ..transport.multiplexed_connection import MultiplexedConnectionManager
+from .call_batcher import Call, CallBatcher
+from .dispatch_table import DispatchTable
+
+# method name batch messages are counted under in the metrics
+BATCH_METHOD = '(batch)'
+# ms a partial batch waits for more calls when only RpcConfig.batch_size is set
+DEFAULT_BATCH_WINDOW = 5
+# return annotations whose methods are called as streams
+STREAM_ORIGINS = (collections.abc.Iterator, collections.abc.Iterable, collections.abc.Generator)
 
 
 class ServiceConsumer:
@@ -15,11 +56,36 @@ class ServiceConsumer:
     def __init__(self,
                  service_name: str,
                  service_class: Type,
-                 registry_config: Optional[RegistryConfig] = None):
+                 registry_config: Optional[RegistryConfig] = None,
+                 rpc_config: Optional[RpcConfig] = None,
+                 stats: Optional[InstanceStatsTracker] = None,
+                 retry_config: Optional[RetryConfig] = None):
         self.service_name = service_name
         self.service_class = service_class
+        self.rpc_config = rpc_config or RpcConfig(service_name=service_name)
         self.registry: Optional[Registry] = None
         self.proxy = None # proxy instance
+        self.batcher: Optional[CallBatcher] = None # coalesces calls when batch_size or batch_window is set
+        self.caches: Dict[str, ResultCache] = {} # result caches by method name
+        self.retry_policy = RetryPolicy(self.rpc_config.retries, retry_config)
+        # methods that may be retried after a transport failure and hedged
+        self.idempotent_methods: Set[str] = {
+            name for name, method in inspect.getmembers(service_class, predicate=inspect.isfunction)
+            if is_idempotent(method)
+        } | set(self.rpc_config.extensions.get('idempotent', ()))
+        self.serializer_type = SerializerFactory.get_serializer_type(self.rpc_config.serializer_type)
+        self.compressor_type = CompressorFactory.get_compressor_type(self.rpc_config.compressor_type)
+        TypeRegistry.register_service(service_class)
+
+        options = {}
+        if self.rpc_config.load_balance == 'consistent_hash' and 'hash_arg' in self.rpc_config.extensions:
+            # index of the positional argument requests are hashed on
+            options['hash_arg'] = int(self.rpc_config.extensions['hash_arg'])
+        self.load_balancer: LoadBalancer = LoadBalancerFactory.get_load_balancer(
+            self.rpc_config.load_balance,
+            stats,
+            **options
+        )
 
         if registry_config:
             self.registry = RegistryFactory.get_registry(registry_config)
@@ -29,20 +95,66 @@ class ConsumerBootstrap:
     """
     Consumer bootstrap class
     """
-    def __init__(self):
+    def __init__(self,
+                 transport_config: Optional[TransportConfig] = None,
+                 circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
+                 retry_config: Optional[RetryConfig] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         self.consumers: Dict[str, ServiceConsumer] = {}
         self._service_instance: Dict[str, list[ServiceInstance]] = {}
+        self.transport_config = transport_config or TransportConfig()
+        self.metrics = metrics or MetricsRegistry.default()
+        # connections shared by every proxy of this bootstrap
+        self._pools = ConnectionPoolManager(self.transport_config)
+        self._multiplexed = MultiplexedConnectionManager(self.transport_config)
+        # monotonically increasing, so in-flight ids never collide on a shared connection
+        self._request_ids = itertools.count(1)
+        # in-flight and latency per instance, read by the load balancers
+        self._instance_stats = InstanceStatsTracker()
+        # circuit breakers and ejections per instance, unhealthy instances are not selected
+        self._outlier_detector = OutlierDetector(circuit_breaker_config)
+        self.retry_config = retry_config or RetryConfig()
+        # runs the hedges of hedged calls, created on the first one
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor_lock = threading.Lock()
+        # batch of the innermost `with batch():` block of each thread
+        self._local = threading.local()
+        # advertised method table -> method IDs by method name
+        self._method_ids: Dict[str, Dict[str, int]] = {}
+        # checksums of method tables a provider refused, calls to them name their method
+        self._stale_tables: Set[str] = set()
+        self._interceptors: List[Interceptor] = []
+        # (service name, method name) -> interceptor chain, composed at start()
+        self._chains: Dict[Tuple[str, str], Callable[[CallContext], Any]] = {}
     
     def add_service(self,
                     service_name: str,
                     service_class: Type,
-                    registry_config: Optional[RegistryConfig] = None) -> 'ConsumerBootstrap':
+                    registry_config: Optional[RegistryConfig] = None,
+                    rpc_config: Optional[RpcConfig] = None) -> 'ConsumerBootstrap':
         consumer = ServiceConsumer(
             service_name=service_name,
             service_class=service_class,
-            registry_config=registry_config
+            registry_config=registry_config,
+            rpc_config=rpc_config,
+            stats=self._instance_stats,
+            retry_config=self.retry_config
         )
-        self.consumer[service_name] = consumer
+        if consumer.rpc_config.batch_size or consumer.rpc_config.batch_window:
+            consumer.batcher = CallBatcher(
+                self._invoke_batch,
+                max_calls=consumer.rpc_config.batch_size,
+                window=(consumer.rpc_config.batch_window or DEFAULT_BATCH_WINDOW) / 1000
+            )
+        self.consumers[service_name] = consumer
+        return self
+
+    def add_interceptor(self, interceptor: Interceptor) -> 'ConsumerBootstrap':
+        """
+        Add an interceptor around the calls and batches of every service, before start().
+        Stream calls are not intercepted.
+        """
+        self._interceptors.append(interceptor)
         return self
 
     def start(self):
@@ -54,7 +166,7 @@ class ConsumerBootstrap:
                         self._handle_service_change
                     )
                 consumer.proxy = self._create_service_proxy(consumer)
-            pass
+                self._compose_chains(consumer)
         except Exception as e:
             self.stop()
             raise RuntimeError(f'Failed to start consumer bootstrap: {e}')
@@ -62,12 +174,40 @@ class ConsumerBootstrap:
     def stop(self):
         try:
             for consumer in self.consumers.values():
+                if consumer.batcher:
+                    consumer.batcher.flush()
                 if consumer.registry:
                     consumer.registry.unsubscribe(consumer.service_name)
-            pass
+                    consumer.registry.close()
+            self._pools.close()
+            self._multiplexed.close()
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
         except Exception as e:
             print(f'Error stopping consumer bootstrap: {e}')
     
+    @contextlib.contextmanager
+    def batch(self, parallel: bool = True):
+        """
+        Send the proxy calls this thread makes inside the block as batches, one
+        round trip per instance. The calls return futures, resolved when the block exits.
+        """
+        batcher = CallBatcher(self._invoke_batch, parallel=parallel)
+        previous = getattr(self._local, 'batcher', None)
+        self._local.batcher = batcher
+        try:
+            yield batcher
+        finally:
+            self._local.batcher = previous
+            batcher.flush()
+
+    def cache_stats(self, service_name: str) -> Dict[str, dict]:
+        """
+        Hit, miss and eviction counters of the result caches of a service, by method name
+        """
+        consumer = self.consumers[service_name]
+        return {method_name: cache.stats() for method_name, cache in consumer.caches.items()}
+
     def get_service(self, service_name: str) -> Any:
         if service_name not in self.consumers:
             raise ValueError(f'Service {service_name} not found')
@@ -78,18 +218,18 @@ class ConsumerBootstrap:
         Handle service change event
         """
         # update service instance cache
+        previous = self._service_instance.get(service_name, [])
         self._service_instance[service_name] = instances
-
-        print(f'Service chaged - {service_name}')
-        print(f'Available instance pool: {len(instances)}')
-        for instance in instances:
-            print(f'Instance: {instance.host}:{instance.port}')
+        addresses = {instance.get_address() for instance in instances}
+        self._outlier_detector.forget(
+            instance.get_address() for instance in previous if instance.get_address() not in addresses
+        )
 
     def _create_service_proxy(self, consumer: ServiceConsumer) -> Any:
         """
         Create service proxy instance
         """
-        service_methods = inspect.getmemebers(
+        service_methods = inspect.getmembers(
             consumer.service_class,
             predicate=inspect.isfunction
         )
@@ -101,102 +241,697 @@ class ConsumerBootstrap:
 
             def __getattr__(self, method_name):
                 def invoke(*args, **kwargs):
-                    instance = self._bootstrap._get_service_instance(self._consumer.service_name)
-                    if not instance:
-                        raise RuntimeError(f'No available instance for service: {self._consumer.service_name}')
-                    
                     request = {
                         'service_name': self._consumer.service_name,
                         'method_name': method_name,
-                        'parameter_types': [type(arg) for arg in args],
                         'args': args,
-                        'kwargs': kwargs
+                        'kwargs': kwargs,
+                        'deadline': self._bootstrap._get_deadline(self._consumer, method_name)
                     }
+                    instance = self._bootstrap._select_instance(self._consumer, request)
 
                     return self._bootstrap._invoke_remote(instance, request)
                 return invoke
 
         for method_name, method in service_methods:
-            def create_proxy_method(name):
-                def proxy_method(*args, **kwargs):
-                    if not consumer.registry:
-                        raise RuntimeError(f'No registry configured for service: {consumer.service_name}')
-                    
-                    instance = consumer.registry.get_instance(consumer.service_name)
-                    if not instance:
-                        raise RuntimeError(f'No available instance for service: {consumer.service_name}')
-                    
+            def create_stream_method(name, item_decoder):
+                def stream_method(proxy, *args, **kwargs):
                     request = {
                         'service_name': consumer.service_name,
                         'method_name': name,
                         'args': args,
-                        'kwargs': kwargs
+                        'kwargs': kwargs,
+                        'deadline': self._get_deadline(consumer, name)
                     }
+                    instance = self._select_instance(consumer, request)
+
+                    return self._invoke_stream(instance, request, item_decoder)
+                return stream_method
 
-                    return self._invoke_remote(instance, request)
+            def create_proxy_method(name, result_decoder, cache):
+                def proxy_method(proxy, *args, **kwargs):
+                    request = {
+                        'service_name': consumer.service_name,
+                        'method_name': name,
+                        'args': args,
+                        'kwargs': kwargs,
+                        'deadline': self._get_deadline(consumer, name)
+                    }
+                    batcher = getattr(self._local, 'batcher', None)
+                    if batcher is not None:
+                        return batcher.submit(self._select_instance(consumer, request, acquire=False), request, result_decoder)
+                    if cache is not None:
+                        return cache.get_or_load(
+                            self._get_cache_key(consumer, args, kwargs),
+                            lambda: self._call(consumer, request, result_decoder)
+                        )
+                    return self._call(consumer, request, result_decoder)
                 return proxy_method
-            setattr(ServiceProxy, method_name, create_proxy_method(method_name))
+            if method_name.startswith('_'):
+                # __init__ and private helpers of the interface are not remote methods
+                continue
+            stream, item_decoder = self._get_stream_decoder(method, STREAM_ORIGINS)
+            if stream:
+                setattr(ServiceProxy, method_name, create_stream_method(method_name, item_decoder))
+            else:
+                setattr(ServiceProxy, method_name, create_proxy_method(
+                    method_name,
+                    self._get_result_decoder(method),
+                    self._create_result_cache(consumer, method_name, method)
+                ))
         return ServiceProxy(self, consumer)
 
-    def _invoke_remote(self, instance: ServiceInstance, request: dict) -> Any:
+    def _call(self, consumer: ServiceConsumer, request: dict, result_decoder=None) -> Any:
+        failed = None
+        if consumer.batcher is not None:
+            instance = self._select_instance(consumer, request, acquire=False)
+            future = consumer.batcher.submit(instance, request, result_decoder)
+            timeout = self._time_left(request.get('deadline'))
+            try:
+                return future.result(timeout)
+            except TimeoutError:
+                if not future.done():
+                    raise TimeoutError(f'Remote call timed out after {timeout:.3f}s: {request["service_name"]}.{request["method_name"]}')
+                failed = (instance.get_address(), future.exception())
+            except Exception as e:
+                # retried on its own, like a call that failed outside a batch
+                failed = (instance.get_address(), e)
+
+        result = self._invoke_with_retries(consumer, request, failed)
+        if result_decoder is not None and result is not None:
+            result = result_decoder(result)
+        return result
+
+    def _invoke_with_retries(self,
+                             consumer: ServiceConsumer,
+                             request: dict,
+                             failed: Optional[Tuple[str, Exception]] = None) -> Any:
+        """
+        Invoke a call, then retry it on another instance while its failure, the
+        retry budget and its deadline allow. Idempotent calls slower than usual are hedged.
+        failed is the (address, error) of a first attempt already made in a batch.
+        """
+        policy = consumer.retry_policy
+        method_name = request['method_name']
+        idempotent = method_name in consumer.idempotent_methods
+        policy.budget.deposit()
+        tried: List[str] = []
+        error = None
+        attempt = 0
+        if failed is not None:
+            address, error = failed
+            tried.append(address)
+            attempt = 1
+            backoff = policy.get_backoff(error, attempt, idempotent, request.get('deadline'))
+            if backoff is None:
+                raise error
+            time.sleep(backoff)
+        while True:
+            try:
+                instance = self._select_instance(consumer, request, tried)
+            except RuntimeError:
+                if error is None:
+                    raise
+                raise error
+            tried.append(instance.get_address())
+            hedge_delay = policy.get_hedge_delay(method_name) if idempotent else None
+            start = time.perf_counter()
+            try:
+                if hedge_delay is None:
+                    result = self._invoke_remote(instance, request)
+                else:
+                    result = self._invoke_hedged(consumer, request, instance, hedge_delay, tried)
+            except Exception as e:
+                attempt += 1
+                backoff = policy.get_backoff(e, attempt, idempotent, request.get('deadline'))
+                if backoff is None:
+                    raise
+                error = e
+                time.sleep(backoff)
+                continue
+            policy.record_latency(method_name, time.perf_counter() - start)
+            return result
+
+    def _invoke_hedged(self,
+                       consumer: ServiceConsumer,
+                       request: dict,
+                       instance: ServiceInstance,
+                       delay: float,
+                       tried: List[str]) -> Any:
+        """
+        Invoke a call and, when it has not answered within delay seconds, the same
+        call on a second instance. The first successful response wins.
+        The first call runs on the caller's thread and only the hedge on the pool,
+        a hedge that wins aborts the first call.
+        """
+        settled = threading.Event()
+        abort = CallAbort()
+        skipped = object()
+
+        def invoke_hedge():
+            if settled.wait(delay) or not consumer.retry_policy.budget.try_withdraw():
+                return skipped
+            try:
+                hedge = self._select_instance(consumer, request, tried)
+            except RuntimeError:
+                return skipped
+            if hedge.get_address() in tried:
+                return skipped
+            tried.append(hedge.get_address())
+            result = self._invoke_remote(hedge, request)
+            # the hedge won, stop waiting for the first call
+            abort.abort()
+            return result
+
+        hedged = self._get_hedge_executor().submit(invoke_hedge)
+        try:
+            with abort.scope():
+                result = self._invoke_remote(instance, request)
+        except CancelledError:
+            return hedged.result()
+        except Exception:
+            settled.set()
+            try:
+                result = hedged.result()
+            except Exception:
+                result = skipped
+            if result is skipped:
+                raise
+            return result
+        settled.set()
+        return result
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._hedge_executor_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(thread_name_prefix='pyrpc-hedge')
+        return self._hedge_executor
+
+    def _invoke_remote(self,
+                       instance: ServiceInstance,
+                       request: dict,
+                       message_type: int = ProtocolConstants.REQUEST_TYPE) -> Any:
         """
         Invoke remote service
         """
+        address = instance.get_address()
+        timeout = self._time_left(request.get('deadline'))
+        method_name = request.get('method_name', BATCH_METHOD)
+        metrics = self.metrics.get(MetricsRegistry.CONSUMER, request['service_name'], method_name)
+        self._instance_stats.on_call_start(address)
+        metrics.on_call_start()
+        start = time.perf_counter()
+        error = None
+        cancelled = False
         try:
-            protocol_message = ProtocolMessage(
-                magic_numer=ProtocolConstants.MAGIC_NUMBER,
-                version=ProtocolConstants.VERSION,
-                serializer_type=ProtocolConstants.SERIALIZER_YAML,
-                messge_type=ProtocolConstants.REQUEST_TYPE,
-                compressor_type=ProtocolConstants.COMPRESSOR_NONE,
-                request_id=int(time.time() * 1000),
-                body = request
-            )
-            serializer = SerializerFactory.get_serializer(protocol_message.serializer_type)
-
-            protocol_message.body = serializer.serialize(request)
-
-            protocol_message.body = serializer.serialize(request)
-            protocol_message.body_length = len(protocol_message.body)
-
-            message_bytes = protocol_message.to_bytes()
-
-            with socket.create_connection(
-                (instance.host, instance.port),
-                timeout=10
-            ) as sock:
-                sock.sendall(message_bytes)
-
-                header_size = ProtocolMessage.get_header_length()
-                header_data = sock.recv(header_size)
-                if len(header_data) < header_size:
-                    raise RuntimeError('Failed to receive complete header')
-                
-                response_message = ProtocolMessage.from_bytes(header_data)
-
-                body_data = b''
-                remaining = response_message.body_length
-                while remaining > 0:
-                    chunk = sock.recv(min(remaining, 4096))
-                    if not chunk:
-                        break
-                    body_data += chunk
-                    remainning -= len(chunk)
-                
-                if len(body_data) < response_message.body_length:
-                    raise RuntimeError('Failed to receive complete message body')
-                
-                response_serializer = SerializerFactory.get_serializer(response_message.serializer_type)
-                response = response_serializer.deserialize(body_data, dict)
-
-                if response.get('status') == 'error':
-                    raise RuntimeError(response.get('message', 'Unknown error'))
-                
-                return response.get('data')
+            chain = self._chains.get((request['service_name'], method_name)) if self._chains else None
+            if chain is None:
+                return self._transmit(instance, request, message_type, timeout, metrics)
+            return chain(CallContext(
+                request['service_name'],
+                method_name,
+                request,
+                instance=instance,
+                message_type=message_type,
+                timeout=timeout
+            ))
+
+        except CancelledError:
+            # aborted by a hedge that answered first, neither a success nor a failure
+            cancelled = True
+            raise
+        except TimeoutError as e:
+            error = e
+            raise TimeoutError(f'Remote call timed out after {timeout:.3f}s: {request["service_name"]}.{method_name}')
+        except RpcError as e:
+            error = e
+            raise
+        except Exception as e:
+            error = e
+            raise RuntimeError(f'Failed to invoke remote service: {e}') from e
+        finally:
+            if cancelled:
+                self._instance_stats.on_call_cancelled(address)
+                metrics.on_call_cancelled()
+            else:
+                latency = time.perf_counter() - start
+                self._on_call_end(address, latency, error)
+                metrics.on_call_end(latency, error is not None)
+
+    def _transmit(self,
+                  instance: ServiceInstance,
+                  request: dict,
+                  message_type: int,
+                  timeout: float,
+                  metrics: MethodMetrics,
+                  context: Optional[CallContext] = None) -> Any:
+        """
+        Encode a request, exchange it with an instance and decode the response.
+        A request whose method ID the instance refused is sent again by name.
+        """
+        for attempt in range(2):
+            start = time.perf_counter()
+            request_message = self._build_request_message(request, message_type, instance)
+            sent = time.perf_counter()
+            response_message = self._exchange(instance, request_message, timeout)
+            received = time.perf_counter()
+            if context is not None:
+                context.message = request_message
+                context.response_message = response_message
+            try:
+                return self._parse_response(response_message)
+            except StaleMethodTableError:
+                if attempt or not self._on_stale_table(instance):
+                    raise
+            finally:
+                metrics.record_transfer(
+                    response_message.size,
+                    request_message.size,
+                    serialize=sent - start,
+                    network=received - sent,
+                    deserialize=time.perf_counter() - received
+                )
+
+    def _on_stale_table(self, instance: ServiceInstance) -> bool:
+        """
+        Stop naming methods by the IDs an instance advertises, after it refused
+        them. Whether a request to it is worth sending again.
+        """
+        table = instance.metadata.get(DispatchTable.CHECKSUM_KEY)
+        if not table or table in self._stale_tables:
+            return False
+        self._stale_tables.add(table)
+        return True
+
+    def _compose_chains(self, consumer: ServiceConsumer) -> None:
+        """
+        Compose the interceptor chain of each method of a service, batches included
+        """
+        if not self._interceptors:
+            return
+        method_names = [
+            name for name, _ in inspect.getmembers(consumer.service_class, predicate=inspect.isfunction)
+            if not name.startswith('_')
+        ]
+        for method_name in method_names + [BATCH_METHOD]:
+            chain = self._compose_chain(consumer.service_name, method_name)
+            if chain is not None:
+                self._chains[(consumer.service_name, method_name)] = chain
+
+    def _compose_chain(self, service_name: str, method_name: str) -> Optional[Callable[[CallContext], Any]]:
+        return InterceptorChain.compose(self._interceptors, service_name, method_name, self._proceed)
+
+    def _proceed(self, context: CallContext) -> Any:
+        """
+        End of every interceptor chain: send the call
+        """
+        metrics = self.metrics.get(MetricsRegistry.CONSUMER, context.service_name, context.method_name)
+        return self._transmit(context.instance, context.request, context.message_type, context.timeout, metrics, context)
+
+    def _invoke_batch(self, instance: ServiceInstance, calls: List[Call], parallel: bool) -> None:
+        """
+        Send calls to one instance in a single batch message and resolve their futures.
+        A batch whose method IDs the instance refused is sent again by name.
+        """
+        for attempt in range(2):
+            batch = {
+                'service_name': instance.service_name,
+                'parallel': parallel,
+                'requests': [self._compact_request(request, instance) for _, request, _, _ in calls]
+            }
+            deadlines = [request.get('deadline') for _, request, _, _ in calls]
+            if None not in deadlines:
+                # the batch is answered once its last call is, a provider drops it once all have expired
+                batch['deadline'] = max(deadlines)
+            try:
+                # one call on the instance as its circuit breaker sees it, one trial when half-open
+                if not self._outlier_detector.try_acquire(instance):
+                    raise RuntimeError(f'No available instance for service: {instance.service_name} (circuit open)')
+                responses = self._invoke_remote(instance, batch, ProtocolConstants.BATCH_REQUEST_TYPE)
+            except Exception as e:
+                for _, _, _, future in calls:
+                    future.set_exception(e)
+                return
+            stale = any(response.get('code') == StaleMethodTableError.code for response in responses)
+            if attempt or not stale or not self._on_stale_table(instance):
+                break
+        if len(responses) < len(calls):
+            # the calls left without a response would otherwise wait for their deadline
+            error = RpcError(f'Batch answered {len(responses)} of {len(calls)} calls')
+            for _, _, _, future in calls[len(responses):]:
+                future.set_exception(error)
+        for (_, _, result_decoder, future), response in zip(calls, responses):
+            if response.get('status') == 'error':
+                error = RpcError.from_response(response)
+                if not isinstance(error, RpcError):
+                    error = RuntimeError(f'Failed to invoke remote service: {error}')
+                future.set_exception(error)
+                continue
+            result = response.get('data')
+            try:
+                if result_decoder is not None and result is not None:
+                    result = result_decoder(result)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.set_result(result)
+
+    def _invoke_stream(self,
+                       instance: ServiceInstance,
+                       request: dict,
+                       item_decoder: Optional[Callable[[Any], Any]] = None) -> Iterator[Any]:
+        """
+        Invoke a remote generator and yield its items as the provider streams them.
+        Closing the iterator early cancels the stream on the provider.
+        """
+        request = dict(request, stream=True, credit=self.transport_config.stream_window)
+        address = instance.get_address()
+        self._instance_stats.on_call_start(address)
+        start = time.perf_counter()
+        error = None
+        try:
+            for message in self._exchange_stream(instance, self._build_request_message(request, instance=instance)):
+                # chunk frames carry a list of items, a plain response the whole result
+                for item in self._parse_response(message) or ():
+                    yield item_decoder(item) if item_decoder is not None else item
 
+        except GeneratorExit:
+            raise
+        except RpcError as e:
+            error = e
+            raise
         except Exception as e:
-            print(f'Error invoking remote service: {e}')
-            raise RuntimeError(f'Failed to invoke remote service: {e}')
+            error = e
+            raise RuntimeError(f'Failed to invoke remote service: {e}') from e
+        finally:
+            self._on_call_end(address, time.perf_counter() - start, error)
+
+    def _select_instance(self,
+                         consumer: ServiceConsumer,
+                         request: dict,
+                         tried: Sequence[str] = (),
+                         acquire: bool = True) -> ServiceInstance:
+        """
+        Select the instance for a request with the load balancer of the service,
+        one whose address was not tried yet for the request if there is any left.
+        Batched calls do not acquire the instance, their batch message does.
+        """
+        if not consumer.registry:
+            raise RuntimeError(f'No registry configured for service: {consumer.service_name}')
+
+        instances = consumer.registry.list_instances(consumer.service_name)
+        if not instances:
+            raise RuntimeError(f'No available instance for service: {consumer.service_name}')
+        candidates = self._outlier_detector.available(instances)
+        if tried:
+            candidates = [candidate for candidate in candidates if candidate.get_address() not in tried] or candidates
+        while candidates:
+            instance = consumer.load_balancer.select(candidates, request)
+            if not instance:
+                break
+            if not acquire or self._outlier_detector.try_acquire(instance):
+                return instance
+            # lost the last half-open trial call to another request
+            candidates = [candidate for candidate in candidates if candidate is not instance]
+        raise RuntimeError(f'No available instance for service: {consumer.service_name} (circuit open on all instances)')
+
+    def _get_deadline(self, consumer: ServiceConsumer, method_name: str) -> Optional[float]:
+        """
+        Deadline of a call: the timeout of its method from now, or the deadline of
+        the calling context when that is earlier, as inside a provider method
+        """
+        timeout = consumer.rpc_config.method_timeouts.get(method_name, consumer.rpc_config.timeout)
+        deadline = time.monotonic() + timeout / 1000 if timeout > 0 else None
+        inherited = get_deadline()
+        if inherited is None:
+            return deadline
+        if inherited <= time.monotonic():
+            raise DeadlineExceededError(f'Deadline exceeded before calling {consumer.service_name}.{method_name}')
+        return inherited if deadline is None else min(deadline, inherited)
+
+    def _time_left(self, deadline: Optional[float]) -> float:
+        """
+        Seconds to wait for a response, the transport read_timeout when the call has no deadline.
+        A call past its deadline fails here, before it is sent.
+        """
+        if deadline is None:
+            return self.transport_config.read_timeout / 1000
+        time_left = deadline - time.monotonic()
+        if time_left <= 0:
+            raise DeadlineExceededError('Deadline exceeded before the call was sent')
+        return time_left
+
+    def _on_call_end(self, address: str, latency: float, error: Optional[BaseException]) -> None:
+        self._instance_stats.on_call_end(address, latency, error is not None)
+        self._outlier_detector.on_call_end(address, latency, error)
+
+    def _build_request_message(self,
+                               request: dict,
+                               message_type: int = ProtocolConstants.REQUEST_TYPE,
+                               instance: Optional[ServiceInstance] = None) -> ProtocolMessage:
+        consumer = self.consumers.get(request['service_name'])
+        serializer_type = consumer.serializer_type if consumer else ProtocolConstants.SERIALIZER_YAML
+        serializer = SerializerFactory.get_serializer(serializer_type)
+        if instance is not None:
+            request = self._compact_request(request, instance)
+        body = serializer.serialize(request)
+        compressor_type = ProtocolConstants.COMPRESSOR_NONE
+        if consumer:
+            compressor_type, body = CompressorFactory.compress(
+                consumer.compressor_type,
+                body,
+                consumer.rpc_config.compress_threshold
+            )
+        return ProtocolMessage.build(
+            message_type,
+            next(self._request_ids),
+            body,
+            serializer_type,
+            compressor_type
+        )
+
+    def _compact_request(self, request: dict, instance: ServiceInstance) -> dict:
+        """
+        Name the method by the ID the instance advertises, with the checksum of
+        its table, instead of by service and method name, and leave out empty kwargs. The local deadline is sent as
+        the ms left, the provider clock is not ours.
+        """
+        deadline = request.get('deadline', False)
+        if deadline is not False:
+            request = {key: value for key, value in request.items() if key != 'deadline'}
+            if deadline is not None:
+                request['timeout'] = max(0, int((deadline - time.monotonic()) * 1000))
+        method_id = self._get_method_ids(instance).get(request.get('method_name'))
+        table = instance.metadata.get(DispatchTable.CHECKSUM_KEY)
+        if method_id is None or not table or table in self._stale_tables:
+            return request
+        compact = {'method_id': method_id, 'table': table, 'args': request['args']}
+        for key, value in request.items():
+            if key not in ('service_name', 'method_name', 'args') and (value or key != 'kwargs'):
+                compact[key] = value
+        return compact
+
+    def _get_method_ids(self, instance: ServiceInstance) -> Dict[str, int]:
+        """
+        Method IDs advertised by an instance, parsed once per distinct table
+        """
+        table = instance.metadata.get(DispatchTable.METADATA_KEY)
+        if not table:
+            return {}
+        method_ids = self._method_ids.get(table)
+        if method_ids is None:
+            method_ids = self._method_ids[table] = DispatchTable.parse_metadata(table)
+        return method_ids
+
+    def _parse_response(self, response_message: ProtocolMessage) -> Any:
+        response_serializer = SerializerFactory.get_serializer(response_message.serializer_type)
+        body = CompressorFactory.decompress(response_message.compressor_type, response_message.body)
+        response = response_serializer.deserialize(body, dict)
+
+        if response.get('status') == 'error':
+            raise RpcError.from_response(response)
+
+        return response.get('data')
+
+    def _exchange(self, instance: ServiceInstance, protocol_message: ProtocolMessage, timeout: float) -> ProtocolMessage:
+        """
+        Send a request and wait at most timeout seconds for its response, over the
+        multiplexed connection of the instance or over a pooled connection.
+        A reused connection that turns out to be broken (the provider closed it
+        while it was idle) is replaced by a fresh one and the request is resent once.
+        An exchange in the scope of a CallAbort raises CancelledError once aborted.
+        """
+        if self.transport_config.multiplex:
+            connection = self._multiplexed.get_connection(instance)
+            with CallAbort.watch(lambda: connection.abandon(protocol_message.request_id)):
+                return connection.call(protocol_message, timeout=timeout)
+
+        pool = self._pools.get_pool(instance)
+        for attempt in range(2):
+            connection = pool.acquire()
+            reused = connection.reused
+            try:
+                # closing the connection wakes up the read of an aborted call
+                with CallAbort.watch(connection.close):
+                    connection.sock.settimeout(timeout)
+                    connection.send_message(protocol_message)
+                    response_message = connection.read_message()
+                    if response_message is None:
+                        raise ConnectionResetError(f'Connection closed by peer: {connection.address}')
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                pool.release(connection, broken=True)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                pool.release(connection, broken=True)
+                raise
+            pool.release(connection)
+            return response_message
+
+    def _exchange_stream(self, instance: ServiceInstance, protocol_message: ProtocolMessage) -> Iterator[ProtocolMessage]:
+        """
+        Send a streaming request and yield its frames up to the end frame, over
+        the multiplexed connection of the instance or a pooled connection
+        """
+        if self.transport_config.multiplex:
+            yield from self._exchange_stream_multiplexed(instance, protocol_message)
+            return
+
+        pool = self._pools.get_pool(instance)
+        connection = pool.acquire()
+        # a stream abandoned half way leaves frames on the connection
+        broken = True
+        try:
+            connection.send_message(protocol_message)
+
+            def next_frame():
+                message = connection.read_message()
+                if message is None:
+                    raise ConnectionResetError(f'Connection closed by peer: {connection.address}')
+                return message
+
+            for message in self._read_stream(protocol_message, next_frame, connection.send_message):
+                if message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE:
+                    broken = False
+                yield message
+        finally:
+            pool.release(connection, broken=broken)
+
+    def _exchange_stream_multiplexed(self,
+                                     instance: ServiceInstance,
+                                     protocol_message: ProtocolMessage) -> Iterator[ProtocolMessage]:
+        connection = self._multiplexed.get_connection(instance)
+        frames = connection.open_stream(protocol_message)
+        read_timeout = self.transport_config.read_timeout / 1000
+        finished = False
+
+        def next_frame():
+            try:
+                message = frames.get(timeout=read_timeout)
+            except queue.Empty:
+                raise TimeoutError(f'No stream frame within {read_timeout}s: {connection.connection.address}')
+            if isinstance(message, Exception):
+                raise message
+            return message
+
+        try:
+            for message in self._read_stream(protocol_message, next_frame, connection.send_message):
+                if message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE:
+                    finished = True
+                yield message
+        finally:
+            connection.close_stream(protocol_message.request_id)
+            if not finished and not connection.closed:
+                try:
+                    connection.send_message(self._build_credit_message(protocol_message, -1))
+                except OSError:
+                    pass
+
+    def _read_stream(self,
+                     protocol_message: ProtocolMessage,
+                     next_frame: Callable[[], ProtocolMessage],
+                     send_frame: Callable[[ProtocolMessage], None]) -> Iterator[ProtocolMessage]:
+        """
+        Yield the frames of a stream up to the end frame. Credit for consumed chunk
+        frames is granted back in batches of half the window, only once the caller
+        asks for more, so a slow consumer holds the provider back.
+        """
+        batch = max(1, self.transport_config.stream_window // 2)
+        consumed = 0
+        while True:
+            message = next_frame()
+            yield message
+            if message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE:
+                return
+            consumed += 1
+            if consumed >= batch:
+                send_frame(self._build_credit_message(protocol_message, consumed))
+                consumed = 0
+
+    def _build_credit_message(self, protocol_message: ProtocolMessage, credit: int) -> ProtocolMessage:
+        """
+        Grant the provider credit for more chunk frames of a stream, a negative credit cancels it
+        """
+        serializer = SerializerFactory.get_serializer(protocol_message.serializer_type)
+        return ProtocolMessage.build(
+            ProtocolConstants.STREAM_CREDIT_TYPE,
+            protocol_message.request_id,
+            serializer.serialize({'credit': credit}),
+            protocol_message.serializer_type
+        )
+
+    @staticmethod
+    def _get_stream_decoder(method, origins: tuple) -> Tuple[bool, Optional[Callable[[Any], Any]]]:
+        """
+        Whether an interface method returns a stream of the given kinds, with the
+        compiled decoder of one item of it
+        """
+        try:
+            return_hint = typing.get_type_hints(method).get('return')
+        except Exception:
+            return False, None
+        if typing.get_origin(return_hint) not in origins and return_hint not in origins:
+            return False, None
+        item_hints = typing.get_args(return_hint)
+        return True, CodecCompiler.get_decoder(item_hints[0]) if item_hints else None
+
+    def _create_result_cache(self, consumer: ServiceConsumer, method_name: str, method) -> Optional[ResultCache]:
+        """
+        Result cache of an interface method marked @cacheable, or configured in
+        RpcConfig.extensions['cache'][method_name] with a CacheConfig or its fields
+        """
+        config = get_cache_config(method)
+        options = consumer.rpc_config.extensions.get('cache', {}).get(method_name)
+        if options is not None:
+            config = options if isinstance(options, CacheConfig) else CacheConfig(**options)
+        if config is None:
+            return None
+        serializer = SerializerFactory.get_serializer(consumer.serializer_type)
+        cache = ResultCache(config, size_of=lambda result: len(serializer.serialize(result)))
+        consumer.caches[method_name] = cache
+        return cache
+
+    @staticmethod
+    def _get_cache_key(consumer: ServiceConsumer, args: tuple, kwargs: dict) -> bytes:
+        """
+        The serialized arguments, kwargs sorted so their order does not matter
+        """
+        serializer = SerializerFactory.get_serializer(consumer.serializer_type)
+        return serializer.serialize([list(args), [[name, kwargs[name]] for name in sorted(kwargs)]])
+
+    @staticmethod
+    def _get_result_decoder(method):
+        """
+        Compiled decoder for the return annotation of an interface method, so
+        serializers without type information still return dataclasses
+        """
+        try:
+            return_hint = typing.get_type_hints(method).get('return')
+        except Exception:
+            return None
+        return CodecCompiler.get_decoder(return_hint) if return_hint is not None else None
 
     def _get_service_instance(self, service_name: str) -> Optional[ServiceInstance]:
         """
@@ -0,0 +1,101 @@
+import inspect
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..cache.pure import get_memo_ttl
+from ..protocol.rpc_error import StaleMethodTableError
+from ..serializer.codec_compiler import CodecCompiler
+
+
+@dataclass(frozen=True)
+class MethodEntry:
+    method_id: int
+    service_name: str
+    method_name: str
+    method: Callable
+    args_decoder: Optional[Callable[[list, dict], tuple]]
+    is_coroutine: bool
+    memo_ttl: Optional[int] # ms, None unless the method is @pure
+
+
+class DispatchTable:
+    """
+    Methods of the services of a provider, resolved once when a service is added.
+    Each method gets a small integer ID that providers advertise in the registry
+    metadata, so consumers can name it by ID instead of by service and method name.
+    Requests naming a method by ID carry the checksum of the table the ID comes
+    from, so an ID of another table is refused instead of running another method.
+    """
+
+    # registry metadata key of the advertised method IDs, 'name:id,name:id'
+    METADATA_KEY = 'methods'
+    # registry metadata key of the checksum of the whole table
+    CHECKSUM_KEY = 'methods_checksum'
+
+    def __init__(self):
+        self._entries: List[MethodEntry] = []
+        self._by_name: Dict[Tuple[str, str], MethodEntry] = {}
+        self._services: Dict[str, List[MethodEntry]] = {}
+        self._checksum: Optional[str] = None
+
+    def add_service(self, service_name: str, service_instance: Any) -> None:
+        entries = []
+        for method_name, method in inspect.getmembers(service_instance, predicate=inspect.isroutine):
+            if method_name.startswith('_'):
+                continue
+            entry = MethodEntry(
+                method_id=len(self._entries),
+                service_name=service_name,
+                method_name=method_name,
+                method=method,
+                args_decoder=CodecCompiler.get_args_decoder(method),
+                is_coroutine=inspect.iscoroutinefunction(method),
+                memo_ttl=get_memo_ttl(method)
+            )
+            self._entries.append(entry)
+            self._by_name[(service_name, method_name)] = entry
+            entries.append(entry)
+        self._services[service_name] = entries
+        self._checksum = None
+
+    def entries(self) -> List[MethodEntry]:
+        return list(self._entries)
+
+    def get_checksum(self) -> str:
+        if self._checksum is None:
+            table = ','.join(f'{entry.service_name}.{entry.method_name}:{entry.method_id}' for entry in self._entries)
+            self._checksum = format(zlib.crc32(table.encode()), '08x')
+        return self._checksum
+
+    def get_metadata(self, service_name: str) -> str:
+        return ','.join(f'{entry.method_name}:{entry.method_id}' for entry in self._services.get(service_name, ()))
+
+    @staticmethod
+    def parse_metadata(value: str) -> Dict[str, int]:
+        method_ids = {}
+        for item in value.split(','):
+            method_name, _, method_id = item.partition(':')
+            method_ids[method_name] = int(method_id)
+        return method_ids
+
+    def resolve(self, request: dict) -> MethodEntry:
+        """
+        Find the method of a request by its method_id, or by its service and method name
+        """
+        method_id = request.get('method_id')
+        if method_id is not None:
+            table = request.get('table')
+            if table is not None and table != self.get_checksum():
+                raise StaleMethodTableError(f'Stale method table {table}, method #{method_id} not resolved')
+            if not 0 <= method_id < len(self._entries):
+                raise LookupError(f'Method not found: #{method_id}')
+            return self._entries[method_id]
+
+        service_name = request.get('service_name')
+        method_name = request.get('method_name')
+        entry = self._by_name.get((service_name, method_name))
+        if entry is None:
+            if service_name not in self._services:
+                raise LookupError(f'Service not found: {service_name}')
+            raise LookupError(f'Method not found: {method_name}')
+        return entry
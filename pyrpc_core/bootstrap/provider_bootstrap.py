@@ -1,11 +1,53 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import signal
 import socket
 import threading
-import pickle
-from typing import Any, Optional, Dict
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Dict, List, Set, Tuple
+from ..compressor.compressor_factory import CompressorFactory
+from ..config.server_config import ServerConfig
+from ..interceptor.call_context import CallContext
+from ..interceptor.interceptor import Interceptor
+from ..interceptor.interceptor_chain import InterceptorChain
+from ..metrics.metrics_registry import MetricsRegistry
 from ..registry.registry_config import RegistryConfig
 from ..registry.registry import Registry, ServiceInstance
 from ..registry.registry_factory import RegistryFactory
 from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.protocol_message import ProtocolMessage
+from ..protocol.rpc_error import DeadlineExceededError, OverloadedError, RpcError
+from ..serializer.serializer_facotry import SerializerFactory
+from ..serializer.type_registry import TypeRegistry
+from ..resilience.deadline import deadline_scope
+from ..transport.async_server import AsyncRpcServer
+from ..transport.connection import Connection
+from ..transport.stream_credit import StreamCredit, AsyncStreamCredit
+from .admission_controller import AdmissionController
+from .dispatch_table import DispatchTable, MethodEntry
+from .request_coalescer import RequestCoalescer
+from .worker_supervisor import STATS_INTERVAL, WORKER_STATS, WorkerSupervisor
+
+# service instances of a worker process, set by the process pool initializer
+_process_services: Dict[str, Any] = {}
+
+
+def _init_worker_process(services: Dict[str, Any]):
+    _process_services.update(services)
+
+
+def _call_in_process(service_name: str, method_name: str, args, kwargs, deadline: Optional[float] = None):
+    # time.monotonic() is system wide, the deadline holds in the worker process
+    with deadline_scope(deadline):
+        result = getattr(_process_services[service_name], method_name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+    return result
 
 
 class ServiceProvider:
@@ -19,13 +61,23 @@ class ServiceProvider:
                  host: str,
                  port: int,
                  registry_config: Optional[RegistryConfig] = None,
-                 metadata: Dict[str, str] = None):
+                 metadata: Dict[str, str] = None,
+                 max_concurrency: int = 0,
+                 executor: str = 'thread'):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f'Unsupported executor: {executor}')
         self.service_name = service_name
         self.service_instance = service_instance
         self.host = host
         self.port = port
         self.registry_config = registry_config
-        self.metadata: Optional[Registry] = None
+        self.metadata: Dict[str, str] = metadata or {}
+        self.max_concurrency = max_concurrency # concurrent calls, 0 for no limit
+        # 'process' runs the methods in worker processes, for CPU bound services;
+        # the instance, arguments and results must then be picklable
+        self.executor = executor
+        self.registry: Optional[Registry] = None
+        TypeRegistry.register_service(type(service_instance))
 
         if registry_config:
             self.registry = RegistryFactory.get_registry(registry_config)
@@ -36,8 +88,30 @@ class ProviderBootstrap:
     Provider bootstrap class
     """
 
-    def __init__(self):
+    def __init__(self, server_config: Optional[ServerConfig] = None, metrics: Optional[MetricsRegistry] = None):
         self.providers: Dict[str, ServiceProvider] = {}
+        self.server_config = server_config or ServerConfig()
+        self.metrics = metrics or MetricsRegistry.default()
+        self._compressor_type = CompressorFactory.get_compressor_type(self.server_config.compressor_type)
+        self.running = False
+        self._server_sockets: List[socket.socket] = []
+        self._server_threads: List[threading.Thread] = []
+        self._connections: Set[Connection] = set()
+        self._connections_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        max_queue = self.server_config.max_queue
+        self._admission = AdmissionController(self.server_config.max_workers + max_queue if max_queue >= 0 else 0)
+        self._async_server: Optional[AsyncRpcServer] = None
+        self._supervisor: Optional[WorkerSupervisor] = None
+        # (connection, request id) -> flow control of a running stream
+        self._streams: Dict[Tuple[Any, int], Any] = {}
+        self._streams_lock = threading.Lock()
+        self._dispatch_table = DispatchTable()
+        self._coalescer = RequestCoalescer(self.server_config.memo_size)
+        self._interceptors: List[Interceptor] = []
+        # method ID -> interceptor chain, composed at start()
+        self._chains: Dict[int, Callable[[CallContext], Any]] = {}
 
     def add_service(self,
                     service_name: str,
@@ -45,16 +119,29 @@ class ProviderBootstrap:
                     host: str,
                     port: int,
                     registry_config: Optional[RegistryConfig] = None,
-                    metadata: Dict[str, str] = None) -> 'ProviderBootstrap':
+                    metadata: Dict[str, str] = None,
+                    max_concurrency: int = 0,
+                    executor: str = 'thread') -> 'ProviderBootstrap':
         provider = ServiceProvider(
             service_name=service_name,
             service_instance=service_instance,
             host=host,
             port=port,
             registry_config=registry_config,
-            metadata=metadata
+            metadata=metadata,
+            max_concurrency=max_concurrency,
+            executor=executor
         )
         self.providers[service_name] = provider
+        self._dispatch_table.add_service(service_name, service_instance)
+        self._admission.set_limit(service_name, max_concurrency)
+        return self
+
+    def add_interceptor(self, interceptor: Interceptor) -> 'ProviderBootstrap':
+        """
+        Add an interceptor around the requests of every service, before start()
+        """
+        self._interceptors.append(interceptor)
         return self
     
     def start(self):
@@ -71,6 +158,8 @@ class ProviderBootstrap:
                         metadata={
                             'version': str(ProtocolConstants.VERSION),
                             'serializer': str(ProtocolConstants.SERIALIZER_YAML),
+                            DispatchTable.METADATA_KEY: self._dispatch_table.get_metadata(provider.service_name),
+                            DispatchTable.CHECKSUM_KEY: self._dispatch_table.get_checksum(),
                             **provider.metadata
                         }
                     )
@@ -78,8 +167,13 @@ class ProviderBootstrap:
                     if not success:
                         raise RuntimeError(f'Failed to register service: {provider.service_name}')
 
-            # TODO: Start RPC server
-            self._start_rpc_server()
+            self._compose_chains()
+            if self.server_config.workers > 1:
+                # registered once above, the workers only serve
+                self._supervisor = WorkerSupervisor(self, self.server_config.workers)
+                self._supervisor.start()
+            else:
+                self._start_rpc_server()
         except Exception as e:
             self.stop()
             raise RuntimeError(f'Failed to start provider bootstrap: {e}')
@@ -94,64 +188,835 @@ class ProviderBootstrap:
                         port=provider.port
                     )
                     provider.registry.unregister(service_instance)
-            # TODO
+                    provider.registry.close()
+            if self._supervisor:
+                self._supervisor.stop()
+                self._supervisor = None
             self._stop_rpc_server()
         except Exception as e:
             print(f'Error stopping provider bootstrap: {e}')
     
+    def restart_workers(self):
+        """
+        Gracefully replace every worker process, one at a time
+        """
+        if not self._supervisor:
+            raise RuntimeError('Provider is not running with multiple workers')
+        self._supervisor.restart()
+
+    def stats(self) -> dict:
+        """
+        Request counters of the provider, summed over its worker processes
+        """
+        if self._supervisor:
+            return self._supervisor.stats()
+        admission = self._admission
+        worker = {
+            'pending': admission.pending,
+            'requests': admission.admitted,
+            'rejected': admission.rejected,
+            'pid': os.getpid(),
+            'alive': self.running
+        }
+        totals = {name: worker[name] for name in WORKER_STATS}
+        return dict(totals, restarts=0, workers=[worker])
+
+    def _run_worker(self, slot, ready):
+        """
+        Body of a worker process: serve until SIGTERM, then stop accepting and
+        let in-flight requests finish before exiting
+        """
+        stopping = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+        # Ctrl-C reaches the whole process group, the supervisor stops the workers
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self._start_rpc_server()
+        ready.set()
+        while not stopping.wait(STATS_INTERVAL):
+            slot[:] = [self._admission.pending, self._admission.admitted, self._admission.rejected]
+        self._drain(self.server_config.shutdown_grace / 1000)
+        self._stop_rpc_server()
+
+    def _drain(self, timeout: float):
+        """
+        Stop accepting connections and wait at most timeout seconds for admitted requests
+        """
+        if self._async_server:
+            self._async_server.close_listeners()
+        for server_socket in self._server_sockets:
+            try:
+                server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server_socket.close()
+        deadline = time.monotonic() + timeout
+        while self._admission.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+
     def _start_rpc_server(self):
-        self.server_socket = socket.socket(socket.AF_INET, socket.SCOK_STREAM)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
-        print(f'RPC Server started on {self.host}:{self.port}')
+        # services sharing an address share one listening socket
+        addresses: List[Tuple[str, int]] = []
+        for provider in self.providers.values():
+            if (provider.host, provider.port) not in addresses:
+                addresses.append((provider.host, provider.port))
 
         self.running = True
-        self.server_thread = threading.Thread(target=self._accept_clients, deamon=True)
-        self.server_thread.start()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.server_config.max_workers,
+            thread_name_prefix='pyrpc-worker'
+        )
+        process_services = {
+            provider.service_name: provider.service_instance
+            for provider in self.providers.values() if provider.executor == 'process'
+        }
+        if process_services:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.server_config.process_workers or None,
+                initializer=_init_worker_process,
+                initargs=(process_services,)
+            )
+        if self.server_config.mode == 'asyncio':
+            self._async_server = AsyncRpcServer(
+                addresses,
+                self._handle_message_async,
+                self.server_config.backlog,
+                on_disconnect=self._cancel_streams_async,
+                reuse_port=self.server_config.workers > 1,
+                on_error=self._encode_error
+            )
+            self._async_server.start()
+            for host, port in addresses:
+                print(f'RPC Server (asyncio) started on {host}:{port}')
+            return
+        if self.server_config.mode != 'thread':
+            raise ValueError(f'Unsupported server mode: {self.server_config.mode}')
+
+        for host, port in addresses:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.server_config.workers > 1:
+                server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            server_socket.bind((host, port))
+            server_socket.listen(self.server_config.backlog)
+            self._server_sockets.append(server_socket)
+            print(f'RPC Server started on {host}:{port}')
 
-    def _accept_clients(self):
+            server_thread = threading.Thread(target=self._accept_clients, args=(server_socket,), daemon=True)
+            server_thread.start()
+            self._server_threads.append(server_thread)
+
+    def _accept_clients(self, server_socket: socket.socket):
         while self.running:
-            client_socket, addr = self.server_socket.accept()
-            print(f'Accepted connection from {addr}')
-            client_thread = threading.Thread(tartget=self._handle_client, args=(client_socket,), daemon=True)
+            try:
+                client_socket, addr = server_socket.accept()
+            except OSError:
+                # listening socket closed by stop()
+                break
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client_thread = threading.Thread(target=self._handle_client, args=(client_socket, addr), daemon=True)
             client_thread.start()
 
-    def _handle_client(self, client_socket):
+    def _handle_client(self, client_socket: socket.socket, addr):
+        """
+        Serve framed requests on one connection until the consumer closes it.
+        Requests are processed concurrently and answered in completion order,
+        consumers match responses by request_id.
+        """
+        connection = Connection(client_socket, f'{addr[0]}:{addr[1]}')
+        with self._connections_lock:
+            self._connections.add(connection)
         try:
             while self.running:
-                data = client_socket.recv(4096)
-                if not data:
+                request_message = connection.read_message()
+                if request_message is None:
                     break
-                request = pickle.loads(data)
-                response = self._process_request(request)
-                client_socket.sendall(pickle.dumps(response))
+                # request timeouts count from here, time spent queued included
+                received = time.monotonic()
+                if request_message.message_type == ProtocolConstants.STREAM_CREDIT_TYPE:
+                    self._grant_stream_credit(connection, request_message)
+                    continue
+                if not self._admission.try_admit():
+                    # shed at once rather than queue behind work that is already late
+                    self._send_response(connection, request_message, self._overloaded_response('request queue full'))
+                    continue
+                if request_message.message_type == ProtocolConstants.BATCH_REQUEST_TYPE:
+                    future = self._executor.submit(self._respond_batch, connection, request_message, received)
+                else:
+                    future = self._executor.submit(self._respond, connection, request_message, received)
+                future.add_done_callback(lambda _: self._admission.done())
         except Exception as e:
-            print(f'Error handling client: {e}')
+            if self.running:
+                print(f'Error handling client: {e}')
         finally:
-            client_socket.close()
+            with self._connections_lock:
+                self._connections.discard(connection)
+            connection.close()
+            self._cancel_streams(connection)
+
+    def _respond(self, connection: Connection, request_message: ProtocolMessage, received: float):
+        try:
+            start = time.monotonic()
+            try:
+                request = self._decode_request(request_message)
+            except Exception as e:
+                self._send_response(connection, request_message, {
+                    'status': 'error',
+                    'message': str(e)
+                })
+                return
+            decoding = time.monotonic() - start
+            memo_ttl = self._get_memo_ttl(request)
+            if memo_ttl is not None and not self._intercepted(request):
+                response_message = self._coalescer.run(
+                    self._get_coalesce_key(request_message, request),
+                    lambda: self._encode_coalesced(request_message, self._collect(self._dispatch(request_message, request, received))),
+                    memo_ttl / 1000
+                )
+                response_message = self._readdress(response_message, request_message)
+                connection.send_message(response_message)
+                self._record_transfer(request, request_message, response_message, decoding)
+                return
+            response = self._dispatch(request_message, request, received)
+            if request.get('stream') and self._is_stream(response.get('data')):
+                self._record_transfer(request, request_message, None, decoding)
+                self._send_stream(connection, request_message, response['data'], int(request.get('credit', 1)))
+                return
+            start = time.monotonic()
+            response_message = self._encode_response(request_message, self._collect(response))
+            encoding = time.monotonic() - start
+            connection.send_message(response_message)
+            self._record_transfer(request, request_message, response_message, decoding + encoding)
+        except OSError as e:
+            if self.running:
+                print(f'Error sending response: {e}')
+
+    def _respond_batch(self, connection: Connection, request_message: ProtocolMessage, received: float):
+        """
+        Fan the calls of a batch out to the worker pool and send their responses
+        in one message, in request order, once the last call completes.
+        Workers never wait on each other, so a full pool cannot deadlock.
+        """
+        try:
+            batch = self._decode_request(request_message)
+            requests = batch.get('requests') or []
+        except Exception as e:
+            self._send_response(connection, request_message, {
+                'status': 'error',
+                'message': str(e)
+            })
+            return
+        if self._expired(batch, received):
+            self._send_response(connection, request_message, self._deadline_exceeded_response())
+            return
+        if not batch.get('parallel', True) or len(requests) <= 1:
+            responses = [self._collect(self._dispatch(request_message, request, received)) for request in requests]
+            self._send_response(connection, request_message, {
+                'status': 'success',
+                'data': responses
+            })
+            return
+
+        responses: List[Any] = [None] * len(requests)
+        remaining = [len(requests)]
+        lock = threading.Lock()
+
+        def complete(index, response):
+            responses[index] = response
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._send_response(connection, request_message, {
+                    'status': 'success',
+                    'data': responses
+                })
+
+        def on_done(index, future):
+            response = self._collect(future.result())
+            self._admission.done()
+            complete(index, response)
+
+        # each call takes a queue slot of its own, the ones over the bound are shed
+        for index, request in enumerate(requests):
+            if not self._admission.try_admit():
+                complete(index, self._overloaded_response('request queue full'))
+                continue
+            future = self._executor.submit(self._dispatch, request_message, request, received)
+            future.add_done_callback(functools.partial(on_done, index))
+
+    def _send_response(self, connection: Connection, request_message: ProtocolMessage, response: dict):
+        try:
+            connection.send_message(self._encode_response(request_message, response))
+        except OSError as e:
+            if self.running:
+                print(f'Error sending response: {e}')
+
+    async def _handle_message_async(self, request_message: ProtocolMessage, connection: Any = None):
+        """
+        Decode a request message, process it and encode the response on the event loop:
+        coroutine methods are awaited directly, synchronous methods run on the bounded worker pool.
+        Streaming results are returned as an async iterator of frames.
+        """
+        if request_message.message_type == ProtocolConstants.STREAM_CREDIT_TYPE:
+            await self._grant_stream_credit_async(connection, request_message)
+            return None
+        received = time.monotonic()
+        if not self._admission.try_admit():
+            return self._encode_response(request_message, self._overloaded_response('request queue full'))
+        try:
+            if request_message.message_type == ProtocolConstants.BATCH_REQUEST_TYPE:
+                return await self._handle_batch_async(request_message, received)
+            try:
+                request = self._decode_request(request_message)
+            except Exception as e:
+                return self._encode_response(request_message, {
+                    'status': 'error',
+                    'message': str(e)
+                })
+            decoding = time.monotonic() - received
+            memo_ttl = self._get_memo_ttl(request)
+            if memo_ttl is not None and not self._intercepted(request):
+                async def produce():
+                    response = await self._collect_async(await self._dispatch_async(request_message, request, received))
+                    return self._encode_coalesced(request_message, response)
+
+                response_message = await self._coalescer.run_async(
+                    self._get_coalesce_key(request_message, request),
+                    produce,
+                    memo_ttl / 1000
+                )
+                response_message = self._readdress(response_message, request_message)
+                self._record_transfer(request, request_message, response_message, decoding)
+                return response_message
+            response = await self._dispatch_async(request_message, request, received)
+            data = response.get('data')
+            if request.get('stream') and self._is_stream(data):
+                self._record_transfer(request, request_message, None, decoding)
+                return self._stream_frames_async(connection, request_message, data, int(request.get('credit', 1)))
+            response = await self._collect_async(response)
+            start = time.monotonic()
+            response_message = self._encode_response(request_message, response)
+            self._record_transfer(request, request_message, response_message, decoding + time.monotonic() - start)
+            return response_message
+        finally:
+            self._admission.done()
+
+    async def _handle_batch_async(self, request_message: ProtocolMessage, received: float) -> ProtocolMessage:
+        try:
+            batch = self._decode_request(request_message)
+            requests = batch.get('requests') or []
+            if self._expired(batch, received):
+                return self._encode_response(request_message, self._deadline_exceeded_response())
+            if batch.get('parallel', True):
+                responses = await asyncio.gather(*[
+                    self._dispatch_admitted_async(request_message, request, received) for request in requests
+                ])
+            else:
+                responses = [await self._dispatch_async(request_message, request, received) for request in requests]
+            response = {
+                'status': 'success',
+                'data': [await self._collect_async(response) for response in responses]
+            }
+        except Exception as e:
+            response = {
+                'status': 'error',
+                'message': str(e)
+            }
+        return self._encode_response(request_message, response)
+
+    async def _dispatch_admitted_async(self, request_message: ProtocolMessage, request: dict, received: float) -> dict:
+        """
+        A call of a parallel batch, admitted like a request of its own
+        """
+        if not self._admission.try_admit():
+            return self._overloaded_response('request queue full')
+        try:
+            return await self._dispatch_async(request_message, request, received)
+        finally:
+            self._admission.done()
+
+    def _decode_request(self, request_message: ProtocolMessage) -> dict:
+        serializer = SerializerFactory.get_serializer(request_message.serializer_type)
+        body = CompressorFactory.decompress(request_message.compressor_type, request_message.body)
+        return serializer.deserialize(body, dict)
+
+    def _encode_response(self,
+                         request_message: ProtocolMessage,
+                         response: Any,
+                         message_type: int = ProtocolConstants.RESPONSE_TYPE) -> ProtocolMessage:
+        serializer = SerializerFactory.get_serializer(request_message.serializer_type)
+        try:
+            body = serializer.serialize(response)
+        except Exception as e:
+            # a chunk that cannot be serialized ends its stream
+            if message_type != ProtocolConstants.RESPONSE_TYPE:
+                message_type = ProtocolConstants.STREAM_END_TYPE
+            body = serializer.serialize({
+                'status': 'error',
+                'message': f'Failed to serialize response: {e}'
+            })
+        compressor_type, body = CompressorFactory.compress(
+            self._compressor_type,
+            body,
+            self.server_config.compress_threshold
+        )
+        return ProtocolMessage.build(
+            message_type,
+            request_message.request_id,
+            body,
+            request_message.serializer_type,
+            compressor_type
+        )
+
+    def _encode_error(self, request_message: ProtocolMessage, error: Exception) -> Optional[ProtocolMessage]:
+        """
+        Response to a request whose handling raised, stream credit gets none
+        """
+        if request_message.message_type == ProtocolConstants.STREAM_CREDIT_TYPE:
+            return None
+        return self._encode_response(request_message, self._error_response(error))
+
+    def _get_memo_ttl(self, request: dict) -> Optional[int]:
+        """
+        Memo ttl of the method of a request when identical requests may share its
+        execution, None for other methods and for streams
+        """
+        if request.get('stream'):
+            return None
+        try:
+            return self._dispatch_table.resolve(request).memo_ttl
+        except LookupError:
+            return None
+
+    @staticmethod
+    def _get_coalesce_key(request_message: ProtocolMessage, request: dict) -> tuple:
+        # identical calls encode to identical bodies, no need to look inside
+        body = request_message.body or b''
+        if 'timeout' in request:
+            # except for the time they have left
+            serializer = SerializerFactory.get_serializer(request_message.serializer_type)
+            body = serializer.serialize({key: value for key, value in request.items() if key != 'timeout'})
+        return (
+            request_message.serializer_type,
+            request_message.compressor_type,
+            bytes(body)
+        )
+
+    def _encode_coalesced(self, request_message: ProtocolMessage, response: dict) -> Tuple[ProtocolMessage, bool]:
+        """
+        Encoded response of coalesced requests, shared with the waiters and memoized
+        only on success: an error may be the caller's own, like its deadline
+        """
+        return self._encode_response(request_message, response), response.get('status') == 'success'
+
+    @staticmethod
+    def _readdress(response_message: ProtocolMessage, request_message: ProtocolMessage) -> ProtocolMessage:
+        if response_message.request_id == request_message.request_id:
+            return response_message
+        return ProtocolMessage.build(
+            response_message.message_type,
+            request_message.request_id,
+            response_message.body,
+            response_message.serializer_type,
+            response_message.compressor_type
+        )
+
+    @staticmethod
+    def _is_stream(data: Any) -> bool:
+        return inspect.isgenerator(data) or inspect.isasyncgen(data)
+
+    @staticmethod
+    def _collect(response: dict) -> dict:
+        """
+        Materialise a generator result for a consumer that did not ask for a stream,
+        an error raised by the generator becomes the response
+        """
+        data = response.get('data')
+        try:
+            if inspect.isgenerator(data):
+                response['data'] = list(data)
+            elif inspect.isasyncgen(data):
+                async def collect():
+                    return [item async for item in data]
+                response['data'] = asyncio.run(collect())
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+        return response
 
-    def _process_request(self, request: dict):
+    async def _collect_async(self, response: dict) -> dict:
+        data = response.get('data')
         try:
-            service_name = request.get('service_name')
-            method_name = request.get('method_name')
-            args = request.get('args', [])
-            kwargs = request.get('kwargs', {})
+            if inspect.isasyncgen(data):
+                response['data'] = [item async for item in data]
+            elif inspect.isgenerator(data):
+                # sync generators may block, pull them on the worker pool
+                response['data'] = await asyncio.get_running_loop().run_in_executor(self._executor, list, data)
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+        return response
 
-            provider = self.providers.get(service_name)
-            if not provider:
-                return {
+    def _send_stream(self, connection: Connection, request_message: ProtocolMessage, data, credit: int):
+        """
+        Send a generator result as chunk frames followed by an end frame,
+        sending a chunk frame only when the consumer has granted credit for it.
+        A consumer that grants none for stream_idle_timeout gets an error end frame.
+        """
+        if inspect.isasyncgen(data):
+            data = self._iterate_async_generator(data)
+        stream_credit = StreamCredit(credit)
+        key = (connection, request_message.request_id)
+        with self._streams_lock:
+            self._streams[key] = stream_credit
+        chunk_size = self.server_config.stream_chunk_size
+        try:
+            end = {'status': 'success'}
+            try:
+                while True:
+                    chunk = list(itertools.islice(data, chunk_size))
+                    if not chunk:
+                        break
+                    if not stream_credit.acquire(self.server_config.stream_idle_timeout / 1000):
+                        if stream_credit.cancelled:
+                            # cancelled by the consumer or the connection closed
+                            return
+                        end = self._stalled_stream_response()
+                        break
+                    connection.send_message(self._encode_response(request_message, {'data': chunk}, ProtocolConstants.STREAM_CHUNK_TYPE))
+            except OSError:
+                raise
+            except Exception as e:
+                end = {
                     'status': 'error',
-                    'message': f'Service not found: {service_name}'
+                    'message': str(e)
                 }
-            
-            method = getattr(provider.service_instance, method_name, None)
-            if not method:
-                return {
+            connection.send_message(self._encode_response(request_message, end, ProtocolConstants.STREAM_END_TYPE))
+        finally:
+            with self._streams_lock:
+                self._streams.pop(key, None)
+            if hasattr(data, 'close'):
+                data.close()
+
+    @staticmethod
+    def _iterate_async_generator(data):
+        """
+        Drive an async generator from a worker thread
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(data.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(data.aclose())
+            loop.close()
+
+    async def _stream_frames_async(self, connection: Any, request_message: ProtocolMessage, data, credit: int):
+        stream_credit = AsyncStreamCredit(credit)
+        key = (connection, request_message.request_id)
+        self._streams[key] = stream_credit
+        chunk_size = self.server_config.stream_chunk_size
+        loop = asyncio.get_running_loop()
+        try:
+            end = {'status': 'success'}
+            try:
+                while True:
+                    if inspect.isasyncgen(data):
+                        chunk = []
+                        async for item in data:
+                            chunk.append(item)
+                            if len(chunk) >= chunk_size:
+                                break
+                    else:
+                        # sync generators may block, pull them on the worker pool
+                        chunk = await loop.run_in_executor(self._executor, lambda: list(itertools.islice(data, chunk_size)))
+                    if not chunk:
+                        break
+                    if not await stream_credit.acquire(self.server_config.stream_idle_timeout / 1000):
+                        if stream_credit.cancelled:
+                            return
+                        end = self._stalled_stream_response()
+                        break
+                    yield self._encode_response(request_message, {'data': chunk}, ProtocolConstants.STREAM_CHUNK_TYPE)
+            except Exception as e:
+                end = {
                     'status': 'error',
-                    'message': f'Method not found: {method_name}'
+                    'message': str(e)
                 }
+            yield self._encode_response(request_message, end, ProtocolConstants.STREAM_END_TYPE)
+        finally:
+            self._streams.pop(key, None)
+            if inspect.isasyncgen(data):
+                await data.aclose()
+            else:
+                data.close()
+
+    def _decode_credit(self, credit_message: ProtocolMessage) -> int:
+        serializer = SerializerFactory.get_serializer(credit_message.serializer_type)
+        return int(serializer.deserialize(credit_message.body, dict).get('credit', 0))
+
+    def _grant_stream_credit(self, connection: Connection, credit_message: ProtocolMessage):
+        with self._streams_lock:
+            stream_credit = self._streams.get((connection, credit_message.request_id))
+        if stream_credit is None:
+            return
+        credit = self._decode_credit(credit_message)
+        # a negative credit cancels the stream
+        if credit < 0:
+            stream_credit.cancel()
+        else:
+            stream_credit.grant(credit)
+
+    async def _grant_stream_credit_async(self, connection: Any, credit_message: ProtocolMessage):
+        stream_credit = self._streams.get((connection, credit_message.request_id))
+        if stream_credit is None:
+            return
+        credit = self._decode_credit(credit_message)
+        if credit < 0:
+            await stream_credit.cancel()
+        else:
+            await stream_credit.grant(credit)
+
+    def _cancel_streams(self, connection: Connection):
+        with self._streams_lock:
+            streams = [stream for key, stream in self._streams.items() if key[0] is connection]
+        for stream_credit in streams:
+            stream_credit.cancel()
+
+    async def _cancel_streams_async(self, connection: Any):
+        streams = [stream for key, stream in list(self._streams.items()) if key[0] is connection]
+        for stream_credit in streams:
+            await stream_credit.cancel()
+
+    def _resolve_method(self, request: dict):
+        """
+        Find the service method of a request, return (entry, args, kwargs)
+        """
+        entry = self._dispatch_table.resolve(request)
+        args = request.get('args') or []
+        kwargs = request.get('kwargs') or {}
+        if entry.args_decoder is not None:
+            args, kwargs = entry.args_decoder(args, kwargs)
+        return entry, args, kwargs
+
+    def _compose_chains(self) -> None:
+        """
+        Compose the interceptor chain of each method, the asyncio server awaits its chains
+        """
+        self._chains = {}
+        if not self._interceptors:
+            return
+        for entry in self._dispatch_table.entries():
+            if self.server_config.mode == 'asyncio':
+                chain = InterceptorChain.compose_async(
+                    self._interceptors, entry.service_name, entry.method_name, self._proceed_async
+                )
+            else:
+                chain = InterceptorChain.compose(self._interceptors, entry.service_name, entry.method_name, self._proceed)
+            if chain is not None:
+                self._chains[entry.method_id] = chain
+
+    def _get_context(self, request_message: ProtocolMessage, request: dict, received: Optional[float]):
+        """
+        Interceptor chain of the method of a request and the context to call it with,
+        None when the method has no chain or does not resolve
+        """
+        try:
+            entry = self._dispatch_table.resolve(request)
+        except LookupError:
+            return None
+        chain = self._chains.get(entry.method_id)
+        if chain is None:
+            return None
+        return chain, CallContext(
+            entry.service_name,
+            entry.method_name,
+            request,
+            message=request_message,
+            message_type=request_message.message_type,
+            received=received
+        )
+
+    def _dispatch(self, request_message: ProtocolMessage, request: dict, received: Optional[float] = None):
+        """
+        Process a request through the interceptors of its method, if it has any
+        """
+        if self._chains:
+            intercepted = self._get_context(request_message, request, received)
+            if intercepted is not None:
+                chain, context = intercepted
+                try:
+                    return chain(context)
+                except Exception as e:
+                    # an interceptor rejecting a call by raising
+                    return {
+                        'status': 'error',
+                        'message': str(e)
+                    }
+        return self._process_request(request, received)
+
+    async def _dispatch_async(self, request_message: ProtocolMessage, request: dict, received: Optional[float] = None):
+        if self._chains:
+            intercepted = self._get_context(request_message, request, received)
+            if intercepted is not None:
+                chain, context = intercepted
+                try:
+                    return await chain(context)
+                except Exception as e:
+                    return {
+                        'status': 'error',
+                        'message': str(e)
+                    }
+        return await self._process_request_async(request, received)
+
+    def _proceed(self, context: CallContext) -> dict:
+        """
+        End of every interceptor chain: run the method. Identical requests of a pure
+        method are coalesced here, behind the interceptors, so each of them passes
+        its chain. They share the response dict rather than its encoding.
+        """
+        memo_ttl = self._get_coalesced_memo_ttl(context)
+        if memo_ttl is None:
+            return self._process_request(context.request, context.received)
+        return dict(self._coalescer.run(
+            self._get_coalesce_key(context.message, context.request),
+            lambda: self._share(self._collect(self._process_request(context.request, context.received))),
+            memo_ttl / 1000
+        ))
+
+    async def _proceed_async(self, context: CallContext) -> dict:
+        memo_ttl = self._get_coalesced_memo_ttl(context)
+        if memo_ttl is None:
+            return await self._process_request_async(context.request, context.received)
+
+        async def produce():
+            return self._share(await self._collect_async(await self._process_request_async(context.request, context.received)))
+
+        return dict(await self._coalescer.run_async(
+            self._get_coalesce_key(context.message, context.request),
+            produce,
+            memo_ttl / 1000
+        ))
+
+    def _get_coalesced_memo_ttl(self, context: CallContext) -> Optional[int]:
+        # calls of a batch are never coalesced, their message is the whole batch
+        if context.message_type != ProtocolConstants.REQUEST_TYPE:
+            return None
+        return self._get_memo_ttl(context.request)
 
-            result = method(*args, **kwargs)
+    @staticmethod
+    def _share(response: dict) -> Tuple[dict, bool]:
+        return response, response.get('status') == 'success'
+
+    def _intercepted(self, request: dict) -> bool:
+        """
+        Whether the method of a request has an interceptor chain
+        """
+        if not self._chains:
+            return False
+        try:
+            return self._dispatch_table.resolve(request).method_id in self._chains
+        except LookupError:
+            return False
+
+    def _process_request(self, request: dict, received: Optional[float] = None):
+        try:
+            entry, args, kwargs = self._resolve_method(request)
+        except Exception as e:
+            return self._error_response(e)
+        metrics = self.metrics.get(MetricsRegistry.PROVIDER, entry.service_name, entry.method_name)
+        metrics.on_call_start()
+        start = time.monotonic()
+        response = None
+        try:
+            response = self._execute(entry, args, kwargs, request, received)
+            return response
+        finally:
+            end = time.monotonic()
+            # latency counts from receipt, time spent queued included
+            metrics.on_call_end(
+                end - (start if received is None else received),
+                response is None or response.get('status') == 'error',
+                execute=end - start
+            )
+
+    def _execute(self, entry: MethodEntry, args, kwargs, request: dict, received: Optional[float]) -> dict:
+        if self._expired(request, received):
+            return self._deadline_exceeded_response()
+        service_name = entry.service_name
+        if not self._admission.try_enter(service_name):
+            return self._overloaded_response(f'concurrency limit of {service_name} reached')
+        deadline = self._get_deadline(request, received)
+        try:
+            if self._in_process(service_name):
+                result = self._submit_to_process(entry, args, kwargs, deadline).result()
+            else:
+                # calls the method makes inherit what is left of the deadline
+                with deadline_scope(deadline):
+                    result = entry.method(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        result = asyncio.run(result)
+            return {
+                'status': 'success',
+                'data': result
+            }
+
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e)
+            }
+        finally:
+            self._admission.leave(service_name)
+
+    async def _process_request_async(self, request: dict, received: Optional[float] = None):
+        try:
+            entry, args, kwargs = self._resolve_method(request)
+        except Exception as e:
+            return self._error_response(e)
+        metrics = self.metrics.get(MetricsRegistry.PROVIDER, entry.service_name, entry.method_name)
+        metrics.on_call_start()
+        start = time.monotonic()
+        response = None
+        try:
+            response = await self._execute_async(entry, args, kwargs, request, received)
+            return response
+        finally:
+            end = time.monotonic()
+            metrics.on_call_end(
+                end - (start if received is None else received),
+                response is None or response.get('status') == 'error',
+                execute=end - start
+            )
+
+    async def _execute_async(self, entry: MethodEntry, args, kwargs, request: dict, received: Optional[float]) -> dict:
+        if self._expired(request, received):
+            return self._deadline_exceeded_response()
+        service_name = entry.service_name
+        if not self._admission.try_enter(service_name):
+            return self._overloaded_response(f'concurrency limit of {service_name} reached')
+        deadline = self._get_deadline(request, received)
+        try:
+            if self._in_process(service_name):
+                result = await asyncio.wrap_future(self._submit_to_process(entry, args, kwargs, deadline))
+            else:
+                with deadline_scope(deadline):
+                    if entry.is_coroutine:
+                        result = await entry.method(*args, **kwargs)
+                    else:
+                        loop = asyncio.get_running_loop()
+                        # run_in_executor does not carry the context, the deadline has to be passed along
+                        call = functools.partial(contextvars.copy_context().run, entry.method, *args, **kwargs)
+                        result = await loop.run_in_executor(self._executor, call)
+                        if inspect.isawaitable(result):
+                            result = await result
             return {
                 'status': 'success',
                 'data': result
@@ -162,8 +1027,109 @@ class ProviderBootstrap:
                 'status': 'error',
                 'message': str(e)
             }
+        finally:
+            self._admission.leave(service_name)
+
+    def _record_transfer(self,
+                         request: dict,
+                         request_message: ProtocolMessage,
+                         response_message: Optional[ProtocolMessage],
+                         serialize: float):
+        """
+        Bytes and serialization time of a request, and of its response unless streamed
+        """
+        try:
+            entry = self._dispatch_table.resolve(request)
+        except LookupError:
+            return
+        self.metrics.get(MetricsRegistry.PROVIDER, entry.service_name, entry.method_name).record_transfer(
+            request_message.size,
+            response_message.size if response_message is not None else 0,
+            serialize=serialize
+        )
+
+    def _in_process(self, service_name: str) -> bool:
+        return self._process_pool is not None and self.providers[service_name].executor == 'process'
+
+    def _submit_to_process(self, entry: MethodEntry, args, kwargs, deadline: Optional[float] = None) -> Future:
+        return self._process_pool.submit(
+            _call_in_process,
+            entry.service_name,
+            entry.method_name,
+            args,
+            kwargs,
+            deadline
+        )
+
+    @staticmethod
+    def _get_deadline(request: dict, received: Optional[float]) -> Optional[float]:
+        """
+        Local deadline of a request from the ms its consumer had left when sending it
+        """
+        timeout = request.get('timeout')
+        if timeout is None:
+            return None
+        return (time.monotonic() if received is None else received) + timeout / 1000
+
+    def _expired(self, request: dict, received: Optional[float]) -> bool:
+        deadline = self._get_deadline(request, received)
+        return deadline is not None and time.monotonic() >= deadline
+
+    @staticmethod
+    def _overloaded_response(reason: str) -> dict:
+        return {
+            'status': 'error',
+            'code': OverloadedError.code,
+            'message': f'Server overloaded: {reason}'
+        }
+
+    @staticmethod
+    def _error_response(error: Exception) -> dict:
+        response = {
+            'status': 'error',
+            'message': str(error)
+        }
+        if isinstance(error, RpcError):
+            response['code'] = error.code
+        return response
+
+    @staticmethod
+    def _deadline_exceeded_response() -> dict:
+        return {
+            'status': 'error',
+            'code': DeadlineExceededError.code,
+            'message': 'Deadline exceeded before the request was executed'
+        }
+
+    def _stalled_stream_response(self) -> dict:
+        return {
+            'status': 'error',
+            'message': f'No stream credit from the consumer for {self.server_config.stream_idle_timeout} ms'
+        }
 
     def _stop_rpc_server(self):
         self.running = False
-        self.server_socket.close()
-        self.server_thread.join()
+        if self._async_server:
+            self._async_server.stop()
+            self._async_server = None
+        for server_socket in self._server_sockets:
+            try:
+                # wake up the thread blocked in accept()
+                server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server_socket.close()
+        for server_thread in self._server_threads:
+            server_thread.join()
+        with self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        self._server_sockets.clear()
+        self._server_threads.clear()
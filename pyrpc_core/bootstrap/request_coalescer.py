@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class RequestCoalescer:
+    """
+    Single flight for pure methods: identical concurrent requests share one
+    execution and its encoded response. Responses produced with a memo ttl
+    are also reused until it expires, at most max_memo of them.
+    Only responses that may be shared are handed to the waiters: when the call
+    failed for its own caller, such as past its deadline, each waiter runs it again.
+    """
+
+    def __init__(self, max_memo: int = 1024):
+        self.max_memo = max_memo
+        self._flights: Dict[Any, Future] = {}
+        # key -> (expiry time, value), oldest first
+        self._memo: 'OrderedDict[Any, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key: Any, produce: Callable[[], Tuple[Any, bool]], memo_ttl: float = 0) -> Any:
+        """
+        Return the value of key, calling produce() unless an identical call is
+        running or memoized. produce returns (value, whether it may be shared and memoized).
+        """
+        value, future, owner = self._join(key)
+        if future is None:
+            return value
+        if not owner:
+            value, shared = future.result()
+            return value if shared else produce()[0]
+        try:
+            value, shared = produce()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._finish(key, future, value, shared, memo_ttl)
+        return value
+
+    async def run_async(self, key: Any, produce: Callable[[], Awaitable[Tuple[Any, bool]]], memo_ttl: float = 0) -> Any:
+        value, future, owner = self._join(key)
+        if future is None:
+            return value
+        if not owner:
+            value, shared = await asyncio.wrap_future(future)
+            return value if shared else (await produce())[0]
+        try:
+            value, shared = await produce()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._finish(key, future, value, shared, memo_ttl)
+        return value
+
+    def _join(self, key: Any) -> Tuple[Any, Any, bool]:
+        """
+        (memoized value, None, False), (None, running call, False) or (None, new call, True)
+        """
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None:
+                if memo[0] > time.monotonic():
+                    return memo[1], None, False
+                del self._memo[key]
+            future = self._flights.get(key)
+            if future is not None:
+                return None, future, False
+            future = self._flights[key] = Future()
+            return None, future, True
+
+    def _finish(self, key: Any, future: Future, value: Any, shared: bool, memo_ttl: float) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+            if shared and memo_ttl and self.max_memo:
+                now = time.monotonic()
+                self._memo[key] = (now + memo_ttl, value)
+                while self._memo:
+                    oldest_key, (expiry, _) = next(iter(self._memo.items()))
+                    if expiry > now and len(self._memo) <= self.max_memo:
+                        break
+                    del self._memo[oldest_key]
+        future.set_result((value, shared))
+
+    def _fail(self, key: Any, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        future.set_exception(error)
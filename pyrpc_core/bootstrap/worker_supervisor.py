@@ -0,0 +1,108 @@
+import multiprocessing
+import socket
+import threading
+from typing import Any, List, Tuple
+
+STATS_INTERVAL = 1.0 # seconds between two stats reports of a worker
+# counters every worker reports, in slot order
+WORKER_STATS = ('pending', 'requests', 'rejected')
+
+
+class WorkerSupervisor:
+    """
+    Runs a provider as forked worker processes that each bind the service
+    ports with SO_REUSEPORT, so the kernel spreads connections over them and
+    CPU bound services use every core. Registration stays with the supervising
+    process; workers that die are restarted.
+    """
+
+    def __init__(self, bootstrap, workers: int):
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise ValueError('Multiple provider workers need SO_REUSEPORT, which this platform lacks')
+        self.bootstrap = bootstrap
+        self.workers = workers
+        self.restarts = 0
+        self._context = multiprocessing.get_context('fork')
+        # (process, shared stats slot) per worker index
+        self._workers: List[Tuple[Any, Any]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._monitor = None
+
+    def start(self) -> None:
+        with self._lock:
+            self._workers = [self._start_worker(index) for index in range(self.workers)]
+        self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._monitor:
+            self._monitor.join()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        # signal every worker first so they drain in parallel
+        for process, _ in workers:
+            process.terminate()
+        for worker in workers:
+            self._join_worker(worker)
+
+    def restart(self) -> None:
+        """
+        Replace the workers one at a time: each new worker is listening before
+        the old one stops accepting and drains, so no connection is refused
+        """
+        with self._lock:
+            for index, old in enumerate(list(self._workers)):
+                self._workers[index] = self._start_worker(index)
+                old[0].terminate()
+                self._join_worker(old)
+
+    def stats(self) -> dict:
+        """
+        Counters summed over the live workers, with the counters of each worker.
+        They are reported every STATS_INTERVAL, and start over when a worker restarts.
+        """
+        with self._lock:
+            workers = list(self._workers)
+        per_worker = [
+            dict(zip(WORKER_STATS, slot[:]), pid=process.pid, alive=process.is_alive())
+            for process, slot in workers
+        ]
+        totals = {name: sum(worker[name] for worker in per_worker) for name in WORKER_STATS}
+        return dict(totals, restarts=self.restarts, workers=per_worker)
+
+    def _start_worker(self, index: int) -> Tuple[Any, Any]:
+        slot = self._context.Array('q', len(WORKER_STATS), lock=False)
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=self.bootstrap._run_worker,
+            args=(slot, ready),
+            name=f'pyrpc-worker-{index}',
+            daemon=True
+        )
+        process.start()
+        while not ready.wait(0.1):
+            if not process.is_alive():
+                raise RuntimeError(f'Provider worker {index} exited during startup: {process.exitcode}')
+        return process, slot
+
+    def _join_worker(self, worker: Tuple[Any, Any]) -> None:
+        process, _ = worker
+        process.join(self.bootstrap.server_config.shutdown_grace / 1000 + 5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _monitor_loop(self) -> None:
+        while not self._stopped.wait(0.5):
+            with self._lock:
+                for index, (process, _) in enumerate(self._workers):
+                    if process.is_alive() or self._stopped.is_set():
+                        continue
+                    print(f'Provider worker {process.pid} exited with {process.exitcode}, restarting')
+                    try:
+                        self._workers[index] = self._start_worker(index)
+                        self.restarts += 1
+                    except RuntimeError as e:
+                        print(f'Error restarting provider worker: {e}')
@@ -0,0 +1,9 @@
+from .cacheable import cacheable
+from .pure import pure
+from .result_cache import ResultCache
+
+__all__ = [
+    'cacheable',
+    'pure',
+    'ResultCache'
+]
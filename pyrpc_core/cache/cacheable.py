@@ -0,0 +1,21 @@
+from typing import Callable, Optional
+from ..config.cache_config import CacheConfig
+
+# attribute of an interface method holding its CacheConfig
+CACHE_CONFIG_ATTR = '__pyrpc_cache__'
+
+
+def cacheable(func: Optional[Callable] = None, *, ttl: int = 60000, max_entries: int = 1024, max_bytes: int = 0):
+    """
+    Mark a method of a service interface as idempotent, so consumer proxies
+    cache its results. Use as @cacheable or @cacheable(ttl=..., ...).
+    """
+    def decorate(method: Callable) -> Callable:
+        setattr(method, CACHE_CONFIG_ATTR, CacheConfig(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes))
+        return method
+
+    return decorate(func) if func is not None else decorate
+
+
+def get_cache_config(method: Callable) -> Optional[CacheConfig]:
+    return getattr(method, CACHE_CONFIG_ATTR, None)
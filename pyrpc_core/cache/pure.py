@@ -0,0 +1,25 @@
+from typing import Callable, Optional
+
+# attribute of a service method holding its memo ttl in ms
+PURE_ATTR = '__pyrpc_pure__'
+
+
+def pure(func: Optional[Callable] = None, *, memo_ttl: int = 0):
+    """
+    Mark a provider method as pure: its result depends only on its arguments.
+    Identical concurrent requests then share one execution and its encoded
+    response, which is reused for memo_ttl ms afterwards when set.
+    Use as @pure or @pure(memo_ttl=...).
+    """
+    def decorate(method: Callable) -> Callable:
+        setattr(method, PURE_ATTR, memo_ttl)
+        return method
+
+    return decorate(func) if func is not None else decorate
+
+
+def get_memo_ttl(method: Callable) -> Optional[int]:
+    """
+    Memo ttl of a method marked @pure, None when it is not pure
+    """
+    return getattr(method, PURE_ATTR, None)
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..config.cache_config import CacheConfig
+
+
+class ResultCache:
+    """
+    LRU cache of the results of one idempotent method, bounded by entry count
+    and by the serialized size of the results, entries expire after the ttl.
+    Concurrent misses of one key share a single remote call; errors are not cached.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, config: CacheConfig, size_of: Optional[Callable[[Any], int]] = None):
+        self.config = config
+        self._size_of = size_of if config.max_bytes else None
+        # key -> (expiry time, size, result), least recently used first
+        self._entries: 'OrderedDict[Any, Tuple[float, int, Any]]' = OrderedDict()
+        self._in_flight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0 # misses that waited for the call of another caller
+        self.evictions = 0
+        self.bytes = 0
+
+    def get_or_load(self, key: Any, load: Callable[[], Any]) -> Any:
+        hit, value, future = self._lookup(key)
+        if hit:
+            return value
+        if future is not None:
+            return future.result()
+        return self._load(key, load)
+
+    async def get_or_load_async(self, key: Any, load: Callable[[], Awaitable[Any]]) -> Any:
+        hit, value, future = self._lookup(key)
+        if hit:
+            return value
+        if future is not None:
+            return await asyncio.wrap_future(future)
+        future = self._in_flight[key]
+        try:
+            value = await load()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, value, future)
+        return value
+
+    def invalidate(self, key: Any = None) -> None:
+        """
+        Drop one key, or every entry when no key is given
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.bytes = 0
+            elif key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes
+            }
+
+    def _lookup(self, key: Any) -> Tuple[bool, Any, Optional[Future]]:
+        """
+        (True, result, None) on a hit, (False, None, future) when another caller
+        is loading the key, (False, None, None) when the caller has to load it
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[2], None
+                self.bytes -= self._entries.pop(key)[1]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, None, future
+            self.misses += 1
+            self._in_flight[key] = Future()
+            return False, None, None
+
+    def _load(self, key: Any, load: Callable[[], Any]) -> Any:
+        future = self._in_flight[key]
+        try:
+            value = load()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, value, future)
+        return value
+
+    def _store(self, key: Any, value: Any, future: Future) -> None:
+        size = self._size_of(value) if self._size_of else 0
+        with self._lock:
+            self._in_flight.pop(key, None)
+            max_bytes = self.config.max_bytes
+            if not max_bytes or size <= max_bytes:
+                self._entries[key] = (time.monotonic() + self.config.ttl / 1000, size, value)
+                self.bytes += size
+                while len(self._entries) > self.config.max_entries or (max_bytes and self.bytes > max_bytes):
+                    _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                    self.bytes -= evicted_size
+                    self.evictions += 1
+        future.set_result(value)
+
+    def _fail(self, key: Any, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
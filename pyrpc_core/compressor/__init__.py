@@ -0,0 +1,11 @@
+from .compressor import Compressor
+from .gzip_compressor import GzipCompressor
+from .zlib_compressor import ZlibCompressor
+from .compressor_factory import CompressorFactory
+
+__all__ = [
+    'Compressor',
+    'CompressorFactory',
+    'GzipCompressor',
+    'ZlibCompressor'
+]
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+
+class Compressor(ABC):
+    """
+    Base class for all compressors
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
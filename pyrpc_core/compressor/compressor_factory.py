@@ -0,0 +1,65 @@
+from typing import Dict
+from .compressor import Compressor
+from ..protocol.protocol_constants import ProtocolConstants
+from .gzip_compressor import GzipCompressor
+from .zlib_compressor import ZlibCompressor
+
+
+class CompressorFactory:
+    """
+    Factory class for creating compressors
+    """
+
+    _compressors: Dict[int, Compressor] = {}
+
+    _compressor_names: Dict[str, int] = {
+        'none': ProtocolConstants.COMPRESSOR_NONE,
+        'gzip': ProtocolConstants.COMPRESSOR_GZIP,
+        'zlib': ProtocolConstants.COMPRESSOR_ZLIB
+    }
+
+    @classmethod
+    def get_compressor(cls, compressor_type: int) -> Compressor:
+        """
+        Get a compressor instance by its type
+        """
+        if compressor_type not in cls._compressors:
+            if compressor_type == ProtocolConstants.COMPRESSOR_GZIP:
+                cls._compressors[compressor_type] = GzipCompressor()
+            elif compressor_type == ProtocolConstants.COMPRESSOR_ZLIB:
+                cls._compressors[compressor_type] = ZlibCompressor()
+            else:
+                raise ValueError(f'Unsupported compressor type: {compressor_type}')
+        return cls._compressors[compressor_type]
+
+    @classmethod
+    def get_compressor_type(cls, compressor_name: str) -> int:
+        """
+        Get a compressor type by its name, as used by RpcConfig.compressor_type
+        """
+        compressor_type = cls._compressor_names.get(compressor_name.lower())
+        if compressor_type is None:
+            raise ValueError(f'Unsupported compressor: {compressor_name}')
+        return compressor_type
+
+    @classmethod
+    def compress(cls, compressor_type: int, body: bytes, threshold: int):
+        """
+        Compress a body of at least threshold bytes, return (compressor type, body).
+        Bodies that are small or do not shrink are sent as they are.
+        """
+        if compressor_type == ProtocolConstants.COMPRESSOR_NONE or len(body) < threshold:
+            return ProtocolConstants.COMPRESSOR_NONE, body
+        compressed = cls.get_compressor(compressor_type).compress(body)
+        if len(compressed) >= len(body):
+            return ProtocolConstants.COMPRESSOR_NONE, body
+        return compressor_type, compressed
+
+    @classmethod
+    def decompress(cls, compressor_type: int, body: bytes) -> bytes:
+        """
+        Decompress a body according to the compressor type of its header
+        """
+        if compressor_type == ProtocolConstants.COMPRESSOR_NONE or not body:
+            return body
+        return cls.get_compressor(compressor_type).decompress(body)
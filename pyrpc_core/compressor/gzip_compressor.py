@@ -0,0 +1,14 @@
+import gzip
+from .compressor import Compressor
+
+
+class GzipCompressor(Compressor):
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
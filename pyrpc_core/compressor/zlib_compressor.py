@@ -0,0 +1,18 @@
+import zlib
+from .compressor import Compressor
+
+
+class ZlibCompressor(Compressor):
+    """
+    zlib stream: a 2 byte zlib header and Adler-32 trailer instead of the
+    larger gzip ones, and a fast level by default
+    """
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
@@ -1,7 +1,17 @@
+from .cache_config import CacheConfig
+from .circuit_breaker_config import CircuitBreakerConfig
 from .registry_config import RegistryConfig
+from .retry_config import RetryConfig
 from .rpc_config import RpcConfig
+from .server_config import ServerConfig
+from .transport_config import TransportConfig
 
 __all__ = [
+    'CacheConfig',
+    'CircuitBreakerConfig',
     'RegistryConfig',
-    'RpcConfig'
+    'RetryConfig',
+    'RpcConfig',
+    'ServerConfig',
+    'TransportConfig'
 ]
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheConfig:
+    """
+    Consumer side cache of the results of one idempotent method
+    """
+    ttl: int = 60000 # ms a result is served from the cache
+    max_entries: int = 1024
+    max_bytes: int = 0 # serialized size of the cached results, 0 for no limit
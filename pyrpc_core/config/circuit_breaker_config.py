@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """
+    Consumer side circuit breaking and outlier ejection per service instance
+    """
+    enabled: bool = True
+    window_size: int = 100 # latest calls the error rate and latency percentile are taken over
+    min_calls: int = 20 # calls in the window before the breaker may open
+    error_rate: float = 0.5 # failed fraction of the window that opens the breaker
+    slow_call_latency: int = 0 # ms the latency percentile may reach before the breaker opens, 0 disables
+    latency_percentile: float = 0.99
+    open_duration: int = 30000 # ms an open breaker refuses calls before letting trial calls through
+    half_open_calls: int = 5 # successful trial calls that close the breaker again
+    consecutive_errors: int = 5 # failures in a row that eject an instance, 0 disables ejection
+    ejection_duration: int = 30000 # ms, multiplied by the number of times the instance was ejected
+    max_ejection_duration: int = 300000 # ms
+    max_ejection_percent: int = 50 # of the instances of a service that may be ejected at once
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RetryConfig:
+    """
+    Retries and hedged requests of a consumer, RpcConfig.retries bounds the retries of each call
+    """
+    backoff: int = 20 # ms, upper bound of the jittered wait before the first retry, doubled for each next one
+    max_backoff: int = 1000 # ms
+    # retries and hedges allowed per call made, plus min_retries_per_second
+    # whatever the traffic so a quiet service can still retry
+    budget_ratio: float = 0.2
+    min_retries_per_second: float = 10
+    hedge: bool = False # duplicate idempotent calls slower than usual to a second instance
+    hedge_percentile: float = 0.95 # latency percentile of a method after which its calls are hedged
+    hedge_min_samples: int = 20 # calls of a method before its percentile is trusted
+    latency_window: int = 100 # latest latencies per method the percentile is computed on
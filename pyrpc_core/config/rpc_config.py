@@ -12,8 +12,17 @@ class RpcConfig:
     service_name: str
     version: str = '1.0.0'
     group: str = 'default'
-    timeout: int = 5000
+    timeout: int = 5000 # ms from the call to its response, 0 leaves it to the transport read_timeout
     retries: int = 2
     serializer_type: str = 'yaml'
+    compressor_type: str = 'none'
+    compress_threshold: int = 4096 # bytes, smaller bodies are not compressed
     load_balance: str = 'random'
+    # coalesce concurrent calls into batches of up to batch_size calls, or of the
+    # calls made within batch_window ms of the first one; 0 disables either limit,
+    # a partial batch waits a few ms at most when only batch_size is set; a call
+    # the batch failed is retried on its own under the retry policy, never hedged
+    batch_size: int = 0
+    batch_window: int = 0 # ms
+    method_timeouts: Dict[str, int] = field(default_factory=dict) # ms by method name, overriding timeout
     extensions: Dict[str, Any] = field(default_factory=dict)
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ServerConfig:
+    """
+    Provider side server configuration
+    """
+    mode: str = 'thread' # 'thread': one thread per connection, 'asyncio': one event loop for all connections
+    max_workers: int = 32 # threads running synchronous service methods
+    max_queue: int = 1024 # requests waiting for a busy worker before new ones are shed, -1 for no limit
+    process_workers: int = 0 # processes for services added with executor='process', 0 for one per CPU
+    backlog: int = 128
+    workers: int = 1 # provider processes, more than one share each port through SO_REUSEPORT
+    shutdown_grace: int = 10000 # ms a stopping worker waits for its in-flight requests
+    compressor_type: str = 'none' # for responses
+    compress_threshold: int = 4096 # bytes, smaller responses are not compressed
+    stream_chunk_size: int = 128 # items per chunk frame of a streaming response
+    stream_idle_timeout: int = 30000 # ms a stream waits for consumer credit before it is ended with an error
+    memo_size: int = 1024 # memoized responses of @pure methods
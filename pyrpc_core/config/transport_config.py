@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TransportConfig:
+    """
+    Consumer side transport configuration
+    """
+    connect_timeout: int = 10000 # ms
+    read_timeout: int = 10000 # ms
+    max_connections: int = 8 # per service instance
+    idle_timeout: int = 60000 # ms, idle pooled connections older than this are closed
+    health_check: bool = True # check pooled connections before handing them out
+    multiplex: bool = False # share one connection per instance between concurrent calls
+    stream_window: int = 8 # chunk frames a provider may send ahead of the consumer
@@ -0,0 +1,9 @@
+from .call_context import CallContext
+from .interceptor import Interceptor
+from .interceptor_chain import InterceptorChain
+
+__all__ = [
+    'CallContext',
+    'Interceptor',
+    'InterceptorChain'
+]
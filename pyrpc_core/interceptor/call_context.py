@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.protocol_message import ProtocolMessage
+from ..registry.registry import ServiceInstance
+
+
+@dataclass
+class CallContext:
+    """
+    One call as interceptors see it. On a consumer the request is encoded after
+    the interceptors before it, so changes to it are sent, and the messages are
+    set once proceed returns. On a provider the message is the one received.
+    """
+    service_name: str
+    method_name: str
+    request: dict # decoded request: args, kwargs and whatever interceptors add to it
+    message: Optional[ProtocolMessage] = None # raw request message
+    response_message: Optional[ProtocolMessage] = None # raw response message, consumer only
+    instance: Optional[ServiceInstance] = None # instance called, consumer only
+    attributes: Dict[str, Any] = field(default_factory=dict) # shared by the interceptors of the call
+    message_type: int = ProtocolConstants.REQUEST_TYPE
+    timeout: Optional[float] = None # s, consumer only
+    received: Optional[float] = None # time.monotonic() of receipt, provider only
@@ -0,0 +1,26 @@
+from typing import Any, Awaitable, Callable
+from .call_context import CallContext
+
+
+class Interceptor:
+    """
+    Base class of consumer and provider interceptors. intercept runs around a
+    call and returns its result, a consumer's decoded result or a provider's
+    response dict: it calls proceed(context) to pass the call on, or returns
+    without calling it to answer the call itself. The asyncio consumer and
+    provider call intercept_async instead.
+    A provider chain runs for every request of its method, those of a pure method
+    answered by a coalesced execution or a memoized response included.
+    """
+
+    def applies_to(self, service_name: str, method_name: str) -> bool:
+        """
+        Whether the interceptor is in the chain of a method, asked once at start()
+        """
+        return True
+
+    def intercept(self, context: CallContext, proceed: Callable[[CallContext], Any]) -> Any:
+        return proceed(context)
+
+    async def intercept_async(self, context: CallContext, proceed: Callable[[CallContext], Awaitable[Any]]) -> Any:
+        return await proceed(context)
@@ -0,0 +1,37 @@
+import functools
+from typing import Any, Awaitable, Callable, Optional, Sequence
+from .call_context import CallContext
+from .interceptor import Interceptor
+
+
+class InterceptorChain:
+    """
+    Composes the interceptors of a method around the call they intercept, once,
+    into a single callable. A method none of them applies to gets no chain, so
+    its calls skip the interceptors altogether.
+    """
+
+    @staticmethod
+    def compose(interceptors: Sequence[Interceptor],
+                service_name: str,
+                method_name: str,
+                terminal: Callable[[CallContext], Any]) -> Optional[Callable[[CallContext], Any]]:
+        return InterceptorChain._compose(interceptors, service_name, method_name, terminal, 'intercept')
+
+    @staticmethod
+    def compose_async(interceptors: Sequence[Interceptor],
+                      service_name: str,
+                      method_name: str,
+                      terminal: Callable[[CallContext], Awaitable[Any]]) -> Optional[Callable[[CallContext], Awaitable[Any]]]:
+        return InterceptorChain._compose(interceptors, service_name, method_name, terminal, 'intercept_async')
+
+    @staticmethod
+    def _compose(interceptors, service_name, method_name, terminal, hook):
+        applied = [interceptor for interceptor in interceptors if interceptor.applies_to(service_name, method_name)]
+        if not applied:
+            return None
+        call = terminal
+        # the first interceptor added is the outermost
+        for interceptor in reversed(applied):
+            call = functools.partial(getattr(interceptor, hook), proceed=call)
+        return call
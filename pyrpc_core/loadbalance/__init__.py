@@ -0,0 +1,22 @@
+from .load_balancer import LoadBalancer
+from .instance_stats import InstanceStats, InstanceStatsTracker
+from .random_load_balancer import RandomLoadBalancer
+from .round_robin_load_balancer import RoundRobinLoadBalancer
+from .weighted_random_load_balancer import WeightedRandomLoadBalancer
+from .least_active_load_balancer import LeastActiveLoadBalancer
+from .p2c_load_balancer import P2CLoadBalancer
+from .consistent_hash_load_balancer import ConsistentHashLoadBalancer
+from .load_balancer_factory import LoadBalancerFactory
+
+__all__ = [
+    'LoadBalancer',
+    'InstanceStats',
+    'InstanceStatsTracker',
+    'RandomLoadBalancer',
+    'RoundRobinLoadBalancer',
+    'WeightedRandomLoadBalancer',
+    'LeastActiveLoadBalancer',
+    'P2CLoadBalancer',
+    'ConsistentHashLoadBalancer',
+    'LoadBalancerFactory'
+]
@@ -0,0 +1,49 @@
+import bisect
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class ConsistentHashLoadBalancer(LoadBalancer):
+    """
+    Requests with the same value of one argument go to the same instance, and
+    only about 1/N of the keys move when an instance joins or leaves
+    """
+
+    def __init__(self, stats=None, hash_arg: int = 0, virtual_nodes: int = 160):
+        super().__init__(stats)
+        self.hash_arg = hash_arg # index of the positional argument used as key
+        self.virtual_nodes = virtual_nodes
+        self._ring_key: Tuple[str, ...] = ()
+        self._ring: List[Tuple[int, ServiceInstance]] = []
+        self._hashes: List[int] = []
+        self._lock = threading.Lock()
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        if not instances:
+            return None
+        hashes, ring = self._get_ring(instances)
+        args = request.get('args') or ()
+        key = str(args[self.hash_arg]) if len(args) > self.hash_arg else ''
+        index = bisect.bisect(hashes, self._hash(key)) % len(ring)
+        return ring[index][1]
+
+    def _get_ring(self, instances: List[ServiceInstance]):
+        ring_key = tuple(sorted(instance.get_address() for instance in instances))
+        with self._lock:
+            if ring_key != self._ring_key:
+                ring = []
+                for instance in instances:
+                    for i in range(self.virtual_nodes):
+                        ring.append((self._hash(f'{instance.get_address()}#{i}'), instance))
+                ring.sort(key=lambda node: node[0])
+                self._ring = ring
+                self._hashes = [node[0] for node in ring]
+                self._ring_key = ring_key
+            return self._hashes, self._ring
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
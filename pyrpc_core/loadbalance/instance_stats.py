@@ -0,0 +1,56 @@
+import threading
+from typing import Dict
+
+
+class InstanceStats:
+    """
+    Live call statistics of one service instance
+    """
+
+    # weight of the newest sample in the latency moving average
+    EWMA_ALPHA = 0.2
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency_ewma = 0.0 # seconds
+        self.calls = 0
+        self.errors = 0
+
+
+class InstanceStatsTracker:
+    """
+    Call statistics keyed by ServiceInstance.get_address(), fed by the consumer
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, InstanceStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, address: str) -> InstanceStats:
+        stats = self._stats.get(address)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(address, InstanceStats())
+        return stats
+
+    def on_call_start(self, address: str) -> None:
+        stats = self.get(address)
+        with self._lock:
+            stats.in_flight += 1
+
+    def on_call_end(self, address: str, latency: float, error: bool = False) -> None:
+        stats = self.get(address)
+        with self._lock:
+            stats.in_flight -= 1
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            if stats.calls == 1:
+                stats.latency_ewma = latency
+            else:
+                stats.latency_ewma += InstanceStats.EWMA_ALPHA * (latency - stats.latency_ewma)
+
+    def on_call_cancelled(self, address: str) -> None:
+        stats = self.get(address)
+        with self._lock:
+            stats.in_flight -= 1
@@ -0,0 +1,25 @@
+import random
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class LeastActiveLoadBalancer(LoadBalancer):
+    """
+    Select the instance with the fewest outstanding requests, ties are broken
+    by the lower average latency and then at random
+    """
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        if not instances:
+            return None
+        best = []
+        best_key = None
+        for instance in instances:
+            stats = self.stats.get(instance.get_address())
+            key = (stats.in_flight, stats.latency_ewma)
+            if best_key is None or key < best_key:
+                best, best_key = [instance], key
+            elif key == best_key:
+                best.append(instance)
+        return random.choice(best)
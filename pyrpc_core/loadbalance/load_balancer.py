@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .instance_stats import InstanceStatsTracker
+
+
+class LoadBalancer(ABC):
+    """
+    Base class for all load balancers
+    """
+
+    def __init__(self, stats: Optional[InstanceStatsTracker] = None):
+        self.stats = stats or InstanceStatsTracker()
+
+    @abstractmethod
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        """
+        Select one of the instances for the request, None if there is no instance
+        """
+        pass
+
+    @staticmethod
+    def get_weight(instance: ServiceInstance) -> int:
+        """
+        Weight of an instance from its 'weight' metadata, 100 by default
+        """
+        try:
+            return max(int(instance.metadata.get('weight', 100)), 0)
+        except (TypeError, ValueError):
+            return 100
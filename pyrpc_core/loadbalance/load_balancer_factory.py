@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+from .consistent_hash_load_balancer import ConsistentHashLoadBalancer
+from .instance_stats import InstanceStatsTracker
+from .least_active_load_balancer import LeastActiveLoadBalancer
+from .load_balancer import LoadBalancer
+from .p2c_load_balancer import P2CLoadBalancer
+from .random_load_balancer import RandomLoadBalancer
+from .round_robin_load_balancer import RoundRobinLoadBalancer
+from .weighted_random_load_balancer import WeightedRandomLoadBalancer
+
+
+class LoadBalancerFactory:
+    """
+    Factory class for creating load balancers from RpcConfig.load_balance
+    """
+
+    _load_balancer_types: Dict[str, type] = {
+        'random': RandomLoadBalancer,
+        'round_robin': RoundRobinLoadBalancer,
+        'weighted_random': WeightedRandomLoadBalancer,
+        'least_active': LeastActiveLoadBalancer,
+        'p2c': P2CLoadBalancer,
+        'consistent_hash': ConsistentHashLoadBalancer
+    }
+
+    @classmethod
+    def get_load_balancer(cls,
+                          load_balance: str,
+                          stats: Optional[InstanceStatsTracker] = None,
+                          **options) -> LoadBalancer:
+        """
+        Create a new load balancer, balancers keep per-service state so they are not shared
+        """
+        load_balancer_class = cls._load_balancer_types.get(load_balance.lower())
+        if not load_balancer_class:
+            raise ValueError(f'Unsupported load balance: {load_balance}')
+        return load_balancer_class(stats, **options)
@@ -0,0 +1,24 @@
+import random
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class P2CLoadBalancer(LoadBalancer):
+    """
+    Power of two choices: pick two instances at random and keep the less loaded,
+    load being the outstanding requests scaled by the average latency
+    """
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        if not instances:
+            return None
+        if len(instances) == 1:
+            return instances[0]
+        first, second = random.sample(instances, 2)
+        return first if self._load(first) <= self._load(second) else second
+
+    def _load(self, instance: ServiceInstance) -> float:
+        stats = self.stats.get(instance.get_address())
+        # an idle instance with no samples yet is as cheap as it gets
+        return (stats.in_flight + 1) * (stats.latency_ewma or 1e-6)
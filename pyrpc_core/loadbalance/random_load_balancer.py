@@ -0,0 +1,10 @@
+import random
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class RandomLoadBalancer(LoadBalancer):
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        return random.choice(instances) if instances else None
@@ -0,0 +1,16 @@
+import itertools
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class RoundRobinLoadBalancer(LoadBalancer):
+
+    def __init__(self, stats=None):
+        super().__init__(stats)
+        self._counter = itertools.count()
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        if not instances:
+            return None
+        return instances[next(self._counter) % len(instances)]
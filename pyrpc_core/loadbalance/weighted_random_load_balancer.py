@@ -0,0 +1,18 @@
+import random
+from typing import List, Optional
+from ..registry.registry import ServiceInstance
+from .load_balancer import LoadBalancer
+
+
+class WeightedRandomLoadBalancer(LoadBalancer):
+    """
+    Random selection proportional to the 'weight' metadata of the instances
+    """
+
+    def select(self, instances: List[ServiceInstance], request: dict) -> Optional[ServiceInstance]:
+        if not instances:
+            return None
+        weights = [self.get_weight(instance) for instance in instances]
+        if sum(weights) <= 0:
+            return random.choice(instances)
+        return random.choices(instances, weights=weights)[0]
@@ -0,0 +1,11 @@
+from .latency_histogram import LatencyHistogram
+from .method_metrics import MethodMetrics
+from .metrics_registry import MetricsRegistry
+from .prometheus_exporter import PrometheusExporter
+
+__all__ = [
+    'LatencyHistogram',
+    'MethodMetrics',
+    'MetricsRegistry',
+    'PrometheusExporter'
+]
@@ -0,0 +1,92 @@
+from typing import List, Tuple
+
+
+class LatencyHistogram:
+    """
+    HDR style histogram of durations in microseconds: exact below 32 us, then
+    16 log spaced buckets per power of two, so any recorded value is known
+    within 1/16. Recording is an index computation and an increment.
+    Not thread safe, the owner serializes updates.
+    """
+
+    SUB_BUCKETS = 16
+    # longer durations than 2**37 us, about 38 hours, fall in the last bucket
+    MAX_SHIFT = 32
+    BUCKET_COUNT = 2 * SUB_BUCKETS + MAX_SHIFT * SUB_BUCKETS
+
+    def __init__(self):
+        self.counts: List[int] = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.sum = 0.0 # seconds
+        self.max = 0.0 # seconds
+
+    @classmethod
+    def bucket_of(cls, micros: int) -> int:
+        if micros < 2 * cls.SUB_BUCKETS:
+            return max(0, micros)
+        # keep the five top bits of the value
+        shift = min(micros.bit_length() - 5, cls.MAX_SHIFT)
+        mantissa = min(micros >> shift, 2 * cls.SUB_BUCKETS - 1)
+        return 2 * cls.SUB_BUCKETS + (shift - 1) * cls.SUB_BUCKETS + mantissa - cls.SUB_BUCKETS
+
+    @classmethod
+    def bucket_bounds(cls, index: int) -> Tuple[int, int]:
+        """
+        [lower, upper) microseconds of a bucket
+        """
+        if index < 2 * cls.SUB_BUCKETS:
+            return index, index + 1
+        shift = (index - 2 * cls.SUB_BUCKETS) // cls.SUB_BUCKETS + 1
+        mantissa = (index - 2 * cls.SUB_BUCKETS) % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record(self, seconds: float) -> None:
+        self.counts[self.bucket_of(int(seconds * 1_000_000 + 0.5))] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, quantile: float) -> float:
+        """
+        Seconds below which the quantile of the recorded durations fall, 0 when empty
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, quantile * self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                lower, upper = self.bucket_bounds(index)
+                return min((lower + upper) / 2 / 1_000_000, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds: List[float]) -> List[int]:
+        """
+        Number of durations at or below each bound in seconds, at bucket precision
+        """
+        counts = []
+        index = 0
+        seen = 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            # a bucket holds the whole microseconds below its upper bound
+            while index < self.BUCKET_COUNT and self.bucket_bounds(index)[1] - 1 <= limit:
+                seen += self.counts[index]
+                index += 1
+            counts.append(seen)
+        return counts
+
+    def copy(self) -> 'LatencyHistogram':
+        histogram = LatencyHistogram()
+        histogram.merge(self)
+        return histogram
@@ -0,0 +1,69 @@
+import threading
+from typing import Dict
+from .latency_histogram import LatencyHistogram
+
+
+class MethodMetrics:
+    """
+    Counters, in-flight gauge, traffic and latency histograms of one method on
+    one side of the wire. Besides the total latency, the time of each phase of
+    a call (serialize, network, execute) has its own histogram.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = LatencyHistogram()
+        self.phases: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def on_call_start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def on_call_end(self, latency: float, error: bool = False, **phases: float) -> None:
+        """
+        End a call started with on_call_start, phases are durations in seconds by phase name
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            if error:
+                self.errors += 1
+            self.latency.record(latency)
+            self._record_phases(phases)
+
+    def on_call_cancelled(self) -> None:
+        """
+        End a call given up before it had an outcome, it is not counted
+        """
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_transfer(self, bytes_in: int, bytes_out: int, **phases: float) -> None:
+        with self._lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self._record_phases(phases)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'latency': self.latency.copy(),
+                'phases': {name: histogram.copy() for name, histogram in self.phases.items()}
+            }
+
+    def _record_phases(self, phases: Dict[str, float]) -> None:
+        for name, seconds in phases.items():
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = LatencyHistogram()
+            histogram.record(seconds)
@@ -0,0 +1,62 @@
+import threading
+from typing import Dict, Optional, Tuple
+from .method_metrics import MethodMetrics
+
+
+class MetricsRegistry:
+    """
+    Call metrics of the bootstraps of a process, keyed by side ('consumer' or
+    'provider'), service name and method name. Bootstraps share the default
+    registry unless given their own.
+    """
+
+    CONSUMER = 'consumer'
+    PROVIDER = 'provider'
+
+    _default: Optional['MetricsRegistry'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self._methods: Dict[Tuple[str, str, str], MethodMetrics] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'MetricsRegistry':
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def get(self, side: str, service_name: str, method_name: str) -> MethodMetrics:
+        key = (side, service_name, method_name)
+        metrics = self._methods.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._methods.setdefault(key, MethodMetrics())
+        return metrics
+
+    def snapshot(self) -> Dict[Tuple[str, str, str], dict]:
+        """
+        Consistent copy of the metrics of every method, histograms included
+        """
+        return {key: metrics.snapshot() for key, metrics in list(self._methods.items())}
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, dict]]]:
+        """
+        Counters and latency percentiles in seconds by side, service and method name
+        """
+        summary: Dict[str, Dict[str, Dict[str, dict]]] = {}
+        for (side, service_name, method_name), snapshot in self.snapshot().items():
+            latency = snapshot.pop('latency')
+            phases = snapshot.pop('phases')
+            snapshot.update({
+                'p50': latency.percentile(0.5),
+                'p99': latency.percentile(0.99),
+                'p999': latency.percentile(0.999),
+                'max': latency.max,
+                'phases': {name: {'p50': histogram.percentile(0.5), 'p99': histogram.percentile(0.99)}
+                           for name, histogram in phases.items()}
+            })
+            summary.setdefault(side, {}).setdefault(service_name, {})[method_name] = snapshot
+        return summary
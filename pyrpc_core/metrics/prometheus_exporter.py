@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from .metrics_registry import MetricsRegistry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class PrometheusExporter:
+    """
+    Metrics of a registry in the Prometheus text format, rendered on demand
+    or served at /metrics by start()
+    """
+
+    PREFIX = 'pyrpc'
+    # upper bounds in seconds of the exported histogram buckets
+    BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry.default()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def render(self) -> str:
+        snapshot = sorted(self.registry.snapshot().items())
+        lines: List[str] = []
+        for name, metric_type, description, field in (
+            ('calls_total', 'counter', 'Completed calls', 'calls'),
+            ('errors_total', 'counter', 'Calls that failed', 'errors'),
+            ('in_flight', 'gauge', 'Calls in progress', 'in_flight'),
+            ('received_bytes_total', 'counter', 'Bytes of the messages received', 'bytes_in'),
+            ('sent_bytes_total', 'counter', 'Bytes of the messages sent', 'bytes_out'),
+        ):
+            self._add_header(lines, name, metric_type, description)
+            for key, metrics in snapshot:
+                lines.append(f'{self.PREFIX}_{name}{{{self._labels(key)}}} {metrics[field]}')
+
+        self._add_header(lines, 'latency_seconds', 'histogram', 'Call latency')
+        for key, metrics in snapshot:
+            self._add_histogram(lines, 'latency_seconds', self._labels(key), metrics['latency'])
+        self._add_header(lines, 'phase_seconds', 'histogram', 'Time spent in each phase of a call')
+        for key, metrics in snapshot:
+            for phase, histogram in sorted(metrics['phases'].items()):
+                labels = f'{self._labels(key)},phase="{self._escape(phase)}"'
+                self._add_histogram(lines, 'phase_seconds', labels, histogram)
+        return '\n'.join(lines) + '\n'
+
+    def start(self, port: int, host: str = '0.0.0.0') -> 'PrometheusExporter':
+        """
+        Serve the metrics at http://host:port/metrics from a daemon thread
+        """
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _add_header(self, lines: List[str], name: str, metric_type: str, description: str):
+        lines.append(f'# HELP {self.PREFIX}_{name} {description}')
+        lines.append(f'# TYPE {self.PREFIX}_{name} {metric_type}')
+
+    def _add_histogram(self, lines: List[str], name: str, labels: str, histogram):
+        for bound, count in zip(self.BUCKETS, histogram.cumulative_counts(self.BUCKETS)):
+            lines.append(f'{self.PREFIX}_{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{self.PREFIX}_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{self.PREFIX}_{name}_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'{self.PREFIX}_{name}_count{{{labels}}} {histogram.count}')
+
+    def _labels(self, key) -> str:
+        side, service_name, method_name = key
+        return f'side="{side}",service="{self._escape(service_name)}",method="{self._escape(method_name)}"'
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,7 +1,12 @@
 from .protocol_constants import ProtocolConstants
 from .protocol_message import ProtocolMessage
+from .rpc_error import RpcError, OverloadedError, DeadlineExceededError, StaleMethodTableError
 
 __all__ = [
     'ProtocolConstants',
-    'ProtocolMessage'
-]
+    'ProtocolMessage',
+    'RpcError',
+    'OverloadedError',
+    'DeadlineExceededError',
+    'StaleMethodTableError'
+]
\ No newline at end of file
@@ -6,14 +6,28 @@ class ProtocolConstants:
     # Message type
     REQUEST_TYPE = 1
     RESPONSE_TYPE = 2
+    # streaming response: chunk frames then one end frame under the request id,
+    # the consumer grants the provider credit for more chunk frames
+    STREAM_CHUNK_TYPE = 3
+    STREAM_END_TYPE = 4
+    STREAM_CREDIT_TYPE = 5
+    # many calls in one request, answered by one response with their results in order
+    BATCH_REQUEST_TYPE = 6
+
+    # Error code of a response, sent with status 'error'
+    ERROR_OVERLOADED = 'overloaded'
+    ERROR_DEADLINE_EXCEEDED = 'deadline_exceeded'
+    ERROR_STALE_METHOD_TABLE = 'stale_method_table'
 
     # Serializer type
     SERIALIZER_JSON = 1
     SERIALIZER_YAML = 2
+    SERIALIZER_MSGPACK = 3
 
     # Compress type
     COMPRESSOR_NONE = 0
     COMPRESSOR_GZIP = 1
+    COMPRESSOR_ZLIB = 2
 
     # Protocol mask
     MAGIC_NUMBER = 0xCAFEBABE
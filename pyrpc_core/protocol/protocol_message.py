@@ -1,6 +1,10 @@
 import struct
 from dataclasses import dataclass
 from typing import Any
+from .protocol_constants import ProtocolConstants
+
+# > means big-endian, I is 4-byte unsigned int, bbbb are four 1-byte ints, Q is 8-byte unsigned int
+HEADER = struct.Struct('>IbbbbQI')
 
 
 @dataclass
@@ -17,6 +21,34 @@ class ProtocolMessage:
     body_length: int = None
     body: Any = None
 
+    @classmethod
+    def build(cls,
+              message_type: int,
+              request_id: int,
+              body: bytes,
+              serializer_type: int,
+              compressor_type: int = ProtocolConstants.COMPRESSOR_NONE) -> 'ProtocolMessage':
+        """
+        Build a message of the current protocol version around an encoded body
+        """
+        return cls(
+            magic_number=ProtocolConstants.MAGIC_NUMBER,
+            version=ProtocolConstants.VERSION,
+            serializer_type=serializer_type,
+            message_type=message_type,
+            compressor_type=compressor_type,
+            request_id=request_id,
+            body_length=len(body),
+            body=body
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Length of the message on the wire
+        """
+        return HEADER.size + (self.body_length or 0)
+
     def to_bytes(self) -> bytes:
         """
         Convert ProtocolMessage to bytes
@@ -28,8 +60,16 @@ class ProtocolMessage:
         | 1 byte       | 8 bytes       | 4 bytes         | variable    |
         +---------------+---------------+-----------------+-------------+
         """
-        header = struct.pack(
-            '>IbbbbQI', # > means big-endian, I is 4-byte unsigned int, bbbb are four 1-byte unsigned ints, Q is 8-byte unsigned int
+        header = self.header_bytes()
+        if self.body and self.body_length > 0:
+            return header + self.body
+        return header
+
+    def header_bytes(self) -> bytes:
+        """
+        Pack the header only, to send it together with the body without concatenating them
+        """
+        return HEADER.pack(
             self.magic_number,
             self.version,
             self.serializer_type,
@@ -39,27 +79,19 @@ class ProtocolMessage:
             self.body_length
         )
 
-        if self.body and self.body_length > 0:
-            return header + self.body
-        return header
-    
     @classmethod
     def from_bytes(cls, data:bytes) -> 'ProtocolMessage':
         """
-        Convert bytes to ProtocolMessage
+        Convert bytes to ProtocolMessage, the body is a memoryview into data
         """
-        # Read header
-        header_size = struct.calcsize('>IbbbbQI')
-        header = data[:header_size]
-
         # Unpack header
         magic_number, version, serializer_type, message_type, \
-        compressor_type, request_id, body_length = struct.unpack('>IbbbbQI', header)
+        compressor_type, request_id, body_length = HEADER.unpack_from(data)
 
         # Read body
         body = None
-        if body_length > 0:
-            body = data[header_size:header_size + body_length]
+        if body_length > 0 and len(data) > HEADER.size:
+            body = memoryview(data)[HEADER.size:HEADER.size + body_length]
 
         return cls(
             magic_number = magic_number,
@@ -74,4 +106,4 @@ class ProtocolMessage:
 
     @staticmethod
     def get_header_length() -> int:
-        return struct.calcsize('>IbbbbQI')
+        return HEADER.size
@@ -0,0 +1,48 @@
+from .protocol_constants import ProtocolConstants
+
+
+class RpcError(RuntimeError):
+    """
+    Error response of a provider carrying an error code
+    """
+
+    code: str = 'error'
+
+    @staticmethod
+    def from_response(response: dict) -> RuntimeError:
+        """
+        Build the exception for an error response, RuntimeError when it has no known code
+        """
+        message = response.get('message', 'Unknown error')
+        for error_type in RpcError.__subclasses__():
+            if error_type.code == response.get('code'):
+                return error_type(message)
+        return RuntimeError(message)
+
+
+class OverloadedError(RpcError):
+    """
+    The provider shed the request without executing it because it was over
+    its queue or concurrency limit, so it is safe to send elsewhere
+    """
+
+    code = ProtocolConstants.ERROR_OVERLOADED
+
+
+class DeadlineExceededError(RpcError):
+    """
+    The deadline of the call passed before it was sent, or before the provider
+    got to execute it, so the provider dropped it
+    """
+
+    code = ProtocolConstants.ERROR_DEADLINE_EXCEEDED
+
+
+class StaleMethodTableError(RpcError, LookupError):
+    """
+    The method ID of the request comes from a method table the provider no
+    longer has, as after a restart that reordered its methods. Nothing ran,
+    the call can be sent again naming its method.
+    """
+
+    code = ProtocolConstants.ERROR_STALE_METHOD_TABLE
@@ -7,12 +7,19 @@ class MemoryRegistry(Registry):
     """
     Memory registry is a simple in-memory registry for testing and development purposes.
     It is not suitable for production environments.
+    Registries created with the same address share their services, so a provider and
+    a consumer in the same process can find each other.
     """
 
+    # address -> service name -> instances
+    _stores: Dict[str, Dict[str, Set[ServiceInstance]]] = {}
+    # address -> service name -> listeners
+    _all_listeners: Dict[str, Dict[str, Set[Callable]]] = {}
+
     def __init__(self, config: RegistryConfig):
         super().__init__(config)
-        self._services: Dict[str, Set[ServiceInstance]] = {}
-        self._listeners: Dict[str, Set[Callable]] = {}
+        self._services = self._stores.setdefault(config.address, {})
+        self._listeners = self._all_listeners.setdefault(config.address, {})
         
     def register(self, service_instance: ServiceInstance) -> bool:
         service_name = service_instance.service_name
@@ -52,5 +59,5 @@ class MemoryRegistry(Registry):
         """
         if service_name in self._listeners:
             instances = self.list_instances(service_name)
-            for listener in self._listeners[service_name]:
-                listener(instances)
+            for listener in list(self._listeners[service_name]):
+                listener(service_name, instances)
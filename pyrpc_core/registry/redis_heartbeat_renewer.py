@@ -0,0 +1,76 @@
+import threading
+from typing import Dict, List
+
+
+class RedisHeartbeatRenewer:
+    """
+    One heartbeat thread per process and Redis address, shared by every RedisRegistry
+    of that address: each interval the heartbeats of all their registered instances
+    are renewed in one pipelined round trip, and expired instances are reaped once
+    if any of the registries asked for it.
+    """
+
+    _renewers: Dict[str, 'RedisHeartbeatRenewer'] = {}
+    _renewers_lock = threading.Lock()
+
+    def __init__(self, address: str):
+        self.address = address
+        self._registries: List = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @classmethod
+    def attach(cls, registry) -> 'RedisHeartbeatRenewer':
+        """
+        Renew the heartbeats of registry with the renewer of its address, started on first use
+        """
+        address = registry.config.address
+        with cls._renewers_lock:
+            renewer = cls._renewers.get(address)
+            if renewer is None:
+                renewer = cls._renewers[address] = cls(address)
+                renewer._registries.append(registry)
+                renewer._thread.start()
+            elif registry not in renewer._registries:
+                renewer._registries.append(registry)
+        return renewer
+
+    def detach(self, registry) -> None:
+        """
+        Stop renewing for registry, the last registry to detach stops the thread
+        """
+        with self._renewers_lock:
+            if registry in self._registries:
+                self._registries.remove(registry)
+            if self._registries or self._renewers.get(self.address) is not self:
+                return
+            del self._renewers[self.address]
+            self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self._get_interval()):
+            with self._renewers_lock:
+                registries = list(self._registries)
+            if not registries:
+                continue
+            try:
+                self._renew(registries)
+                reaper = next((registry for registry in registries if registry.reap_expired), None)
+                if reaper is not None:
+                    reaper._reap_expired_instances()
+            except Exception as e:
+                print(f'Failed to renew heartbeats: {e}')
+
+    def _get_interval(self) -> float:
+        with self._renewers_lock:
+            return min((registry.heartbeat_interval for registry in self._registries), default=1.0)
+
+    @staticmethod
+    def _renew(registries: List) -> None:
+        pipeline = registries[0]._redis.pipeline(transaction=False)
+        for registry in registries:
+            registry._queue_heartbeats(pipeline)
+        if len(pipeline):
+            pipeline.execute()
@@ -1,18 +1,33 @@
-import redis
 import json
+import random
+import threading
+import time
+import redis
+from .redis_heartbeat_renewer import RedisHeartbeatRenewer
 from .registry import Registry, ServiceInstance
 from .registry_config import RegistryConfig
-from typing import List, Callable, Optional
+from typing import Any, Dict, List, Callable, Optional, Set, Tuple
 
 
 class RedisRegistry(Registry):
     """
     Redis registry is a registry that uses Redis as the underlying storage.
+    Instance lists are cached on the client: register/unregister publish a change
+    event on the service channel that refreshes subscribed caches, and every cached
+    list expires after cache_ttl seconds in case an event is missed or an instance
+    stops heartbeating.
+    Instances registered through this registry have their heartbeat renewed by the
+    RedisHeartbeatRenewer thread of its address, shared with the other registries of
+    the process; with the reap_expired option the same thread also removes hash
+    entries whose heartbeat has expired.
     """
 
     SERVICE_PREFIX = 'pyrpc:service:'
     HEARTBEAT_PREFIX = 'pyrpc:heartbeat:'
+    CHANNEL_PREFIX = 'pyrpc:events:'
     SERVICE_TTL = 30
+    CACHE_TTL = 10
+    HEARTBEAT_INTERVAL = 10
 
     def __init__(self, config: RegistryConfig):
         super().__init__(config)
@@ -23,8 +38,21 @@ class RedisRegistry(Registry):
             password=config.password,
             decode_responses=True
         )
-        self._start_heartbeat_check()
-    
+        self.cache_ttl = float(self._get_option('cache_ttl', self.CACHE_TTL))
+        # service name -> (expire time, instances)
+        self._cache: Dict[str, Tuple[float, List[ServiceInstance]]] = {}
+        self._listeners: Dict[str, Set[Callable]] = {}
+        self._lock = threading.Lock()
+        self._pubsub = None
+        self._pubsub_thread = None
+        self.heartbeat_interval = float(self._get_option('heartbeat_interval', self.HEARTBEAT_INTERVAL))
+        self.reap_expired = bool(self._get_option('reap_expired', False))
+        # instance key -> instance registered by this process
+        self._registered: Dict[str, ServiceInstance] = {}
+        self._renewer: Optional[RedisHeartbeatRenewer] = None
+        if self.reap_expired:
+            self._start_heartbeat_check()
+
     def register(self, service_instance: ServiceInstance) -> bool:
         try:
             instance_key = self._get_instance_key(service_instance)
@@ -43,7 +71,11 @@ class RedisRegistry(Registry):
                 '1',
                 ex=self.SERVICE_TTL
             )
+            pipeline.publish(self._get_channel(service_instance.service_name), 'register')
             pipeline.execute()
+            with self._lock:
+                self._registered[self._get_registration_key(service_instance)] = service_instance
+            self._start_heartbeat_check()
             return True
         except Exception as e:
             print(f'Failed to register service: {e}')
@@ -57,6 +89,9 @@ class RedisRegistry(Registry):
             pipeline = self._redis.pipeline()
             pipeline.hdel(service_key, instance_key)
             pipeline.delete(self._get_heartbeat_key(instance_key))
+            pipeline.publish(self._get_channel(service_instance.service_name), 'unregister')
+            with self._lock:
+                self._registered.pop(self._get_registration_key(service_instance), None)
             pipeline.execute()
             return True
         except Exception as e:
@@ -64,46 +99,156 @@ class RedisRegistry(Registry):
             return False
 
     def list_instances(self, service_name: str) -> List[ServiceInstance]:
+        cached = self._cache.get(service_name)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return self._refresh(service_name)
+
+    def get_instance(self, service_name: str) -> Optional[ServiceInstance]:
+        instances = self.list_instances(service_name)
+        return random.choice(instances) if instances else None
+
+    def subscribe(self, service_name: str, callback: Callable) -> None:
+        """
+        Call callback(service_name, instances) whenever the instances of the service change
+        """
+        with self._lock:
+            listeners = self._listeners.setdefault(service_name, set())
+            first = not listeners
+            listeners.add(callback)
+            if first:
+                if self._pubsub is None:
+                    self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(**{self._get_channel(service_name): self._handle_event})
+                if self._pubsub_thread is None:
+                    self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+        self._refresh(service_name)
+
+    def unsubscribe(self, service_name: str) -> None:
+        with self._lock:
+            if self._listeners.pop(service_name, None) and self._pubsub is not None:
+                self._pubsub.unsubscribe(self._get_channel(service_name))
+            self._cache.pop(service_name, None)
+
+    def close(self) -> None:
+        """
+        Stop renewing heartbeats and the event listener thread
+        """
+        with self._lock:
+            renewer, self._renewer = self._renewer, None
+        if renewer is not None:
+            renewer.detach(self)
+        with self._lock:
+            if self._pubsub_thread is not None:
+                self._pubsub_thread.stop()
+                self._pubsub_thread = None
+            if self._pubsub is not None:
+                self._pubsub.close()
+                self._pubsub = None
+            self._listeners.clear()
+            self._cache.clear()
+
+    def _refresh(self, service_name: str) -> List[ServiceInstance]:
+        """
+        Reload the instances of a service from Redis into the cache
+        """
+        instances = self._fetch_instances(service_name)
+        self._cache[service_name] = (time.monotonic() + self.cache_ttl, instances)
+        return instances
+
+    def _fetch_instances(self, service_name: str) -> List[ServiceInstance]:
+        """
+        Load the live instances of a service in two round trips whatever the
+        instance count: HGETALL for the instances, one MGET for their heartbeats
+        """
         result = []
         try:
             service_key = self._get_service_key(service_name)
-            instances = self._redis.hgetall(service_key)
-
-            for instance_key, instance_info in instances.items():
+            instances = list(self._redis.hgetall(service_key).items())
+            if not instances:
+                return result
+
+            heartbeats = self._redis.mget([
+                self._get_heartbeat_key(instance_key) for instance_key, _ in instances
+            ])
+            for (instance_key, instance_info), heartbeat in zip(instances, heartbeats):
+                if heartbeat is None:
+                    continue
                 info = json.loads(instance_info)
-                if self._is_instance_alive(instance_key):
-                    result.append(ServiceInstance(
-                        service_name=service_name,
-                        host=info['host'],
-                        port=info['port'],
-                        metadata=info.get('metadata', {})
-                    ))
+                result.append(ServiceInstance(
+                    service_name=service_name,
+                    host=info['host'],
+                    port=info['port'],
+                    metadata=info.get('metadata', {})
+                ))
         except Exception as e:
             print(f'Failed to list instances: {e}')
         return result
-    
-    def get_instance(self, service_name: str) -> Optional[ServiceInstance]:
-        instances = self.list_instances(service_name)
-        return instances[0] if instances else None
 
-    def subscribe(self, service_name: str, callback: Callable) -> None:
-        
-        pass
+    def _handle_event(self, message: dict) -> None:
+        service_name = message['channel'][len(self.CHANNEL_PREFIX):]
+        instances = self._refresh(service_name)
+        for listener in list(self._listeners.get(service_name, ())):
+            try:
+                listener(service_name, instances)
+            except Exception as e:
+                print(f'Error notifying service change: {e}')
 
-    def unsubscribe(self, service_name: str) -> None:
-        pass
+    def _get_option(self, name: str, default: Any) -> Any:
+        # both RegistryConfig flavours carry free-form options
+        options = getattr(self.config, 'properties', None) or getattr(self.config, 'extensions', None) or {}
+        return options.get(name, default)
 
     def _get_service_key(self, service_name: str) -> str:
         return f'{self.SERVICE_PREFIX}{service_name}'
 
+    def _get_channel(self, service_name: str) -> str:
+        return f'{self.CHANNEL_PREFIX}{service_name}'
+
     def _get_instance_key(self, instance: ServiceInstance) -> str:
         return f'{instance.host}:{instance.port}'
 
     def _get_heartbeat_key(self, instance_key: str) -> str:
         return f'{self.HEARTBEAT_PREFIX}{instance_key}'
 
-    def _is_instance_alive(self, instance_key: str) -> bool:
-        return bool(self._redis.exists(self._get_heartbeat_key(instance_key)))
-
-    def _start_heartbbeat_check(self):
-        pass
+    def _get_registration_key(self, instance: ServiceInstance) -> str:
+        return f'{instance.service_name}/{self._get_instance_key(instance)}'
+
+    def _start_heartbeat_check(self):
+        with self._lock:
+            if self._renewer is not None:
+                return
+            self._renewer = RedisHeartbeatRenewer.attach(self)
+
+    def _queue_heartbeats(self, pipeline):
+        """
+        Queue the heartbeat renewal of every registered instance on the pipeline of
+        the renewer. The hash entry is written again too, in case a reaper removed it
+        during an outage.
+        """
+        with self._lock:
+            instances = list(self._registered.values())
+        for instance in instances:
+            instance_key = self._get_instance_key(instance)
+            pipeline.hset(self._get_service_key(instance.service_name), instance_key, json.dumps({
+                'host': instance.host,
+                'port': instance.port,
+                'metadata': instance.metadata
+            }))
+            pipeline.set(self._get_heartbeat_key(instance_key), '1', ex=self.SERVICE_TTL)
+
+    def _reap_expired_instances(self):
+        """
+        Remove hash entries whose heartbeat has expired, so HGETALL stays small
+        """
+        for service_key in self._redis.scan_iter(match=f'{self.SERVICE_PREFIX}*'):
+            instance_keys = self._redis.hkeys(service_key)
+            if not instance_keys:
+                continue
+            heartbeats = self._redis.mget([self._get_heartbeat_key(key) for key in instance_keys])
+            expired = [key for key, heartbeat in zip(instance_keys, heartbeats) if heartbeat is None]
+            if expired:
+                pipeline = self._redis.pipeline()
+                pipeline.hdel(service_key, *expired)
+                pipeline.publish(self._get_channel(service_key[len(self.SERVICE_PREFIX):]), 'expire')
+                pipeline.execute()
@@ -15,14 +15,25 @@ class ServiceInstance:
         self.service_name = service_name
         self.host = host
         self.port = port
-        self.metadata = metadata
+        self.metadata = metadata or {}
 
     def get_address(self) -> str:
         """
         Get the address of the service instance
         """
         return f'{self.host}:{self.port}'
-    
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ServiceInstance):
+            return NotImplemented
+        return (self.service_name, self.host, self.port) == (other.service_name, other.host, other.port)
+
+    def __hash__(self) -> int:
+        return hash((self.service_name, self.host, self.port))
+
+    def __repr__(self) -> str:
+        return f'ServiceInstance({self.service_name}@{self.get_address()})'
+
 
 class Registry(ABC):
     """
@@ -57,3 +68,9 @@ class Registry(ABC):
     @abstractmethod
     def unsubscribe(self, service_name: str) -> None:
         pass
+
+    def close(self) -> None:
+        """
+        Release background resources of the registry
+        """
+        pass
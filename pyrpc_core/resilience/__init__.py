@@ -0,0 +1,18 @@
+from .circuit_breaker import CircuitBreaker
+from .deadline import deadline_after, deadline_scope, get_deadline
+from .idempotent import idempotent, is_idempotent
+from .outlier_detector import OutlierDetector
+from .retry_budget import RetryBudget
+from .retry_policy import RetryPolicy
+
+__all__ = [
+    'CircuitBreaker',
+    'deadline_after',
+    'deadline_scope',
+    'get_deadline',
+    'idempotent',
+    'is_idempotent',
+    'OutlierDetector',
+    'RetryBudget',
+    'RetryPolicy'
+]
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+from ..config.circuit_breaker_config import CircuitBreakerConfig
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one service instance.
+    Closed: calls flow and their outcomes fill a window of the latest calls; once
+    it holds min_calls and the error rate or the latency percentile crosses its
+    threshold the breaker opens. Open: calls are refused for open_duration.
+    Half-open: up to half_open_calls trial calls go through, one failure opens
+    the breaker again and as many successes close it. Trials whose outcome is
+    not recorded within open_duration are given back.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self._state = self.CLOSED
+        # (latency in seconds, failed) of the latest calls while closed
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=config.window_size)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update()
+            return self._state
+
+    def is_available(self) -> bool:
+        """
+        Whether a call could be let through now, without claiming a trial call
+        """
+        with self._lock:
+            self._update()
+            if self._state == self.HALF_OPEN:
+                return self._trials < self.config.half_open_calls
+            return self._state == self.CLOSED
+
+    def try_acquire(self) -> bool:
+        """
+        Let a call through, claiming one of the trial calls when half-open
+        """
+        with self._lock:
+            self._update()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._trials < self.config.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def record(self, latency: float, failed: bool) -> None:
+        with self._lock:
+            self._update()
+            if self._state == self.HALF_OPEN:
+                if failed:
+                    self._open()
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.config.half_open_calls:
+                    self._close()
+            elif self._state == self.CLOSED:
+                if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0][1]:
+                    self._failures -= 1
+                self._outcomes.append((latency, failed))
+                self._failures += failed
+                if len(self._outcomes) >= self.config.min_calls and self._tripped():
+                    self._open()
+
+    def _tripped(self) -> bool:
+        if self._failures >= self.config.error_rate * len(self._outcomes):
+            return True
+        if not self.config.slow_call_latency:
+            return False
+        latencies = sorted(latency for latency, _ in self._outcomes)
+        index = min(len(latencies) - 1, int(self.config.latency_percentile * len(latencies)))
+        return latencies[index] * 1000 >= self.config.slow_call_latency
+
+    def _update(self) -> None:
+        now = time.monotonic()
+        if self._state == self.OPEN and now - self._opened_at >= self.config.open_duration / 1000:
+            self._half_open(now)
+        elif (self._state == self.HALF_OPEN and self._trials >= self.config.half_open_calls
+              and now - self._half_opened_at >= self.config.open_duration / 1000):
+            # trial calls that never reported back, let another round through
+            self._half_open(now)
+
+    def _half_open(self, now: float) -> None:
+        self._state = self.HALF_OPEN
+        self._half_opened_at = now
+        self._trials = 0
+        self._trial_successes = 0
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
@@ -0,0 +1,37 @@
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# time.monotonic() by which the calls made in the current context must complete
+_deadline: ContextVar[Optional[float]] = ContextVar('pyrpc_deadline', default=None)
+
+
+def get_deadline() -> Optional[float]:
+    """
+    Deadline of the current context, None when calls are only bound by their own timeout
+    """
+    return _deadline.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run the block under an absolute deadline, or under the enclosing one when it is earlier.
+    Providers serve every request in the scope of its deadline, so nested calls inherit it.
+    """
+    current = _deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def deadline_after(timeout: int) -> 'contextlib.AbstractContextManager[Optional[float]]':
+    """
+    Bound the calls made inside the block to timeout ms from now
+    """
+    return deadline_scope(time.monotonic() + timeout / 1000)
@@ -0,0 +1,22 @@
+from typing import Callable
+from ..cache.cacheable import get_cache_config
+from ..cache.pure import get_memo_ttl
+
+# attribute of an interface method marked idempotent
+IDEMPOTENT_ATTR = '__pyrpc_idempotent__'
+
+
+def idempotent(method: Callable) -> Callable:
+    """
+    Mark a method of a service interface as idempotent: running a call twice
+    has the effect of running it once, so consumers may retry and hedge it
+    """
+    setattr(method, IDEMPOTENT_ATTR, True)
+    return method
+
+
+def is_idempotent(method: Callable) -> bool:
+    """
+    Whether a method is marked @idempotent, or @cacheable or @pure which imply it
+    """
+    return getattr(method, IDEMPOTENT_ATTR, False) or get_cache_config(method) is not None or get_memo_ttl(method) is not None
@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from ..config.circuit_breaker_config import CircuitBreakerConfig
+from ..protocol.rpc_error import OverloadedError
+from ..registry.registry import ServiceInstance
+from .circuit_breaker import CircuitBreaker
+
+
+class OutlierDetector:
+    """
+    Health of the instances a consumer calls, keyed by ServiceInstance.get_address()
+    and fed with the outcome of every call: a circuit breaker per instance, and
+    ejection of instances that fail consecutive_errors calls in a row, for a time
+    growing with each ejection. Unhealthy instances are left out of selection.
+    """
+
+    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+        self.config = config or CircuitBreakerConfig()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._consecutive_errors: Dict[str, int] = {}
+        self._ejections: Dict[str, int] = {}
+        self._ejected_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_failure(error: Optional[BaseException]) -> bool:
+        """
+        Whether a call error tells about the health of the instance. Errors raised
+        by the service method itself do not, the instance answered.
+        """
+        return isinstance(error, (OSError, TimeoutError, OverloadedError))
+
+    def get_breaker(self, address: str) -> CircuitBreaker:
+        breaker = self._breakers.get(address)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(address, CircuitBreaker(self.config))
+        return breaker
+
+    def available(self, instances: List[ServiceInstance]) -> List[ServiceInstance]:
+        """
+        The instances that are neither ejected nor behind an open breaker. At most
+        max_ejection_percent of them count as ejected, the earliest ejected first.
+        """
+        if not self.config.enabled:
+            return instances
+        now = time.monotonic()
+        with self._lock:
+            ejected = sorted(
+                (self._ejected_until[instance.get_address()], instance.get_address())
+                for instance in instances
+                if self._ejected_until.get(instance.get_address(), 0) > now
+            )
+        max_ejected = len(instances) * self.config.max_ejection_percent // 100
+        ejected_addresses = {address for _, address in ejected[:max_ejected]}
+        return [
+            instance for instance in instances
+            if instance.get_address() not in ejected_addresses
+            and self.get_breaker(instance.get_address()).is_available()
+        ]
+
+    def try_acquire(self, instance: ServiceInstance) -> bool:
+        """
+        Claim a call on an instance selected from available()
+        """
+        if not self.config.enabled:
+            return True
+        return self.get_breaker(instance.get_address()).try_acquire()
+
+    def on_call_end(self, address: str, latency: float, error: Optional[BaseException] = None) -> None:
+        if not self.config.enabled:
+            return
+        failed = self.is_failure(error)
+        self.get_breaker(address).record(latency, failed)
+        if not self.config.consecutive_errors:
+            return
+        with self._lock:
+            if not failed:
+                self._consecutive_errors[address] = 0
+                return
+            errors = self._consecutive_errors.get(address, 0) + 1
+            if errors < self.config.consecutive_errors:
+                self._consecutive_errors[address] = errors
+                return
+            self._consecutive_errors[address] = 0
+            ejections = self._ejections.get(address, 0) + 1
+            self._ejections[address] = ejections
+            duration = min(self.config.ejection_duration * ejections, self.config.max_ejection_duration)
+            self._ejected_until[address] = time.monotonic() + duration / 1000
+
+    def forget(self, addresses: Iterable[str]) -> None:
+        """
+        Drop the state of instances that left the registry, they start healthy when they return
+        """
+        with self._lock:
+            for address in addresses:
+                self._breakers.pop(address, None)
+                self._consecutive_errors.pop(address, None)
+                self._ejections.pop(address, None)
+                self._ejected_until.pop(address, None)
@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries to a share of the traffic, so retries cannot
+    multiply the load of a struggling service. Every call deposits ratio tokens,
+    every retry or hedge withdraws one, and min_per_second tokens are added over
+    time. The bucket holds at most ten calls' worth plus one second's minimum.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float = 0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = max(1.0, 10 * ratio + min_per_second)
+        self._tokens = min_per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.min_per_second:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
@@ -0,0 +1,76 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from ..config.retry_config import RetryConfig
+from ..protocol.rpc_error import OverloadedError
+from .retry_budget import RetryBudget
+
+
+class RetryPolicy:
+    """
+    Retry and hedging decisions for the calls of one service: which failures
+    are worth another attempt, the jittered backoff before it, and the latency
+    after which a call is hedged, from the recent latencies of its method.
+    """
+
+    def __init__(self, retries: int, config: Optional[RetryConfig] = None):
+        self.retries = retries
+        self.config = config or RetryConfig()
+        self.budget = RetryBudget(self.config.budget_ratio, self.config.min_retries_per_second)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_retryable(error: BaseException, idempotent: bool) -> bool:
+        """
+        Whether a failed call may be sent again. A shed or refused call never ran,
+        so any call may; a call lost in transport or timed out may have run, so
+        only an idempotent one may. Errors of the method itself are final.
+        """
+        # transport errors reach the caller wrapped in a RuntimeError
+        cause = error.__cause__ or error
+        if isinstance(cause, (OverloadedError, ConnectionRefusedError)):
+            return True
+        return idempotent and isinstance(cause, (OSError, TimeoutError))
+
+    def get_backoff(self,
+                    error: BaseException,
+                    attempt: int,
+                    idempotent: bool,
+                    deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds to wait before retry number attempt, None when the call must fail:
+        out of retries, not retryable, past its deadline by then or over budget
+        """
+        if attempt > self.retries or not self.is_retryable(error, idempotent):
+            return None
+        # full jitter: retries of concurrent calls spread out instead of arriving together
+        backoff = random.uniform(0, min(self.config.max_backoff, self.config.backoff * 2 ** (attempt - 1))) / 1000
+        if deadline is not None and time.monotonic() + backoff >= deadline:
+            return None
+        if not self.budget.try_withdraw():
+            return None
+        return backoff
+
+    def record_latency(self, method_name: str, latency: float) -> None:
+        if not self.config.hedge:
+            return
+        latencies = self._latencies.get(method_name)
+        if latencies is None:
+            with self._lock:
+                latencies = self._latencies.setdefault(method_name, deque(maxlen=self.config.latency_window))
+        latencies.append(latency)
+
+    def get_hedge_delay(self, method_name: str) -> Optional[float]:
+        """
+        Seconds after which a call of the method is hedged, None when it is not
+        """
+        if not self.config.hedge:
+            return None
+        latencies = self._latencies.get(method_name)
+        if latencies is None or len(latencies) < self.config.hedge_min_samples:
+            return None
+        latencies = sorted(latencies)
+        return latencies[min(len(latencies) - 1, int(self.config.hedge_percentile * len(latencies)))]
@@ -2,10 +2,14 @@ from .serializer import Serializer
 from .yaml_serializer import YamlSerializer
 from .serializer_facotry import SerializerFactory
 from .json_serializer import JsonSerializer
+from .type_registry import TypeRegistry
+from .codec_compiler import CodecCompiler
 
 __all__ = [
     'Serializer',
     'SerializerFactory',
     'YamlSerializer',
-    'JsonSerializer'
+    'JsonSerializer',
+    'TypeRegistry',
+    'CodecCompiler'
 ]
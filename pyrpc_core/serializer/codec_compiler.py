@@ -0,0 +1,215 @@
+import dataclasses
+import inspect
+import itertools
+import threading
+import typing
+from typing import Any, Callable, Dict, Optional
+
+_PRIMITIVES = (int, float, str, bool, bytes, type(None))
+_SEQUENCES = (list, tuple, set, frozenset)
+
+
+class CodecCompiler:
+    """
+    Compiles a specialised encode/decode function pair per dataclass.
+    The annotations of a type are inspected once; the generated functions
+    then convert between instances and plain dicts with straight-line code,
+    recursing into nested dataclasses, lists, dicts and optionals.
+    """
+
+    _encoders: Dict[type, Callable[[Any], dict]] = {}
+    _decoders: Dict[type, Callable[[Any], Any]] = {}
+    _hint_decoders: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def get_encoder(cls, dataclass_type: type) -> Callable[[Any], dict]:
+        """
+        Get the function converting an instance of the dataclass to a dict
+        """
+        encoder = cls._encoders.get(dataclass_type)
+        if encoder is None:
+            with cls._lock:
+                encoder = cls._encoders.get(dataclass_type)
+                if encoder is None:
+                    encoder = cls._compile_encoder(dataclass_type)
+        return encoder
+
+    @classmethod
+    def get_decoder(cls, hint: Any) -> Optional[Callable[[Any], Any]]:
+        """
+        Get the function building a value of the annotated type from its plain
+        form, None when the plain form needs no conversion
+        """
+        try:
+            return cls._hint_decoders[hint]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable annotation
+            return None
+        with cls._lock:
+            namespace: Dict[str, Any] = {}
+            expr = cls._decode_expr(hint, 'value', namespace, itertools.count())
+            decoder = None
+            if expr != 'value':
+                exec(f'def decode(value):\n    return {expr}\n', namespace)
+                decoder = namespace['decode']
+            cls._hint_decoders[hint] = decoder
+            return decoder
+
+    @classmethod
+    def get_args_decoder(cls, func: Callable) -> Optional[Callable[[list, dict], tuple]]:
+        """
+        Get the function converting the plain args and kwargs of a call to the
+        annotated parameter types of func, None when no parameter needs it
+        """
+        try:
+            hints = typing.get_type_hints(func)
+            parameters = [
+                parameter for parameter in inspect.signature(func).parameters.values()
+                if parameter.kind not in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD)
+            ]
+        except (TypeError, ValueError, NameError):
+            return None
+        decoders = {
+            parameter.name: cls.get_decoder(hints[parameter.name])
+            for parameter in parameters if parameter.name in hints
+        }
+        positional = [decoders.get(parameter.name) for parameter in parameters]
+        if not any(positional):
+            return None
+
+        def decode(args, kwargs):
+            args = [
+                decoder(arg) if decoder is not None and arg is not None else arg
+                for arg, decoder in zip(args, positional)
+            ] + list(args[len(positional):])
+            for name, value in kwargs.items():
+                decoder = decoders.get(name)
+                if decoder is not None and value is not None:
+                    kwargs[name] = decoder(value)
+            return args, kwargs
+        return decode
+
+    @classmethod
+    def encode(cls, obj: Any) -> Any:
+        """
+        JSON/YAML default hook: dataclasses become dicts, anything else its __dict__
+        """
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return cls.get_encoder(type(obj))(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        return obj.__dict__
+
+    @classmethod
+    def _compile_encoder(cls, dataclass_type: type) -> Callable[[Any], dict]:
+        hints = typing.get_type_hints(dataclass_type)
+        namespace: Dict[str, Any] = {}
+        names = itertools.count()
+        items = []
+        for field in dataclasses.fields(dataclass_type):
+            expr = cls._encode_expr(hints.get(field.name, Any), f'obj.{field.name}', namespace, names)
+            items.append(f'        {field.name!r}: {expr},')
+        source = 'def encode(obj):\n    return {\n' + '\n'.join(items) + '\n    }\n'
+        exec(source, namespace)
+        encoder = namespace['encode']
+        cls._encoders[dataclass_type] = encoder
+        return encoder
+
+    @classmethod
+    def _compile_decoder(cls, dataclass_type: type) -> Callable[[Any], Any]:
+        hints = typing.get_type_hints(dataclass_type)
+        namespace: Dict[str, Any] = {'_cls': dataclass_type}
+        names = itertools.count()
+        required, optional = [], []
+        for field in dataclasses.fields(dataclass_type):
+            if not field.init:
+                continue
+            expr = cls._decode_expr(hints.get(field.name, Any), f'data[{field.name!r}]', namespace, names)
+            if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
+                required.append(f'        {field.name!r}: {expr},')
+            else:
+                optional.append(f'    if {field.name!r} in data:\n        kwargs[{field.name!r}] = {expr}')
+        source = (
+            'def decode(data):\n'
+            '    if type(data) is _cls:\n'
+            '        return data\n'
+            '    kwargs = {\n' + '\n'.join(required) + '\n    }\n'
+            + ''.join(line + '\n' for line in optional)
+            + '    return _cls(**kwargs)\n'
+        )
+        exec(source, namespace)
+        decoder = namespace['decode']
+        cls._decoders[dataclass_type] = decoder
+        return decoder
+
+    @classmethod
+    def _get_dataclass_decoder(cls, dataclass_type: type) -> Callable[[Any], Any]:
+        decoder = cls._decoders.get(dataclass_type)
+        if decoder is None:
+            with cls._lock:
+                decoder = cls._decoders.get(dataclass_type)
+                if decoder is None:
+                    decoder = cls._compile_decoder(dataclass_type)
+        return decoder
+
+    @classmethod
+    def _encode_expr(cls, hint: Any, value: str, namespace: Dict[str, Any], names) -> str:
+        if hint in _PRIMITIVES or hint is Any:
+            return value
+        if dataclasses.is_dataclass(hint) and isinstance(hint, type):
+            # looked up at call time so self-referencing types compile
+            ref = f'_t{next(names)}'
+            namespace[ref] = hint
+            namespace['_encoders'] = cls._encoders
+            namespace['_get_encoder'] = cls.get_encoder
+            return f'(_encoders.get({ref}) or _get_encoder({ref}))({value})'
+        return cls._container_expr(hint, value, namespace, names, cls._encode_expr, encode=True)
+
+    @classmethod
+    def _decode_expr(cls, hint: Any, value: str, namespace: Dict[str, Any], names) -> str:
+        if hint in _PRIMITIVES or hint is Any:
+            return value
+        if dataclasses.is_dataclass(hint) and isinstance(hint, type):
+            ref = f'_t{next(names)}'
+            namespace[ref] = hint
+            namespace['_decoders'] = cls._decoders
+            namespace['_get_decoder'] = cls._get_dataclass_decoder
+            return f'(_decoders.get({ref}) or _get_decoder({ref}))({value})'
+        return cls._container_expr(hint, value, namespace, names, cls._decode_expr, encode=False)
+
+    @classmethod
+    def _container_expr(cls, hint, value: str, namespace, names, item_expr, encode: bool) -> str:
+        origin = typing.get_origin(hint)
+        args = typing.get_args(hint)
+        if origin is typing.Union:
+            members = [arg for arg in args if arg is not type(None)]
+            if len(members) == 1:
+                inner = item_expr(members[0], value, namespace, names)
+                if inner == value:
+                    return value
+                return f'(None if {value} is None else {inner})'
+            return value
+        if origin in _SEQUENCES and args:
+            item_hint = args[0]
+            if origin is tuple and not (len(args) == 2 and args[1] is Ellipsis):
+                # fixed size tuples are left alone
+                return value
+            var = f'_v{next(names)}'
+            inner = item_expr(item_hint, var, namespace, names)
+            if inner == var:
+                return value
+            if encode or origin is list:
+                return f'[{inner} for {var} in {value}]'
+            ref = f'_t{next(names)}'
+            namespace[ref] = origin
+            return f'{ref}({inner} for {var} in {value})'
+        if origin is dict and len(args) == 2:
+            key, var = f'_k{next(names)}', f'_v{next(names)}'
+            inner = item_expr(args[1], var, namespace, names)
+            if inner == var:
+                return value
+            return f'{{{key}: {inner} for {key}, {var} in {value}.items()}}'
+        return value
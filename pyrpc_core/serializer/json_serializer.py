@@ -1,5 +1,6 @@
 import json
 from typing import Any
+from .codec_compiler import CodecCompiler
 from .serializer import Serializer
 
 
@@ -7,10 +8,16 @@ from .serializer import Serializer
 class JsonSerializer(Serializer):
 
     def serialize(self, obj: Any) -> bytes:
-        return json.dumps(obj, default=lambda o: o.__dict__).encode('utf-8')
+        return json.dumps(obj, default=CodecCompiler.encode).encode('utf-8')
 
-    def deserialize(self, data: bytes, cls: type) -> Any:
-        json_dict = json.loads(data.decode('utf-8'))
-        if hasattr(cls, '__annotations__'):
+    def deserialize(self, data: bytes, cls: type = None) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        # json.loads takes bytes and bytearray as they are
+        json_dict = json.loads(data)
+        decoder = CodecCompiler.get_decoder(cls) if cls is not None else None
+        if decoder is not None:
+            return decoder(json_dict)
+        if cls not in (None, dict) and hasattr(cls, '__annotations__') and isinstance(json_dict, dict):
             return cls(**json_dict)
         return json_dict
@@ -0,0 +1,81 @@
+import dataclasses
+import msgpack
+from typing import Any, Dict, List, Optional, Tuple
+from .serializer import Serializer
+from .type_registry import TypeRegistry
+
+
+class _TypeTag:
+    """
+    Decoded type tag, heads the array of a dataclass
+    """
+    __slots__ = ('type',)
+
+    def __init__(self, type_: Optional[type]):
+        self.type = type_
+
+
+class MsgpackSerializer(Serializer):
+    """
+    Compact binary serializer. A dataclass is packed as an array whose first
+    item is an ext type holding its 4-byte TypeRegistry id, followed by its
+    field values in declaration order. It is rebuilt on decode when the id is
+    registered; the values of an unregistered type decode to a plain list.
+    """
+
+    TYPE_TAG_EXT = 1
+
+    def __init__(self):
+        # dataclass -> (type tag, field names)
+        self._layouts: Dict[type, Tuple[msgpack.ExtType, Tuple[str, ...]]] = {}
+        self._tags: Dict[bytes, _TypeTag] = {}
+
+    def serialize(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=self._default, use_bin_type=True)
+
+    def deserialize(self, data: bytes, cls: type = None) -> Any:
+        return msgpack.unpackb(
+            data,
+            ext_hook=self._ext_hook,
+            list_hook=self._list_hook,
+            raw=False,
+            strict_map_key=False
+        )
+
+    def _default(self, obj: Any) -> Any:
+        layout = self._layouts.get(type(obj))
+        if layout is None and dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            layout = self._get_layout(type(obj))
+        if layout is not None:
+            tag, field_names = layout
+            return [tag, *[getattr(obj, name) for name in field_names]]
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        raise TypeError(f'Cannot serialize object of type {type(obj).__name__}')
+
+    def _get_layout(self, dataclass_type: type) -> Tuple[msgpack.ExtType, Tuple[str, ...]]:
+        type_id = TypeRegistry.get_type_id(TypeRegistry.get_name(dataclass_type))
+        layout = (
+            msgpack.ExtType(self.TYPE_TAG_EXT, type_id.to_bytes(4, 'big')),
+            tuple(field.name for field in dataclasses.fields(dataclass_type))
+        )
+        self._layouts[dataclass_type] = layout
+        return layout
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code != self.TYPE_TAG_EXT:
+            return msgpack.ExtType(code, data)
+        tag = self._tags.get(data)
+        if tag is None or tag.type is None:
+            # unknown ids are looked up again, the type may be registered later
+            tag = _TypeTag(TypeRegistry.get_type_by_id(int.from_bytes(data, 'big')))
+            self._tags[data] = tag
+        return tag
+
+    def _list_hook(self, items: List[Any]) -> Any:
+        if items and type(items[0]) is _TypeTag:
+            registered_type = items[0].type
+            if registered_type is None:
+                return items[1:]
+            return registered_type(*items[1:])
+        return items
@@ -12,5 +12,9 @@ class Serializer(ABC):
         pass
 
     @abstractmethod
-    def deserialize(self, data: bytes, cls: type) -> Any:
+    def deserialize(self, data: bytes, cls: type = None) -> Any:
+        """
+        data may be any bytes-like object: transports hand over the received
+        bytearray or a memoryview of it without copying
+        """
         pass
@@ -12,6 +12,12 @@ class SerializerFactory:
     
     _serializers: Dict[int, Serializer] = {}
 
+    _serializer_names: Dict[str, int] = {
+        'json': ProtocolConstants.SERIALIZER_JSON,
+        'yaml': ProtocolConstants.SERIALIZER_YAML,
+        'msgpack': ProtocolConstants.SERIALIZER_MSGPACK
+    }
+
     @classmethod
     def get_serializer(cls, serializer_type: int) -> Serializer:
         """
@@ -19,9 +25,23 @@ class SerializerFactory:
         """
         if serializer_type not in cls._serializers:
             if serializer_type == ProtocolConstants.SERIALIZER_JSON:
-                cls._serializers[serializer_type] = JsonSerializer
+                cls._serializers[serializer_type] = JsonSerializer()
             elif serializer_type == ProtocolConstants.SERIALIZER_YAML:
-                cls._serializers[serializer_type] = YamlSerializer
+                cls._serializers[serializer_type] = YamlSerializer()
+            elif serializer_type == ProtocolConstants.SERIALIZER_MSGPACK:
+                # msgpack is an optional dependency
+                from .msgpack_serializer import MsgpackSerializer
+                cls._serializers[serializer_type] = MsgpackSerializer()
             else:
                 raise ValueError(f'Unsupported serializer type: {serializer_type}')
         return cls._serializers[serializer_type]
+
+    @classmethod
+    def get_serializer_type(cls, serializer_name: str) -> int:
+        """
+        Get a serializer type by its name, as used by RpcConfig.serializer_type
+        """
+        serializer_type = cls._serializer_names.get(serializer_name.lower())
+        if serializer_type is None:
+            raise ValueError(f'Unsupported serializer: {serializer_name}')
+        return serializer_type
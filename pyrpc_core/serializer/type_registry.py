@@ -0,0 +1,88 @@
+import dataclasses
+import inspect
+import threading
+import typing
+import zlib
+from typing import Dict, Optional, Type
+
+
+class TypeRegistry:
+    """
+    Registry of the dataclasses that may cross the wire, by name and by a
+    32-bit type id derived from the name for compact encodings.
+    Only registered types are rebuilt on decode, a payload can never make the
+    decoder import or instantiate an arbitrary class.
+    """
+
+    _types: Dict[str, type] = {}
+    _names: Dict[type, str] = {}
+    _ids: Dict[int, type] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def register(cls, type_: Type = None, name: Optional[str] = None):
+        """
+        Register a dataclass, usable as a decorator
+        """
+        def decorator(registered_type):
+            if not dataclasses.is_dataclass(registered_type):
+                raise TypeError(f'Only dataclasses can be registered: {registered_type}')
+            type_name = name or f'{registered_type.__module__}.{registered_type.__qualname__}'
+            type_id = cls.get_type_id(type_name)
+            with cls._lock:
+                existing = cls._ids.get(type_id)
+                if existing is not None and existing is not registered_type and cls._names.get(existing) != type_name:
+                    raise TypeError(f'Type id collision between {type_name} and {cls._names[existing]}')
+                cls._ids[type_id] = registered_type
+                cls._types[type_name] = registered_type
+                cls._names[registered_type] = type_name
+            return registered_type
+
+        if type_ is None:
+            return decorator
+        return decorator(type_)
+
+    @classmethod
+    def register_service(cls, service_class: Type) -> None:
+        """
+        Register every dataclass reachable from the annotations of the service methods
+        """
+        for _, method in inspect.getmembers(service_class, predicate=inspect.isfunction):
+            try:
+                hints = typing.get_type_hints(method)
+            except Exception:
+                continue
+            for hint in hints.values():
+                cls._register_annotation(hint)
+
+    @classmethod
+    def get_type(cls, name: str) -> Optional[type]:
+        return cls._types.get(name)
+
+    @classmethod
+    def get_type_by_id(cls, type_id: int) -> Optional[type]:
+        return cls._ids.get(type_id)
+
+    @staticmethod
+    def get_type_id(name: str) -> int:
+        return zlib.crc32(name.encode('utf-8'))
+
+    @classmethod
+    def get_name(cls, type_: type) -> Optional[str]:
+        name = cls._names.get(type_)
+        if name is None and dataclasses.is_dataclass(type_):
+            cls.register(type_)
+            name = cls._names[type_]
+        return name
+
+    @classmethod
+    def _register_annotation(cls, hint) -> None:
+        if dataclasses.is_dataclass(hint) and isinstance(hint, type):
+            if hint in cls._names:
+                return
+            cls.register(hint)
+            for field_hint in typing.get_type_hints(hint).values():
+                cls._register_annotation(field_hint)
+            return
+        for arg in typing.get_args(hint):
+            cls._register_annotation(arg)
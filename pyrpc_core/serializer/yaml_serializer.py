@@ -1,12 +1,31 @@
+import dataclasses
 import yaml
+from .codec_compiler import CodecCompiler
 from .serializer import Serializer
 from typing import Any
 
 
+class _Dumper(yaml.SafeDumper):
+    """
+    Safe dumper that also writes dataclasses, as mappings
+    """
+
+
+def _represent_object(dumper: _Dumper, obj: Any):
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dumper.represent_dict(CodecCompiler.get_encoder(type(obj))(obj))
+    return dumper.represent_undefined(obj)
+
+
+_Dumper.add_multi_representer(object, _represent_object)
+
+
 class YamlSerializer(Serializer):
     
     def serialize(self, obj: Any) -> bytes:
-        return yaml.safe_dump(obj, encoding='utf-8', allow_unicode=True)
+        return yaml.dump(obj, Dumper=_Dumper, encoding='utf-8', allow_unicode=True)
     
-    def deserialize(self, data: bytes, cls: type) -> Any:
-        return yaml.safe_load(data)
+    def deserialize(self, data: bytes, cls: type = None) -> Any:
+        value = yaml.safe_load(data if isinstance(data, bytes) else bytes(data))
+        decoder = CodecCompiler.get_decoder(cls) if cls is not None else None
+        return decoder(value) if decoder is not None else value
@@ -0,0 +1,21 @@
+from .async_connection import AsyncConnection, AsyncConnectionManager
+from .async_server import AsyncRpcServer
+from .call_abort import CallAbort
+from .connection import Connection
+from .connection_pool import ConnectionPool, ConnectionPoolManager
+from .multiplexed_connection import MultiplexedConnection, MultiplexedConnectionManager
+from .stream_credit import StreamCredit, AsyncStreamCredit
+
+__all__ = [
+    'AsyncConnection',
+    'AsyncConnectionManager',
+    'AsyncRpcServer',
+    'CallAbort',
+    'Connection',
+    'ConnectionPool',
+    'ConnectionPoolManager',
+    'MultiplexedConnection',
+    'MultiplexedConnectionManager',
+    'StreamCredit',
+    'AsyncStreamCredit'
+]
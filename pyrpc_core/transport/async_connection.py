@@ -0,0 +1,177 @@
+import asyncio
+import socket
+from typing import Dict, Optional, Tuple, Union
+from ..config.transport_config import TransportConfig
+from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.protocol_message import ProtocolMessage
+from ..registry.registry import ServiceInstance
+
+
+class AsyncConnection:
+    """
+    Non-blocking connection shared by concurrent coroutines of one event loop.
+    A reader task demultiplexes responses into per-call futures by request_id,
+    and the frames of streaming calls into per-stream queues.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, address: str):
+        self.reader = reader
+        self.writer = writer
+        self.address = address
+        self.closed = False
+        self.loop = asyncio.get_running_loop()
+        self._pending: Dict[int, Union[asyncio.Future, asyncio.Queue]] = {}
+        self._reader_task = self.loop.create_task(self._read_loop())
+
+    @classmethod
+    async def open(cls, host: str, port: int, connect_timeout: float) -> 'AsyncConnection':
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(reader, writer, f'{host}:{port}')
+
+    async def call(self, message: ProtocolMessage, timeout: float) -> ProtocolMessage:
+        """
+        Send a request and wait at most timeout seconds for its response
+        """
+        if self.closed:
+            raise ConnectionResetError(f'Connection closed: {self.address}')
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.request_id] = future
+        try:
+            await self.send_message(message)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message.request_id, None)
+
+    async def open_stream(self, message: ProtocolMessage) -> asyncio.Queue:
+        """
+        Send a streaming request. Its frames are put on the returned queue in
+        arrival order until the end frame; a connection error is put as an exception.
+        """
+        if self.closed:
+            raise ConnectionResetError(f'Connection closed: {self.address}')
+        frames = asyncio.Queue()
+        self._pending[message.request_id] = frames
+        try:
+            await self.send_message(message)
+        except BaseException:
+            self._pending.pop(message.request_id, None)
+            raise
+        return frames
+
+    def close_stream(self, request_id: int) -> None:
+        self._pending.pop(request_id, None)
+
+    async def send_message(self, message: ProtocolMessage) -> None:
+        if message.body_length:
+            self.writer.writelines((message.header_bytes(), message.body))
+        else:
+            self.writer.write(message.header_bytes())
+        await self.writer.drain()
+
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        """
+        Close the connection, must be called from the event loop thread
+        """
+        self._fail_all(ConnectionResetError(f'Connection closed: {self.address}'))
+        self._reader_task.cancel()
+        self.writer.close()
+
+    async def _read_loop(self) -> None:
+        header_size = ProtocolMessage.get_header_length()
+        error: Exception = ConnectionResetError(f'Connection closed by peer: {self.address}')
+        try:
+            while True:
+                header_data = await self.reader.readexactly(header_size)
+                message = ProtocolMessage.from_bytes(header_data)
+                if message.body_length > 0:
+                    message.body = await self.reader.readexactly(message.body_length)
+                waiter = self._pending.get(message.request_id)
+                # a stream stays registered until its last frame
+                if waiter is not None and message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE:
+                    del self._pending[message.request_id]
+                # a response for a call that already timed out is dropped
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait(message)
+                elif waiter is not None and not waiter.done():
+                    waiter.set_result(message)
+        except asyncio.IncompleteReadError:
+            pass
+        except (ConnectionError, OSError) as e:
+            error = e
+        except asyncio.CancelledError:
+            # closed, or its loop is shutting down as asyncio.run() returns
+            self._fail_all(ConnectionResetError(f'Connection closed: {self.address}'))
+            self.writer.close()
+            raise
+        self._fail_all(error)
+        self.writer.close()
+
+    def _fail_all(self, error: Exception) -> None:
+        self.closed = True
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for waiter in pending:
+            if isinstance(waiter, asyncio.Queue):
+                waiter.put_nowait(error)
+            elif not waiter.done():
+                waiter.set_exception(error)
+
+
+class AsyncConnectionManager:
+    """
+    One AsyncConnection per event loop and ServiceInstance.get_address(), reopened
+    when it breaks. Connections of a loop that has closed are dropped.
+    """
+
+    def __init__(self, config: TransportConfig = None):
+        self.config = config or TransportConfig()
+        self._connections: Dict[Tuple[asyncio.AbstractEventLoop, str], AsyncConnection] = {}
+        self._opening: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    async def get_connection(self, instance: ServiceInstance) -> AsyncConnection:
+        loop = asyncio.get_running_loop()
+        key = (loop, instance.get_address())
+        connection: Optional[AsyncConnection] = self._connections.get(key)
+        if connection is not None and not connection.closed:
+            return connection
+        self._drop_closed_loops()
+        # concurrent callers share one connect attempt
+        task = self._opening.get(key)
+        if task is None:
+            task = loop.create_task(AsyncConnection.open(
+                instance.host,
+                instance.port,
+                connect_timeout=self.config.connect_timeout / 1000
+            ))
+            self._opening[key] = task
+            task.add_done_callback(lambda _: self._opening.pop(key, None))
+        connection = await asyncio.shield(task)
+        self._connections[key] = connection
+        return connection
+
+    def close(self) -> None:
+        """
+        Close every connection, from any thread: on its own loop when that loop
+        is still running, connections of a closed loop are only dropped
+        """
+        connections = list(self._connections.values())
+        self._connections.clear()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for connection in connections:
+            if connection.loop is running:
+                connection.close()
+            elif not connection.loop.is_closed():
+                connection.loop.call_soon_threadsafe(connection.close)
+
+    def _drop_closed_loops(self) -> None:
+        for key in [key for key in self._connections if key[0].is_closed()]:
+            del self._connections[key]
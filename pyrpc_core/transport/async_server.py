@@ -0,0 +1,173 @@
+import asyncio
+import socket
+import threading
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+from ..protocol.protocol_message import ProtocolMessage
+
+
+class AsyncRpcServer:
+    """
+    asyncio server for framed ProtocolMessage requests. All connections are
+    served by one event loop running in a background thread; every request
+    is handled in its own task so responses go out in completion order.
+
+    handler(message, connection) is awaited for every incoming message and
+    returns the response message, an async iterator of frames to send in order,
+    or None when there is nothing to send. The connection is an opaque key,
+    on_disconnect(connection) is called once it closes and the requests still
+    running for it are cancelled. When the handler raises, on_error(message, error)
+    returns the response to send instead, or None.
+    """
+
+    def __init__(self,
+                 addresses: List[Tuple[str, int]],
+                 handler: Callable[[ProtocolMessage, Any], Awaitable[Any]],
+                 backlog: int = 128,
+                 on_disconnect: Optional[Callable[[Any], Awaitable[None]]] = None,
+                 reuse_port: bool = False,
+                 on_error: Optional[Callable[[ProtocolMessage, Exception], Optional[ProtocolMessage]]] = None):
+        self.addresses = addresses
+        self.handler = handler
+        self.backlog = backlog
+        self.on_disconnect = on_disconnect
+        self.reuse_port = reuse_port # let other processes bind the same addresses
+        self.on_error = on_error
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servers: List[asyncio.AbstractServer] = []
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """
+        Start the event loop thread and wait until every address is listening
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error:
+            self._thread.join()
+            raise self._start_error
+
+    def stop(self) -> None:
+        if self.loop and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread:
+            self._thread.join()
+
+    def close_listeners(self) -> None:
+        """
+        Stop accepting connections, established connections are still served
+        """
+        if self.loop and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._close_listeners(), self.loop).result()
+
+    async def _close_listeners(self) -> None:
+        for server in self._servers:
+            server.close()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            for host, port in self.addresses:
+                server = self.loop.run_until_complete(asyncio.start_server(
+                    self._handle_connection,
+                    host,
+                    port,
+                    backlog=self.backlog,
+                    reuse_address=True,
+                    reuse_port=self.reuse_port or None
+                ))
+                self._servers.append(server)
+        except BaseException as e:
+            self._start_error = e
+            self._started.set()
+            self.loop.close()
+            return
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    async def _shutdown(self) -> None:
+        for server in self._servers:
+            server.close()
+        for writer in list(self._writers):
+            writer.close()
+        for server in self._servers:
+            await server.wait_closed()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._writers.add(writer)
+        # requests of the connection still running, the loop only keeps weak references
+        tasks: Set[asyncio.Task] = set()
+        header_size = ProtocolMessage.get_header_length()
+        try:
+            while True:
+                try:
+                    header_data = await reader.readexactly(header_size)
+                except asyncio.IncompleteReadError:
+                    break
+                message = ProtocolMessage.from_bytes(header_data)
+                if message.body_length > 0:
+                    message.body = await reader.readexactly(message.body_length)
+                task = asyncio.create_task(self._respond(writer, message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.on_disconnect:
+                await self.on_disconnect(writer)
+
+    async def _respond(self, writer: asyncio.StreamWriter, message: ProtocolMessage) -> None:
+        try:
+            response = await self.handler(message, writer)
+        except Exception as e:
+            if self.on_error is None:
+                print(f'Error handling request: {e}')
+                return
+            response = self.on_error(message, e)
+        if response is None:
+            return
+        try:
+            if isinstance(response, ProtocolMessage):
+                await self._write(writer, response)
+                return
+            async for frame in response:
+                if writer.is_closing():
+                    break
+                await self._write(writer, frame)
+        except ConnectionError:
+            pass
+        finally:
+            if not isinstance(response, ProtocolMessage):
+                await response.aclose()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, frame: ProtocolMessage) -> None:
+        if writer.is_closing():
+            return
+        # write() is synchronous, so frames of concurrent responses never interleave
+        if frame.body_length:
+            writer.writelines((frame.header_bytes(), frame.body))
+        else:
+            writer.write(frame.header_bytes())
+        await writer.drain()
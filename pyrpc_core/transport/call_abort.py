@@ -0,0 +1,62 @@
+import contextlib
+import threading
+from concurrent.futures import CancelledError
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+_current: ContextVar[Optional['CallAbort']] = ContextVar('pyrpc_call_abort', default=None)
+
+
+class CallAbort:
+    """
+    Lets another thread give up on a call blocked on the transport. The exchanges
+    run in scope() register how to cancel them with watch(): abort() closes the
+    connection or drops the pending response they wait on, and they raise CancelledError.
+    """
+
+    def __init__(self):
+        self.aborted = False
+        self._cancel: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def scope(self) -> Iterator['CallAbort']:
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def watch(cancel: Callable[[], None]) -> 'contextlib.AbstractContextManager':
+        """
+        Run an exchange that cancel() wakes up, abortable when in the scope of a CallAbort
+        """
+        abort = _current.get()
+        if abort is None:
+            return contextlib.nullcontext()
+        return abort._watch(cancel)
+
+    def abort(self) -> None:
+        with self._lock:
+            self.aborted = True
+            cancel, self._cancel = self._cancel, None
+        if cancel is not None:
+            cancel()
+
+    @contextlib.contextmanager
+    def _watch(self, cancel: Callable[[], None]) -> Iterator[None]:
+        with self._lock:
+            if self.aborted:
+                raise CancelledError()
+            previous, self._cancel = self._cancel, cancel
+        try:
+            yield
+        except Exception as e:
+            if self.aborted:
+                raise CancelledError() from e
+            raise
+        finally:
+            with self._lock:
+                if not self.aborted:
+                    self._cancel = previous
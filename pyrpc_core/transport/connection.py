@@ -0,0 +1,118 @@
+import select
+import socket
+import threading
+import time
+from typing import Optional
+from ..protocol.protocol_message import ProtocolMessage
+
+
+class Connection:
+    """
+    A socket that sends and receives framed ProtocolMessage
+    """
+
+    def __init__(self, sock: socket.socket, address: str):
+        self.sock = sock
+        self.address = address
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.closed = False
+        self._send_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, host: str, port: int, connect_timeout: float, read_timeout: float) -> 'Connection':
+        """
+        Open a new connection, timeouts are in seconds
+        """
+        sock = socket.create_connection((host, port), timeout=connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(read_timeout)
+        return cls(sock, f'{host}:{port}')
+
+    @property
+    def reused(self) -> bool:
+        """
+        Whether the connection has carried a message before
+        """
+        return self.last_used != self.created_at
+
+    def send_message(self, message: ProtocolMessage) -> None:
+        header = message.header_bytes()
+        body = message.body if message.body_length else None
+        # frames from concurrent senders must not interleave
+        with self._send_lock:
+            if body is None:
+                self.sock.sendall(header)
+            elif hasattr(self.sock, 'sendmsg'):
+                self._sendmsg_all([memoryview(header), memoryview(body)])
+            else:
+                self.sock.sendall(header + bytes(body))
+        self.last_used = time.monotonic()
+
+    def read_message(self) -> Optional[ProtocolMessage]:
+        """
+        Read one framed message, return None if the peer closed the connection
+        before a new message started. The body is read straight into a
+        preallocated bytearray.
+        """
+        header_data = self._recv_exactly(ProtocolMessage.get_header_length(), allow_eof=True)
+        if header_data is None:
+            return None
+
+        message = ProtocolMessage.from_bytes(header_data)
+        if message.body_length > 0:
+            message.body = self._recv_exactly(message.body_length)
+        self.last_used = time.monotonic()
+        return message
+
+    def is_alive(self) -> bool:
+        """
+        Check that an idle connection is still usable. An idle connection must have
+        nothing to read: readable means either EOF or a stray response.
+        """
+        if self.closed:
+            return False
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # shutdown also wakes a thread blocked in recv on this socket
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def _recv_exactly(self, size: int, allow_eof: bool = False) -> Optional[bytearray]:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self.sock.recv_into(view[received:])
+            if not count:
+                if allow_eof and received == 0:
+                    return None
+                raise ConnectionError(f'Connection closed by peer: {self.address}')
+            received += count
+        return buffer
+
+    def _sendmsg_all(self, buffers) -> None:
+        """
+        Scatter/gather send, resumed after partial writes
+        """
+        while buffers:
+            sent = self.sock.sendmsg(buffers)
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if buffers and sent:
+                buffers[0] = buffers[0][sent:]
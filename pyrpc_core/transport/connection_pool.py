@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator
+from ..config.transport_config import TransportConfig
+from ..registry.registry import ServiceInstance
+from .connection import Connection
+
+
+class ConnectionPool:
+    """
+    Pool of persistent connections to a single service instance
+    """
+
+    def __init__(self, host: str, port: int, config: TransportConfig):
+        self.host = host
+        self.port = port
+        self.config = config
+        self._idle: Deque[Connection] = deque() # oldest on the left
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(config.max_connections)
+        self._closed = False
+        self.created_count = 0
+
+    def acquire(self) -> Connection:
+        """
+        Check out a connection, reusing an idle one when possible. Blocks while
+        max_connections are checked out.
+        """
+        if not self._slots.acquire(timeout=self.config.connect_timeout / 1000):
+            raise TimeoutError(f'Connection pool exhausted: {self.host}:{self.port}')
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                connection = Connection.open(
+                    self.host,
+                    self.port,
+                    connect_timeout=self.config.connect_timeout / 1000,
+                    read_timeout=self.config.read_timeout / 1000
+                )
+                with self._lock:
+                    self.created_count += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: Connection, broken: bool = False) -> None:
+        """
+        Return a connection to the pool, broken connections are closed
+        """
+        try:
+            with self._lock:
+                if broken or self._closed or connection.closed:
+                    connection.close()
+                else:
+                    self._idle.append(connection)
+                self._evict_idle_locked(time.monotonic())
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            # the connection state is unknown after a failed exchange
+            self.release(connection, broken=True)
+            raise
+        else:
+            self.release(connection)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+
+    def _take_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f'Connection pool closed: {self.host}:{self.port}')
+            self._evict_idle_locked(now)
+            # most recently used first, so surplus connections age out
+            while self._idle:
+                connection = self._idle.pop()
+                if not self.config.health_check or connection.is_alive():
+                    return connection
+                connection.close()
+        return None
+
+    def _evict_idle_locked(self, now: float) -> None:
+        idle_timeout = self.config.idle_timeout / 1000
+        while self._idle and now - self._idle[0].last_used > idle_timeout:
+            self._idle.popleft().close()
+
+
+class ConnectionPoolManager:
+    """
+    Connection pools keyed by ServiceInstance.get_address()
+    """
+
+    def __init__(self, config: TransportConfig = None):
+        self.config = config or TransportConfig()
+        self._pools: Dict[str, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, instance: ServiceInstance) -> ConnectionPool:
+        address = instance.get_address()
+        pool = self._pools.get(address)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(address)
+                if pool is None:
+                    pool = ConnectionPool(instance.host, instance.port, self.config)
+                    self._pools[address] = pool
+        return pool
+
+    def remove_pool(self, address: str) -> None:
+        with self._lock:
+            pool = self._pools.pop(address, None)
+        if pool:
+            pool.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
@@ -0,0 +1,167 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Union
+from ..config.transport_config import TransportConfig
+from ..protocol.protocol_constants import ProtocolConstants
+from ..protocol.protocol_message import ProtocolMessage
+from ..registry.registry import ServiceInstance
+from .connection import Connection
+
+
+class MultiplexedConnection:
+    """
+    One connection shared by many in-flight calls. A background reader thread
+    demultiplexes responses into per-call futures by request_id, and the frames
+    of streaming calls into per-stream queues.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self._pending: Dict[int, Union[Future, queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+        # the reader blocks on recv, calls wait on their futures instead
+        connection.sock.settimeout(None)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def call(self, message: ProtocolMessage, timeout: float) -> ProtocolMessage:
+        """
+        Send a request and wait for the response carrying the same request_id
+        """
+        future = self.send(message)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self._discard(message.request_id)
+            raise
+
+    def send(self, message: ProtocolMessage) -> Future:
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionResetError(f'Connection closed: {self.connection.address}')
+            self._pending[message.request_id] = future
+        try:
+            self.connection.send_message(message)
+        except BaseException:
+            self._discard(message.request_id)
+            raise
+        return future
+
+    def open_stream(self, message: ProtocolMessage) -> queue.Queue:
+        """
+        Send a streaming request. Its frames are put on the returned queue in
+        arrival order until the end frame; a connection error is put as an exception.
+        """
+        frames = queue.Queue()
+        with self._lock:
+            if self.closed:
+                raise ConnectionResetError(f'Connection closed: {self.connection.address}')
+            self._pending[message.request_id] = frames
+        try:
+            self.connection.send_message(message)
+        except BaseException:
+            self._discard(message.request_id)
+            raise
+        return frames
+
+    def close_stream(self, request_id: int) -> None:
+        self._discard(request_id)
+
+    def abandon(self, request_id: int) -> None:
+        """
+        Stop waiting for the response of a call, its caller gets CancelledError.
+        A response the reader has already taken is delivered.
+        """
+        with self._lock:
+            waiter = self._pending.pop(request_id, None)
+        if isinstance(waiter, Future):
+            waiter.cancel()
+
+    def send_message(self, message: ProtocolMessage) -> None:
+        """
+        Send a frame that expects no response, such as stream credit
+        """
+        self.connection.send_message(message)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self) -> None:
+        self._fail_all(ConnectionResetError(f'Connection closed: {self.connection.address}'))
+        self.connection.close()
+
+    def _discard(self, request_id: int) -> None:
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def _read_loop(self) -> None:
+        error: Exception = ConnectionResetError(f'Connection closed by peer: {self.connection.address}')
+        try:
+            while True:
+                message = self.connection.read_message()
+                if message is None:
+                    break
+                with self._lock:
+                    waiter = self._pending.get(message.request_id)
+                    # a stream stays registered until its last frame
+                    if waiter is not None and message.message_type != ProtocolConstants.STREAM_CHUNK_TYPE:
+                        del self._pending[message.request_id]
+                # a response for a call that already timed out is dropped
+                if isinstance(waiter, queue.Queue):
+                    waiter.put(message)
+                elif waiter is not None:
+                    waiter.set_result(message)
+        except Exception as e:
+            error = e
+        self._fail_all(error)
+        self.connection.close()
+
+    def _fail_all(self, error: Exception) -> None:
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for waiter in pending:
+            if isinstance(waiter, queue.Queue):
+                waiter.put(error)
+            elif not waiter.done():
+                waiter.set_exception(error)
+
+
+class MultiplexedConnectionManager:
+    """
+    One multiplexed connection per ServiceInstance.get_address(), reopened when it breaks
+    """
+
+    def __init__(self, config: TransportConfig = None):
+        self.config = config or TransportConfig()
+        self._connections: Dict[str, MultiplexedConnection] = {}
+        self._lock = threading.Lock()
+
+    def get_connection(self, instance: ServiceInstance) -> MultiplexedConnection:
+        address = instance.get_address()
+        connection = self._connections.get(address)
+        if connection is not None and not connection.closed:
+            return connection
+        with self._lock:
+            connection = self._connections.get(address)
+            if connection is None or connection.closed:
+                connection = MultiplexedConnection(Connection.open(
+                    instance.host,
+                    instance.port,
+                    connect_timeout=self.config.connect_timeout / 1000,
+                    read_timeout=self.config.read_timeout / 1000
+                ))
+                self._connections[address] = connection
+        return connection
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
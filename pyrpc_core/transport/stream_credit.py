@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from typing import Optional
+
+
+class StreamCredit:
+    """
+    Credit based flow control of one stream: the provider takes one credit per
+    chunk frame it sends and waits while the consumer has granted none
+    """
+
+    def __init__(self, credit: int):
+        self.credit = credit
+        self.cancelled = False
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one credit, False if the stream was cancelled or no credit came in time
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.credit > 0 or self.cancelled, timeout):
+                return False
+            if self.cancelled:
+                return False
+            self.credit -= 1
+            return True
+
+    def grant(self, credit: int) -> None:
+        with self._condition:
+            self.credit += credit
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self.cancelled = True
+            self._condition.notify_all()
+
+
+class AsyncStreamCredit:
+    """
+    StreamCredit for streams served from an event loop
+    """
+
+    def __init__(self, credit: int):
+        self.credit = credit
+        self.cancelled = False
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        async with self._condition:
+            try:
+                await asyncio.wait_for(self._condition.wait_for(lambda: self.credit > 0 or self.cancelled), timeout)
+            except asyncio.TimeoutError:
+                return False
+            if self.cancelled:
+                return False
+            self.credit -= 1
+            return True
+
+    async def grant(self, credit: int) -> None:
+        async with self._condition:
+            self.credit += credit
+            self._condition.notify_all()
+
+    async def cancel(self) -> None:
+        async with self._condition:
+            self.cancelled = True
+            self._condition.notify_all()
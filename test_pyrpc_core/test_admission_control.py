@@ -0,0 +1,126 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pyrpc_core import OverloadedError
+from pyrpc_core.config import ServerConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 19701
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='admission-test')
+
+
+class WorkService:
+    def slow(self, seconds: float) -> float:
+        time.sleep(seconds)
+        return seconds
+
+    def pid(self) -> int:
+        return os.getpid()
+
+
+def start_provider(server_config, **options):
+    provider = ProviderBootstrap(server_config)
+    provider.add_service(
+        service_name='workService',
+        service_instance=WorkService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG,
+        **options
+    )
+    provider.start()
+    return provider
+
+
+@pytest.fixture
+def consumer():
+    consumer = ConsumerBootstrap()
+    consumer.add_service(
+        service_name='workService',
+        service_class=WorkService,
+        registry_config=REGISTRY_CONFIG
+    )
+    consumer.start()
+    yield consumer.get_service('workService')
+    consumer.stop()
+
+
+def call_concurrently(work_service, count, seconds):
+    def call(_):
+        try:
+            return work_service.slow(seconds)
+        except OverloadedError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_queue_full_is_shed(mode, consumer):
+    provider = start_provider(ServerConfig(mode=mode, max_workers=1, max_queue=1))
+    try:
+        start = time.monotonic()
+        results = call_concurrently(consumer, 6, 0.3)
+        overloaded = [result for result in results if isinstance(result, OverloadedError)]
+        # one running and one queued, the rest are rejected without waiting
+        assert results.count(0.3) == 2
+        assert len(overloaded) == 4
+        assert 'request queue full' in str(overloaded[0])
+        assert time.monotonic() - start < 1.5
+        assert consumer.slow(0) == 0
+    finally:
+        provider.stop()
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_service_concurrency_limit(mode, consumer):
+    provider = start_provider(ServerConfig(mode=mode), max_concurrency=2)
+    try:
+        results = call_concurrently(consumer, 5, 0.3)
+        assert results.count(0.3) == 2
+        assert all(isinstance(result, OverloadedError) for result in results if result != 0.3)
+    finally:
+        provider.stop()
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_process_executor(mode, consumer):
+    provider = start_provider(ServerConfig(mode=mode, process_workers=2), executor='process')
+    try:
+        assert consumer.pid() != os.getpid()
+        assert consumer.slow(0.01) == 0.01
+    finally:
+        provider.stop()
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        ProviderBootstrap().add_service('workService', WorkService(), '127.0.0.1', PORT, executor='fiber')
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_batch_calls_are_admitted_one_by_one(mode):
+    provider = start_provider(ServerConfig(mode=mode, max_workers=1, max_queue=1))
+    consumer = ConsumerBootstrap()
+    consumer.add_service('workService', WorkService, registry_config=REGISTRY_CONFIG)
+    consumer.start()
+    try:
+        with consumer.batch():
+            futures = [consumer.get_service('workService').slow(0.3) for _ in range(5)]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except OverloadedError as e:
+                results.append(e)
+        overloaded = [result for result in results if isinstance(result, OverloadedError)]
+        # the batch does not get five calls past a bound of two
+        assert 1 <= results.count(0.3) <= 2
+        assert len(overloaded) == 5 - results.count(0.3)
+        assert 'request queue full' in str(overloaded[0])
+    finally:
+        consumer.stop()
+        provider.stop()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+import pytest
+from pyrpc_core.config import RpcConfig, ServerConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, AsyncConsumerBootstrap
+
+PORT = 19301
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='async-consumer-test')
+
+
+class SleepService:
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+
+@pytest.fixture
+def provider():
+    provider = ProviderBootstrap(ServerConfig(mode='asyncio'))
+    provider.add_service(
+        service_name='sleepService',
+        service_instance=SleepService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    yield provider
+    provider.stop()
+
+
+async def run_with_consumer(rpc_config, body):
+    consumer = AsyncConsumerBootstrap()
+    consumer.add_service(
+        service_name='sleepService',
+        service_class=SleepService,
+        registry_config=REGISTRY_CONFIG,
+        rpc_config=rpc_config
+    )
+    consumer.start()
+    try:
+        return await body(consumer.get_service('sleepService'))
+    finally:
+        consumer.stop()
+
+
+def test_gather_fan_out(provider):
+    async def body(sleep_service):
+        start = time.monotonic()
+        results = await asyncio.gather(*[sleep_service.sleep(0.1) for _ in range(50)])
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run_with_consumer(None, body))
+    assert results == [0.1] * 50
+    assert elapsed < 2
+
+
+def test_timeout_from_rpc_config(provider):
+    async def body(sleep_service):
+        with pytest.raises(TimeoutError):
+            await sleep_service.sleep(1)
+        return await sleep_service.sleep(0)
+
+    rpc_config = RpcConfig(service_name='sleepService', timeout=100)
+    assert asyncio.run(run_with_consumer(rpc_config, body)) == 0
+
+
+def test_consumer_outlives_its_event_loops(provider):
+    consumer = AsyncConsumerBootstrap()
+    consumer.add_service('sleepService', SleepService, registry_config=REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='sleepService', timeout=2000))
+    consumer.start()
+    sleep_service = consumer.get_service('sleepService')
+    try:
+        # each asyncio.run() has a loop of its own, a connection of the first must not be reused
+        assert asyncio.run(sleep_service.sleep(0)) == 0
+        start = time.monotonic()
+        assert asyncio.run(sleep_service.sleep(0)) == 0
+        assert time.monotonic() - start < 1
+    finally:
+        # outside any loop
+        consumer.stop()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pyrpc_core.config import ServerConfig, TransportConfig
+from pyrpc_core.protocol import ProtocolConstants, ProtocolMessage
+from pyrpc_core.transport import AsyncRpcServer, Connection
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 19201
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='async-server-test')
+
+
+class MathService:
+    def add(self, a, b):
+        return a + b
+
+    async def slow_add(self, a, b):
+        await asyncio.sleep(0.05)
+        return a + b
+
+    def fail(self):
+        raise ValueError('boom')
+
+
+@pytest.fixture
+def provider():
+    provider = ProviderBootstrap(ServerConfig(mode='asyncio', max_workers=4))
+    provider.add_service(
+        service_name='mathService',
+        service_instance=MathService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    yield provider
+    provider.stop()
+
+
+def create_consumer(transport_config=None):
+    consumer = ConsumerBootstrap(transport_config)
+    consumer.add_service(
+        service_name='mathService',
+        service_class=MathService,
+        registry_config=REGISTRY_CONFIG
+    )
+    consumer.start()
+    return consumer
+
+
+def test_sync_and_async_methods(provider):
+    consumer = create_consumer()
+    try:
+        math_service = consumer.get_service('mathService')
+        assert math_service.add(1, 2) == 3
+        assert math_service.slow_add(3, 4) == 7
+        with pytest.raises(RuntimeError, match='boom'):
+            math_service.fail()
+    finally:
+        consumer.stop()
+
+
+def test_concurrent_async_calls_overlap(provider):
+    consumer = create_consumer(TransportConfig(multiplex=True))
+    try:
+        math_service = consumer.get_service('mathService')
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(lambda i: math_service.slow_add(i, 1), range(20)))
+        assert results == [i + 1 for i in range(20)]
+    finally:
+        consumer.stop()
+
+
+def test_server_requests():
+    """
+    A raising handler still answers, and requests of a closed connection are cancelled
+    """
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def handler(message, connection):
+        if message.body == b'fail':
+            raise ValueError('handler failed')
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    server = AsyncRpcServer(
+        [('127.0.0.1', PORT + 1)],
+        handler,
+        on_error=lambda message, error: ProtocolMessage.build(
+            ProtocolConstants.RESPONSE_TYPE, message.request_id, str(error).encode(), message.serializer_type
+        )
+    )
+    server.start()
+    try:
+        connection = Connection.open('127.0.0.1', PORT + 1, connect_timeout=1, read_timeout=2)
+        connection.send_message(ProtocolMessage.build(ProtocolConstants.REQUEST_TYPE, 7, b'fail', ProtocolConstants.SERIALIZER_JSON))
+        response = connection.read_message()
+        assert response.request_id == 7 and bytes(response.body) == b'handler failed'
+
+        connection.send_message(ProtocolMessage.build(ProtocolConstants.REQUEST_TYPE, 8, b'wait', ProtocolConstants.SERIALIZER_JSON))
+        assert started.wait(2)
+        connection.close()
+        assert cancelled.wait(2)
+    finally:
+        server.stop()
@@ -0,0 +1,176 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import pytest
+from pyrpc_core import OverloadedError
+from pyrpc_core.config import RpcConfig, ServerConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 19601
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='batching-test')
+
+
+@dataclass
+class User:
+    user_id: int
+    name: str
+
+
+class UserService:
+    def get_user(self, user_id: int) -> User:
+        if user_id < 0:
+            raise ValueError(f'Invalid user id: {user_id}')
+        return User(user_id, f'user-{user_id}')
+
+    def slow(self, seconds: float) -> float:
+        time.sleep(seconds)
+        return seconds
+
+
+@pytest.fixture(params=['thread', 'asyncio'])
+def provider(request):
+    provider = ProviderBootstrap(ServerConfig(mode=request.param))
+    provider.add_service(
+        service_name='userService',
+        service_instance=UserService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    yield provider
+    provider.stop()
+
+
+def start_consumer(rpc_config=None):
+    consumer = ConsumerBootstrap()
+    batches = []
+    invoke_batch = consumer._invoke_batch
+
+    def record_batch(instance, calls, parallel):
+        batches.append(len(calls))
+        invoke_batch(instance, calls, parallel)
+
+    consumer._invoke_batch = record_batch
+    consumer.add_service(
+        service_name='userService',
+        service_class=UserService,
+        registry_config=REGISTRY_CONFIG,
+        rpc_config=rpc_config or RpcConfig(service_name='userService', serializer_type='json')
+    )
+    consumer.start()
+    return consumer, batches
+
+
+def test_explicit_batch(provider):
+    consumer, batches = start_consumer()
+    user_service = consumer.get_service('userService')
+    try:
+        with consumer.batch():
+            futures = [user_service.get_user(user_id) for user_id in range(100)]
+            failed = user_service.get_user(-1)
+        assert [future.result() for future in futures] == [User(user_id, f'user-{user_id}') for user_id in range(100)]
+        with pytest.raises(RuntimeError, match='Invalid user id'):
+            failed.result()
+        assert batches == [101]
+        # outside the block calls are sent on their own again
+        assert user_service.get_user(7) == User(7, 'user-7')
+    finally:
+        consumer.stop()
+
+
+def test_batch_runs_in_parallel(provider):
+    consumer, _ = start_consumer()
+    user_service = consumer.get_service('userService')
+    try:
+        start = time.monotonic()
+        with consumer.batch():
+            futures = [user_service.slow(0.2) for _ in range(8)]
+        assert [future.result() for future in futures] == [0.2] * 8
+        assert time.monotonic() - start < 1
+
+        start = time.monotonic()
+        with consumer.batch(parallel=False):
+            futures = [user_service.slow(0.1) for _ in range(3)]
+        assert [future.result() for future in futures] == [0.1] * 3
+        assert time.monotonic() - start >= 0.3
+    finally:
+        consumer.stop()
+
+
+def test_auto_coalescing(provider):
+    rpc_config = RpcConfig(service_name='userService', serializer_type='json', batch_size=10, batch_window=50)
+    consumer, batches = start_consumer(rpc_config)
+    user_service = consumer.get_service('userService')
+    try:
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            users = list(executor.map(user_service.get_user, range(10)))
+        assert users == [User(user_id, f'user-{user_id}') for user_id in range(10)]
+        assert sum(batches) == 10
+        assert len(batches) < 10
+        # a lone call goes out when the window closes
+        assert user_service.get_user(3) == User(3, 'user-3')
+    finally:
+        consumer.stop()
+
+
+def test_partial_batch_is_flushed(provider):
+    # no batch_window: a lone call must not wait for batch_size calls
+    rpc_config = RpcConfig(service_name='userService', serializer_type='json', batch_size=10)
+    consumer, batches = start_consumer(rpc_config)
+    try:
+        start = time.monotonic()
+        assert consumer.get_service('userService').get_user(1) == User(1, 'user-1')
+        assert time.monotonic() - start < 1
+        assert batches == [1]
+    finally:
+        consumer.stop()
+
+
+def test_failed_batched_calls_are_retried(provider):
+    rpc_config = RpcConfig(service_name='userService', serializer_type='json', batch_size=4, batch_window=50)
+    consumer, batches = start_consumer(rpc_config)
+    record_batch = consumer._invoke_batch
+
+    def shed_first_batch(instance, calls, parallel):
+        if batches:
+            return record_batch(instance, calls, parallel)
+        batches.append(len(calls))
+        for _, _, _, future in calls:
+            future.set_exception(OverloadedError('Server overloaded: request queue full'))
+
+    consumer.consumers['userService'].batcher._send_batch = shed_first_batch
+    user_service = consumer.get_service('userService')
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            users = list(executor.map(user_service.get_user, range(4)))
+        # shed calls never ran, each is sent again on its own
+        assert users == [User(user_id, f'user-{user_id}') for user_id in range(4)]
+        assert batches == [4]
+        # errors of the method itself are final
+        with pytest.raises(RuntimeError, match='Invalid user id'):
+            user_service.get_user(-1)
+    finally:
+        consumer.stop()
+
+
+def test_missing_batch_responses_fail(provider):
+    consumer, _ = start_consumer()
+    invoke_remote = consumer._invoke_remote
+
+    def drop_last_response(instance, request, *args):
+        return invoke_remote(instance, request, *args)[:-1]
+
+    consumer._invoke_remote = drop_last_response
+    try:
+        start = time.monotonic()
+        with consumer.batch():
+            first = consumer.get_service('userService').get_user(1)
+            second = consumer.get_service('userService').get_user(2)
+        assert first.result() == User(1, 'user-1')
+        with pytest.raises(RuntimeError, match='Batch answered 1 of 2 calls'):
+            second.result(1)
+        assert time.monotonic() - start < 1
+    finally:
+        consumer.stop()
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import pytest
+from pyrpc_core import cacheable
+from pyrpc_core.cache import ResultCache
+from pyrpc_core.config import CacheConfig, RpcConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
+
+PORT = 20001
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='cache-test')
+
+
+@dataclass
+class User:
+    user_id: int
+    name: str
+
+
+class UserService:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @cacheable(ttl=200)
+    def get_user(self, user_id: int, suffix: str = '') -> User:
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return User(user_id, f'user-{user_id}{suffix}')
+
+    def fail(self, user_id: int) -> int:
+        with self.lock:
+            self.calls += 1
+        raise ValueError('not cached')
+
+
+@pytest.fixture
+def service():
+    service = UserService()
+    provider = ProviderBootstrap()
+    provider.add_service('userService', service, '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    yield service
+    provider.stop()
+
+
+def start_consumer(bootstrap_type=ConsumerBootstrap, rpc_config=None):
+    consumer = bootstrap_type()
+    consumer.add_service('userService', UserService, registry_config=REGISTRY_CONFIG, rpc_config=rpc_config)
+    consumer.start()
+    return consumer
+
+
+def test_lru_and_size_limits():
+    cache = ResultCache(CacheConfig(max_entries=2))
+    for key in 'abc':
+        cache.get_or_load(key, lambda: key.upper())
+    assert cache.get_or_load('c', lambda: 'miss') == 'C'
+    assert cache.get_or_load('a', lambda: 'reloaded') == 'reloaded'
+    assert cache.stats()['evictions'] == 2
+
+    cache = ResultCache(CacheConfig(max_bytes=10), size_of=len)
+    cache.get_or_load('big', lambda: 'x' * 11)
+    cache.get_or_load('small', lambda: 'x' * 6)
+    cache.get_or_load('other', lambda: 'x' * 6)
+    assert cache.stats() == {'hits': 0, 'misses': 3, 'coalesced': 0, 'evictions': 1, 'entries': 1, 'bytes': 6}
+
+
+def test_hits_and_ttl(service):
+    consumer = start_consumer()
+    user_service = consumer.get_service('userService')
+    try:
+        assert user_service.get_user(1) == User(1, 'user-1')
+        assert user_service.get_user(1) == User(1, 'user-1')
+        # the arguments as passed make up the key
+        assert user_service.get_user(1, suffix='!') == User(1, 'user-1!')
+        assert user_service.get_user(user_id=1, suffix='!') == User(1, 'user-1!')
+        assert service.calls == 3
+        time.sleep(0.25)
+        user_service.get_user(1)
+        assert service.calls == 4
+        stats = consumer.cache_stats('userService')['get_user']
+        assert (stats['hits'], stats['misses']) == (1, 4)
+    finally:
+        consumer.stop()
+
+
+def test_single_flight(service):
+    consumer = start_consumer()
+    user_service = consumer.get_service('userService')
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            users = list(executor.map(lambda _: user_service.get_user(7), range(8)))
+        assert users == [User(7, 'user-7')] * 8
+        assert service.calls == 1
+        assert consumer.cache_stats('userService')['get_user']['coalesced'] == 7
+    finally:
+        consumer.stop()
+
+
+def test_configured_through_extensions(service):
+    rpc_config = RpcConfig(service_name='userService', extensions={'cache': {'fail': {'ttl': 1000}}})
+    consumer = start_consumer(rpc_config=rpc_config)
+    user_service = consumer.get_service('userService')
+    try:
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match='not cached'):
+                user_service.fail(1)
+        # errors are not cached
+        assert service.calls == 2
+        assert set(consumer.cache_stats('userService')) == {'get_user', 'fail'}
+    finally:
+        consumer.stop()
+
+
+def test_async_cache(service):
+    async def body():
+        consumer = start_consumer(AsyncConsumerBootstrap)
+        try:
+            user_service = consumer.get_service('userService')
+            users = await asyncio.gather(*[user_service.get_user(3) for _ in range(5)])
+            return users, await user_service.get_user(3)
+        finally:
+            consumer.stop()
+
+    users, user = asyncio.run(body())
+    assert users == [User(3, 'user-3')] * 5 and user == User(3, 'user-3')
+    assert service.calls == 1
@@ -0,0 +1,182 @@
+import time
+import pytest
+from pyrpc_core.config import CircuitBreakerConfig, RpcConfig
+from pyrpc_core.protocol import OverloadedError
+from pyrpc_core.registry import RegistryConfig, RegistryFactory
+from pyrpc_core.registry.registry import ServiceInstance
+from pyrpc_core.resilience import CircuitBreaker, OutlierDetector
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 20201
+DEAD_PORT = 20202
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='circuit-breaker-test')
+
+
+class EchoService:
+    def echo(self, value: str) -> str:
+        return value
+
+    def fail(self) -> str:
+        raise ValueError('application error')
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(CircuitBreakerConfig(window_size=10, min_calls=4, open_duration=100, half_open_calls=2))
+    for failed in (False, True, False):
+        breaker.record(0.01, failed)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(0.01, True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.try_acquire()
+
+    time.sleep(0.15)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.try_acquire() and breaker.try_acquire()
+    assert not breaker.is_available()
+    # a failed trial opens it again
+    breaker.record(0.01, True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.15)
+    for _ in range(2):
+        assert breaker.try_acquire()
+        breaker.record(0.01, False)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(CircuitBreakerConfig(min_calls=5, slow_call_latency=100, latency_percentile=0.8))
+    for _ in range(4):
+        breaker.record(0.01, False)
+    breaker.record(0.5, False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_ejection():
+    detector = OutlierDetector(CircuitBreakerConfig(
+        min_calls=100, consecutive_errors=3, ejection_duration=100, max_ejection_percent=50
+    ))
+    instances = [ServiceInstance('echoService', '127.0.0.1', port) for port in (1, 2, 3)]
+    address = instances[0].get_address()
+    # application errors say nothing about the instance
+    for _ in range(5):
+        detector.on_call_end(address, 0.01, ValueError('application error'))
+    assert detector.available(instances) == instances
+
+    for _ in range(3):
+        detector.on_call_end(address, 0.01, OverloadedError('overloaded'))
+    assert detector.available(instances) == instances[1:]
+    # at most half of the instances are ejected
+    for _ in range(3):
+        detector.on_call_end(instances[1].get_address(), 0.01, ConnectionRefusedError())
+    assert detector.available(instances) == instances[1:]
+
+    time.sleep(0.15)
+    assert detector.available(instances) == instances
+    # ejected again, for twice as long
+    for _ in range(3):
+        detector.on_call_end(address, 0.01, TimeoutError())
+    time.sleep(0.15)
+    assert instances[0] not in detector.available(instances)
+
+    detector.forget([address])
+    assert instances[0] in detector.available(instances)
+
+
+@pytest.fixture
+def provider():
+    provider = ProviderBootstrap()
+    provider.add_service('echoService', EchoService(), '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    registry = RegistryFactory.get_registry(REGISTRY_CONFIG)
+    dead = ServiceInstance('echoService', '127.0.0.1', DEAD_PORT)
+    registry.register(dead)
+    yield
+    registry.unregister(dead)
+    provider.stop()
+
+
+def test_dead_instance_is_skipped(provider):
+    config = CircuitBreakerConfig(consecutive_errors=2, ejection_duration=60000)
+    consumer = ConsumerBootstrap(circuit_breaker_config=config)
+    consumer.add_service(
+        'echoService',
+        EchoService,
+        registry_config=REGISTRY_CONFIG,
+        rpc_config=RpcConfig(service_name='echoService', load_balance='round_robin', retries=0)
+    )
+    consumer.start()
+    echo_service = consumer.get_service('echoService')
+    try:
+        failures = 0
+        for i in range(10):
+            try:
+                assert echo_service.echo(str(i)) == str(i)
+            except RuntimeError:
+                failures += 1
+        assert failures == 2
+        with pytest.raises(RuntimeError, match='application error'):
+            echo_service.fail()
+        # the live instance stays selectable
+        assert echo_service.echo('ok') == 'ok'
+    finally:
+        consumer.stop()
+
+
+def test_all_instances_open():
+    config = CircuitBreakerConfig(min_calls=1, consecutive_errors=0)
+    consumer = ConsumerBootstrap(circuit_breaker_config=config)
+    consumer.add_service('echoService', EchoService, registry_config=RegistryConfig(
+        registry_type='memory', address='circuit-breaker-open-test'
+    ))
+    registry = RegistryFactory.get_registry(RegistryConfig(registry_type='memory', address='circuit-breaker-open-test'))
+    registry.register(ServiceInstance('echoService', '127.0.0.1', DEAD_PORT))
+    consumer.start()
+    echo_service = consumer.get_service('echoService')
+    try:
+        with pytest.raises(RuntimeError, match='Failed to invoke'):
+            echo_service.echo('a')
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match='circuit open'):
+            echo_service.echo('a')
+        assert time.perf_counter() - start < 0.1
+    finally:
+        consumer.stop()
+
+
+def test_unrecorded_trials_are_given_back():
+    breaker = CircuitBreaker(CircuitBreakerConfig(min_calls=1, open_duration=50, half_open_calls=2))
+    breaker.record(0.01, True)
+    time.sleep(0.06)
+    assert breaker.try_acquire() and breaker.try_acquire()
+    assert not breaker.is_available()
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.is_available()
+
+
+def test_batch_claims_one_trial():
+    registry_config = RegistryConfig(registry_type='memory', address='circuit-breaker-batch-test')
+    provider = ProviderBootstrap()
+    provider.add_service('echoService', EchoService(), '127.0.0.1', PORT + 2, registry_config=registry_config)
+    provider.start()
+    config = CircuitBreakerConfig(min_calls=1, open_duration=50, half_open_calls=3, consecutive_errors=0)
+    consumer = ConsumerBootstrap(circuit_breaker_config=config)
+    consumer.add_service('echoService', EchoService, registry_config=registry_config)
+    consumer.start()
+    echo_service = consumer.get_service('echoService')
+    breaker = consumer._outlier_detector.get_breaker(f'127.0.0.1:{PORT + 2}')
+    try:
+        breaker.record(0.01, True)
+        time.sleep(0.06)
+        with consumer.batch():
+            futures = [echo_service.echo(str(i)) for i in range(3)]
+        assert [future.result() for future in futures] == ['0', '1', '2']
+        # one trial claimed and answered, the others are still free
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.is_available()
+        for i in range(2):
+            assert echo_service.echo(str(i)) == str(i)
+        assert breaker.state == CircuitBreaker.CLOSED
+    finally:
+        consumer.stop()
+        provider.stop()
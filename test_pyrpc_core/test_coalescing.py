@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pyrpc_core import deadline_after, pure
+from pyrpc_core.bootstrap.request_coalescer import RequestCoalescer
+from pyrpc_core.config import ServerConfig, TransportConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.resilience import get_deadline
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 20101
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='coalescing-test')
+
+
+class ReportService:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _count(self):
+        with self.lock:
+            self.calls += 1
+
+    @pure
+    def report(self, key: str) -> str:
+        self._count()
+        time.sleep(0.2)
+        return f'report-{key}'
+
+    @pure(memo_ttl=500)
+    def summary(self, key: str) -> str:
+        self._count()
+        if key == 'bad':
+            raise ValueError('no summary')
+        return f'summary-{key}'
+
+    @pure
+    def render(self, key: str) -> str:
+        self._count()
+        # gives up once the deadline of its call has passed
+        for _ in range(4):
+            time.sleep(0.05)
+            deadline = get_deadline()
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError('out of time')
+        return f'render-{key}'
+
+    def impure(self, key: str) -> str:
+        self._count()
+        time.sleep(0.1)
+        return key
+
+
+@pytest.fixture(params=['thread', 'asyncio'])
+def service(request):
+    service = ReportService()
+    provider = ProviderBootstrap(ServerConfig(mode=request.param))
+    provider.add_service('reportService', service, '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    yield service
+    provider.stop()
+
+
+@pytest.fixture
+def report_service():
+    consumer = ConsumerBootstrap(TransportConfig(multiplex=True))
+    consumer.add_service('reportService', ReportService, registry_config=REGISTRY_CONFIG)
+    consumer.start()
+    yield consumer.get_service('reportService')
+    consumer.stop()
+
+
+def call_concurrently(func, args):
+    with ThreadPoolExecutor(max_workers=len(args)) as executor:
+        return list(executor.map(func, args))
+
+
+def test_identical_requests_share_execution(service, report_service):
+    results = call_concurrently(report_service.report, ['a'] * 8 + ['b'] * 4)
+    assert results == ['report-a'] * 8 + ['report-b'] * 4
+    assert service.calls == 2
+    # without a memo ttl a later request runs again
+    report_service.report('a')
+    assert service.calls == 3
+
+
+def test_impure_methods_run_per_request(service, report_service):
+    call_concurrently(report_service.impure, ['a'] * 4)
+    assert service.calls == 4
+
+
+def test_memoized_responses(service, report_service):
+    assert report_service.summary('a') == 'summary-a'
+    assert report_service.summary('a') == 'summary-a'
+    assert service.calls == 1
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match='no summary'):
+            report_service.summary('bad')
+    # errors are not memoized
+    assert service.calls == 3
+
+
+def test_memo_bound():
+    coalescer = RequestCoalescer(max_memo=2)
+    for key in 'abc':
+        assert coalescer.run(key, lambda: (key, True), memo_ttl=10) == key
+    assert coalescer.run('c', lambda: ('again', True)) == 'c'
+    assert coalescer.run('a', lambda: ('again', True)) == 'again'
+
+
+def test_waiters_run_again_after_a_failed_leader(service, report_service):
+    def render(timeout):
+        try:
+            with deadline_after(timeout):
+                return report_service.render('a')
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(render, 100)
+        time.sleep(0.05)
+        waiter = executor.submit(render, 2000)
+        # the leader ran out of time, the waiter has plenty left
+        assert waiter.result() == 'render-a'
+        assert isinstance(leader.result(), Exception)
+    assert service.calls == 2
+
+
+def test_unshared_values_are_produced_again():
+    coalescer = RequestCoalescer()
+    joined = threading.Event()
+
+    def lead():
+        joined.wait(1)
+        return 'failed', False
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(coalescer.run, 'key', lead)
+        time.sleep(0.05)
+        waiter = executor.submit(coalescer.run, 'key', lambda: ('own', True))
+        time.sleep(0.05)
+        joined.set()
+        assert leader.result() == 'failed'
+        assert waiter.result() == 'own'
@@ -0,0 +1,55 @@
+import pytest
+from pyrpc_core.compressor import CompressorFactory
+from pyrpc_core.config import RpcConfig, ServerConfig
+from pyrpc_core.protocol import ProtocolConstants
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 19401
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='compressor-test')
+
+
+class EchoService:
+    def echo(self, value):
+        return value
+
+
+@pytest.mark.parametrize('name', ['gzip', 'zlib'])
+def test_compress_above_threshold(name):
+    compressor_type = CompressorFactory.get_compressor_type(name)
+    body = b'x' * 2048
+
+    assert CompressorFactory.compress(compressor_type, body, 4096) == (ProtocolConstants.COMPRESSOR_NONE, body)
+
+    used_type, compressed = CompressorFactory.compress(compressor_type, body, 1024)
+    assert used_type == compressor_type
+    assert len(compressed) < len(body)
+    assert CompressorFactory.decompress(used_type, compressed) == body
+
+
+def test_compressed_calls():
+    provider = ProviderBootstrap(ServerConfig(compressor_type='zlib', compress_threshold=256))
+    provider.add_service(
+        service_name='echoService',
+        service_instance=EchoService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    consumer = ConsumerBootstrap()
+    consumer.add_service(
+        service_name='echoService',
+        service_class=EchoService,
+        registry_config=REGISTRY_CONFIG,
+        rpc_config=RpcConfig(service_name='echoService', compressor_type='gzip', compress_threshold=256)
+    )
+    consumer.start()
+    try:
+        echo_service = consumer.get_service('echoService')
+        rows = [{'id': i, 'name': f'user-{i}'} for i in range(500)]
+        assert echo_service.echo(rows) == rows
+        assert echo_service.echo('small') == 'small'
+    finally:
+        consumer.stop()
+        provider.stop()
@@ -0,0 +1,110 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pyrpc_core.config import TransportConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.registry.registry import ServiceInstance
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+from pyrpc_core.transport import ConnectionPool
+
+PORT = 19101
+
+
+class EchoService:
+    def echo(self, value):
+        return value
+
+
+def start_provider():
+    provider = ProviderBootstrap()
+    provider.add_service(
+        service_name='echoService',
+        service_instance=EchoService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=RegistryConfig(registry_type='memory', address='pool-test')
+    )
+    provider.start()
+    return provider
+
+
+@pytest.fixture
+def provider():
+    provider = start_provider()
+    yield provider
+    provider.stop()
+
+
+def create_consumer(transport_config=None):
+    consumer = ConsumerBootstrap(transport_config)
+    consumer.add_service(
+        service_name='echoService',
+        service_class=EchoService,
+        registry_config=RegistryConfig(registry_type='memory', address='pool-test')
+    )
+    consumer.start()
+    return consumer
+
+
+def test_connections_are_reused(provider):
+    consumer = create_consumer()
+    try:
+        echo_service = consumer.get_service('echoService')
+        for i in range(5):
+            assert echo_service.echo(i) == i
+
+        pool = consumer._pools.get_pool(ServiceInstance('echoService', '127.0.0.1', PORT))
+        assert pool.created_count == 1
+        assert pool.idle_count() == 1
+    finally:
+        consumer.stop()
+
+
+def test_idle_connections_are_evicted(provider):
+    consumer = create_consumer(TransportConfig(idle_timeout=0))
+    try:
+        echo_service = consumer.get_service('echoService')
+        assert echo_service.echo('a') == 'a'
+        assert echo_service.echo('b') == 'b'
+
+        pool = consumer._pools.get_pool(ServiceInstance('echoService', '127.0.0.1', PORT))
+        assert pool.created_count == 2
+    finally:
+        consumer.stop()
+
+
+def test_reconnect_after_provider_restart():
+    provider = start_provider()
+    consumer = create_consumer(TransportConfig(health_check=False))
+    try:
+        echo_service = consumer.get_service('echoService')
+        assert echo_service.echo(1) == 1
+
+        provider.stop()
+        provider = start_provider()
+        assert echo_service.echo(2) == 2
+    finally:
+        consumer.stop()
+        provider.stop()
+
+
+def test_pool_size_is_bounded(provider):
+    pool = ConnectionPool('127.0.0.1', PORT, TransportConfig(max_connections=1, connect_timeout=100))
+    connection = pool.acquire()
+    try:
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+    finally:
+        pool.release(connection)
+        pool.close()
+
+
+def test_multiplexed_calls_share_one_connection(provider):
+    consumer = create_consumer(TransportConfig(multiplex=True))
+    try:
+        echo_service = consumer.get_service('echoService')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(echo_service.echo, range(50)))
+        assert results == list(range(50))
+        assert len(consumer._multiplexed._connections) == 1
+    finally:
+        consumer.stop()
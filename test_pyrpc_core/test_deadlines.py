@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from typing import Iterator
+import pytest
+from pyrpc_core import DeadlineExceededError, deadline_after
+from pyrpc_core.config import RpcConfig, ServerConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.resilience import get_deadline
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
+
+PORT = 20301
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='deadline-test')
+
+
+class ClockService:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def sleep(self, seconds: float) -> float:
+        with self.lock:
+            self.calls += 1
+        time.sleep(seconds)
+        return seconds
+
+    def time_left(self) -> float:
+        return get_deadline() - time.monotonic()
+
+    def ticks(self, count: int) -> Iterator[int]:
+        yield from range(count)
+
+
+class RelayService:
+    def __init__(self, clock_service):
+        self.clock_service = clock_service
+
+    def time_left(self) -> float:
+        return self.clock_service.time_left()
+
+    async def time_left_async(self) -> float:
+        return self.clock_service.time_left()
+
+
+@pytest.fixture
+def clock():
+    clock = ClockService()
+    provider = ProviderBootstrap(ServerConfig(max_workers=1))
+    provider.add_service('clockService', clock, '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    yield clock
+    provider.stop()
+
+
+def start_consumer(bootstrap_type=ConsumerBootstrap, **rpc_options):
+    consumer = bootstrap_type()
+    rpc_config = RpcConfig(service_name='clockService', **rpc_options)
+    consumer.add_service('clockService', ClockService, registry_config=REGISTRY_CONFIG, rpc_config=rpc_config)
+    consumer.start()
+    return consumer
+
+
+def test_method_timeouts(clock):
+    consumer = start_consumer(timeout=2000, method_timeouts={'sleep': 100})
+    clock_service = consumer.get_service('clockService')
+    try:
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            clock_service.sleep(0.5)
+        assert time.perf_counter() - start < 0.4
+        time.sleep(0.5)
+        assert 1.5 < clock_service.time_left() <= 2.0
+        with deadline_after(50):
+            assert clock_service.time_left() <= 0.05
+    finally:
+        consumer.stop()
+
+
+def test_expired_requests_are_dropped(clock):
+    busy_consumer = start_consumer()
+    consumer = start_consumer(method_timeouts={'sleep': 200})
+    clock_service = consumer.get_service('clockService')
+    try:
+        busy = threading.Thread(target=busy_consumer.get_service('clockService').sleep, args=(0.3,))
+        busy.start()
+        time.sleep(0.05)
+        # queued behind the busy worker until after its deadline
+        with pytest.raises(TimeoutError):
+            clock_service.sleep(0)
+        busy.join()
+        time.sleep(0.1)
+        assert clock.calls == 1
+    finally:
+        consumer.stop()
+        busy_consumer.stop()
+
+
+def test_expired_deadline_fails_fast(clock):
+    consumer = start_consumer()
+    clock_service = consumer.get_service('clockService')
+    try:
+        with deadline_after(10):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceededError):
+                clock_service.sleep(0)
+        assert clock.calls == 0
+    finally:
+        consumer.stop()
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_nested_calls_inherit_the_deadline(clock, mode):
+    nested = start_consumer()
+    provider = ProviderBootstrap(ServerConfig(mode=mode))
+    relay = RelayService(nested.get_service('clockService'))
+    provider.add_service('relayService', relay, '127.0.0.1', PORT + 1, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    consumer = ConsumerBootstrap()
+    consumer.add_service('relayService', RelayService, registry_config=REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='relayService', timeout=300))
+    consumer.start()
+    try:
+        relay_service = consumer.get_service('relayService')
+        # the nested call has 5 s of its own but only what is left of 300 ms
+        assert 0 < relay_service.time_left() <= 0.3
+        assert 0 < relay_service.time_left_async() <= 0.3
+    finally:
+        consumer.stop()
+        provider.stop()
+        nested.stop()
+
+
+def test_async_consumer(clock):
+    async def body():
+        consumer = start_consumer(AsyncConsumerBootstrap, method_timeouts={'sleep': 100})
+        try:
+            clock_service = consumer.get_service('clockService')
+            with pytest.raises(TimeoutError):
+                await clock_service.sleep(0.3)
+            await asyncio.sleep(0.3)
+            with deadline_after(200):
+                return await clock_service.time_left()
+        finally:
+            consumer.stop()
+
+    assert 0 < asyncio.run(body()) <= 0.2
+
+
+def test_expired_call_is_not_sent(clock):
+    consumer = start_consumer()
+    try:
+        with pytest.raises(DeadlineExceededError):
+            consumer._time_left(time.monotonic() - 0.01)
+    finally:
+        consumer.stop()
+
+
+def test_async_stream_without_timeout(clock):
+    async def body():
+        # timeout=0 leaves each frame to the transport read_timeout
+        consumer = start_consumer(AsyncConsumerBootstrap, timeout=0)
+        try:
+            return [tick async for tick in consumer.get_service('clockService').ticks(3)]
+        finally:
+            consumer.stop()
+
+    assert asyncio.run(body()) == [0, 1, 2]
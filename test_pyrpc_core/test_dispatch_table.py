@@ -0,0 +1,111 @@
+import pytest
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+from pyrpc_core.bootstrap.dispatch_table import DispatchTable
+from pyrpc_core.protocol import StaleMethodTableError
+from pyrpc_core.registry import RegistryConfig, RegistryFactory
+from pyrpc_core.registry.registry import ServiceInstance
+from pyrpc_core.serializer import SerializerFactory
+
+PORT = 19901
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='dispatch-test')
+
+
+class EchoService:
+    def echo(self, value):
+        return value
+
+    async def echo_async(self, value):
+        return value
+
+    def _helper(self):
+        return 'private'
+
+
+class OtherService:
+    def ping(self):
+        return 'pong'
+
+
+class ShoutService:
+    def shout(self, value):
+        return value.upper()
+
+
+def test_resolve_by_id_and_name():
+    table = DispatchTable()
+    table.add_service('echoService', EchoService())
+    table.add_service('otherService', OtherService())
+
+    method_ids = DispatchTable.parse_metadata(table.get_metadata('otherService'))
+    assert list(method_ids) == ['ping']
+    entry = table.resolve({'method_id': method_ids['ping']})
+    assert (entry.service_name, entry.method_name) == ('otherService', 'ping')
+    assert table.resolve({'service_name': 'echoService', 'method_name': 'echo_async'}).is_coroutine
+
+    with pytest.raises(LookupError, match='Method not found: #99'):
+        table.resolve({'method_id': 99})
+    with pytest.raises(StaleMethodTableError):
+        table.resolve({'method_id': method_ids['ping'], 'table': '00000000'})
+    assert table.resolve({'method_id': method_ids['ping'], 'table': table.get_checksum()}).method_name == 'ping'
+    with pytest.raises(LookupError, match='Method not found: _helper'):
+        table.resolve({'service_name': 'echoService', 'method_name': '_helper'})
+    with pytest.raises(LookupError, match='Service not found'):
+        table.resolve({'service_name': 'missing', 'method_name': 'echo'})
+
+
+def test_consumer_sends_method_ids():
+    provider = ProviderBootstrap()
+    provider.add_service('otherService', OtherService(), '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.add_service('echoService', EchoService(), '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    consumer = ConsumerBootstrap()
+    consumer.add_service('echoService', EchoService, registry_config=REGISTRY_CONFIG)
+    consumer.start()
+    try:
+        echo_service = consumer.get_service('echoService')
+        assert echo_service.echo('hello') == 'hello'
+        assert echo_service.echo(value='hello') == 'hello'
+
+        request = {'service_name': 'echoService', 'method_name': 'echo', 'args': ('hi',), 'kwargs': {}}
+        instance = consumer._select_instance(consumer.consumers['echoService'], request)
+        message = consumer._build_request_message(request, instance=instance)
+        body = SerializerFactory.get_serializer(message.serializer_type).deserialize(message.body, dict)
+        table = instance.metadata[DispatchTable.CHECKSUM_KEY]
+        assert body == {'method_id': 1, 'table': table, 'args': ['hi']}
+    finally:
+        consumer.stop()
+        provider.stop()
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_reordered_provider_refuses_stale_ids(batch):
+    # the registry still advertises the table of a previous start, with echo first
+    previous = DispatchTable()
+    previous.add_service('echoService', EchoService())
+    previous.add_service('shoutService', ShoutService())
+    registry_config = RegistryConfig(registry_type='memory', address='dispatch-stale-test')
+    RegistryFactory.get_registry(registry_config).register(ServiceInstance('echoService', '127.0.0.1', PORT + 1, {
+        DispatchTable.METADATA_KEY: previous.get_metadata('echoService'),
+        DispatchTable.CHECKSUM_KEY: previous.get_checksum()
+    }))
+    # restarted with shout first: the advertised ID of echo is now the one of shout
+    provider = ProviderBootstrap()
+    provider.add_service('shoutService', ShoutService(), '127.0.0.1', PORT + 1)
+    provider.add_service('echoService', EchoService(), '127.0.0.1', PORT + 1)
+    provider.start()
+    consumer = ConsumerBootstrap()
+    consumer.add_service('echoService', EchoService, registry_config=registry_config)
+    consumer.start()
+    try:
+        echo_service = consumer.get_service('echoService')
+        if batch:
+            with consumer.batch():
+                future = echo_service.echo('hi')
+            assert future.result() == 'hi'
+        else:
+            assert echo_service.echo('hi') == 'hi'
+        assert echo_service.echo('again') == 'again'
+    finally:
+        consumer.stop()
+        provider.stop()
+        RegistryFactory.get_registry(registry_config).unregister(ServiceInstance('echoService', '127.0.0.1', PORT + 1))
@@ -0,0 +1,205 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pyrpc_core import CallContext, Interceptor, pure
+from pyrpc_core.config import RpcConfig, ServerConfig
+from pyrpc_core.interceptor import InterceptorChain
+from pyrpc_core.protocol import ProtocolMessage
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
+
+PORT = 20601
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='interceptor-test')
+
+
+class GreetingService:
+    def greet(self, name: str) -> str:
+        return f'hello {name}'
+
+    def ping(self) -> str:
+        return 'pong'
+
+    def secret(self) -> str:
+        return 'secret'
+
+    motd_runs = 0
+
+    @pure(memo_ttl=1000)
+    def motd(self) -> str:
+        self.motd_runs += 1
+        time.sleep(0.1)
+        return 'be kind'
+
+
+class Recorder(Interceptor):
+    def __init__(self, name, calls, methods=None):
+        self.name = name
+        self.calls = calls
+        self.methods = methods
+
+    def applies_to(self, service_name, method_name):
+        return self.methods is None or method_name in self.methods
+
+    def intercept(self, context, proceed):
+        self.calls.append(f'{self.name}>')
+        result = proceed(context)
+        self.calls.append(f'<{self.name}')
+        return result
+
+    async def intercept_async(self, context, proceed):
+        self.calls.append(f'{self.name}>')
+        result = await proceed(context)
+        self.calls.append(f'<{self.name}')
+        return result
+
+
+class TokenInterceptor(Interceptor):
+    """
+    Sends a token with each request and keeps the raw messages of the call
+    """
+
+    def __init__(self, token):
+        self.token = token
+        self.contexts = []
+
+    def intercept(self, context, proceed):
+        context.request['metadata'] = {'token': self.token}
+        self.contexts.append(context)
+        return proceed(context)
+
+    async def intercept_async(self, context, proceed):
+        context.request['metadata'] = {'token': self.token}
+        self.contexts.append(context)
+        return await proceed(context)
+
+
+class AuthInterceptor(Interceptor):
+    """
+    Rejects the requests of greet without the expected token
+    """
+
+    def applies_to(self, service_name, method_name):
+        return method_name == 'greet'
+
+    def check(self, context):
+        assert isinstance(context.message, ProtocolMessage)
+        return (context.request.get('metadata') or {}).get('token') == 'secret'
+
+    def intercept(self, context, proceed):
+        if not self.check(context):
+            return {'status': 'error', 'message': 'unauthorized'}
+        return proceed(context)
+
+    async def intercept_async(self, context, proceed):
+        if not self.check(context):
+            return {'status': 'error', 'message': 'unauthorized'}
+        return await proceed(context)
+
+
+class DenyInterceptor(Interceptor):
+    """
+    Rejects the requests of secret by raising
+    """
+
+    def applies_to(self, service_name, method_name):
+        return method_name == 'secret'
+
+    def intercept(self, context, proceed):
+        raise PermissionError('denied')
+
+    async def intercept_async(self, context, proceed):
+        raise PermissionError('denied')
+
+
+def test_chain_order():
+    calls = []
+    interceptors = [Recorder('a', calls), Recorder('b', calls, methods={'greet'})]
+    chain = InterceptorChain.compose(interceptors, 'greetingService', 'greet', lambda context: calls.append('call'))
+    chain(CallContext('greetingService', 'greet', {}))
+    assert calls == ['a>', 'b>', 'call', '<b', '<a']
+    assert InterceptorChain.compose(interceptors[1:], 'greetingService', 'ping', lambda context: None) is None
+
+
+@pytest.fixture(params=['thread', 'asyncio'])
+def provider(request):
+    provider = ProviderBootstrap(ServerConfig(mode=request.param))
+    provider.greeting_service = GreetingService()
+    provider.add_service('greetingService', provider.greeting_service, '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.add_interceptor(AuthInterceptor())
+    provider.add_interceptor(DenyInterceptor())
+    provider.motd_calls = []
+    provider.add_interceptor(Recorder('motd', provider.motd_calls, methods={'motd'}))
+    provider.start()
+    yield provider
+    provider.stop()
+
+
+def start_consumer(bootstrap_type=ConsumerBootstrap, *interceptors):
+    consumer = bootstrap_type()
+    consumer.add_service('greetingService', GreetingService, registry_config=REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='greetingService', retries=0))
+    for interceptor in interceptors:
+        consumer.add_interceptor(interceptor)
+    consumer.start()
+    return consumer
+
+
+def test_interceptors(provider):
+    tokens = TokenInterceptor('secret')
+    consumer = start_consumer(ConsumerBootstrap, tokens)
+    anonymous = start_consumer()
+    try:
+        assert consumer.get_service('greetingService').greet('bob') == 'hello bob'
+        context = tokens.contexts[-1]
+        assert context.method_name == 'greet' and context.instance.port == PORT
+        assert context.message.request_id == context.response_message.request_id
+
+        greeting_service = anonymous.get_service('greetingService')
+        assert not anonymous._chains
+        with pytest.raises(RuntimeError, match='unauthorized'):
+            greeting_service.greet('bob')
+        # the provider has no chain for ping
+        assert greeting_service.ping() == 'pong'
+    finally:
+        consumer.stop()
+        anonymous.stop()
+
+
+def test_interceptor_errors_are_responses(provider):
+    consumer = start_consumer()
+    try:
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match='denied'):
+            consumer.get_service('greetingService').secret()
+        assert time.perf_counter() - start < 1
+    finally:
+        consumer.stop()
+
+
+def test_async_consumer(provider):
+    async def body():
+        tokens = TokenInterceptor('secret')
+        consumer = start_consumer(AsyncConsumerBootstrap, tokens)
+        try:
+            result = await consumer.get_service('greetingService').greet('alice')
+            assert tokens.contexts[-1].response_message is not None
+            return result
+        finally:
+            consumer.stop()
+
+    assert asyncio.run(body()) == 'hello alice'
+
+
+def test_coalesced_requests_pass_the_chain(provider):
+    consumer = start_consumer()
+    try:
+        greeting_service = consumer.get_service('greetingService')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert list(executor.map(lambda _: greeting_service.motd(), range(4))) == ['be kind'] * 4
+        # memoized now
+        assert greeting_service.motd() == 'be kind'
+        assert provider.greeting_service.motd_runs == 1
+        assert sorted(provider.motd_calls) == ['<motd'] * 5 + ['motd>'] * 5
+    finally:
+        consumer.stop()
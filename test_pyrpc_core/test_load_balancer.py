@@ -0,0 +1,56 @@
+import pytest
+from collections import Counter
+from pyrpc_core.loadbalance import LoadBalancerFactory, InstanceStatsTracker
+from pyrpc_core.registry.registry import ServiceInstance
+
+
+@pytest.fixture
+def instances():
+    return [
+        ServiceInstance('testService', 'localhost', 1000 + i, metadata={'weight': str(100 * (i + 1))})
+        for i in range(3)
+    ]
+
+
+def test_round_robin(instances):
+    load_balancer = LoadBalancerFactory.get_load_balancer('round_robin')
+    selected = [load_balancer.select(instances, {}) for _ in range(6)]
+    assert selected == instances + instances
+
+
+def test_weighted_random_follows_weights(instances):
+    load_balancer = LoadBalancerFactory.get_load_balancer('weighted_random')
+    counts = Counter(load_balancer.select(instances, {}).port for _ in range(6000))
+    assert counts[1000] < counts[1001] < counts[1002]
+
+
+def test_least_active_avoids_busy_instances(instances):
+    stats = InstanceStatsTracker()
+    stats.on_call_start(instances[0].get_address())
+    stats.on_call_start(instances[1].get_address())
+    load_balancer = LoadBalancerFactory.get_load_balancer('least_active', stats)
+    assert load_balancer.select(instances, {}) == instances[2]
+
+
+def test_p2c_prefers_less_loaded(instances):
+    stats = InstanceStatsTracker()
+    for _ in range(10):
+        stats.on_call_start(instances[0].get_address())
+    load_balancer = LoadBalancerFactory.get_load_balancer('p2c', stats)
+    assert instances[0] not in [load_balancer.select(instances[:2], {}) for _ in range(20)]
+
+
+def test_consistent_hash_is_sticky(instances):
+    load_balancer = LoadBalancerFactory.get_load_balancer('consistent_hash')
+    first = {key: load_balancer.select(instances, {'args': (key,)}) for key in range(100)}
+    assert all(load_balancer.select(instances, {'args': (key,)}) == first[key] for key in range(100))
+
+    # removing an instance only moves the keys it owned
+    remaining = instances[:2]
+    moved = [key for key in range(100) if load_balancer.select(remaining, {'args': (key,)}) != first[key]]
+    assert all(first[key] == instances[2] for key in moved)
+
+
+def test_unknown_load_balance():
+    with pytest.raises(ValueError):
+        LoadBalancerFactory.get_load_balancer('unknown')
@@ -0,0 +1,83 @@
+import urllib.request
+import pytest
+from pyrpc_core import MetricsRegistry, PrometheusExporter
+from pyrpc_core.config import ServerConfig
+from pyrpc_core.metrics import LatencyHistogram
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+
+PORT = 20501
+EXPORTER_PORT = 20502
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='metrics-test')
+
+
+class GreetingService:
+    def greet(self, name: str) -> str:
+        return f'hello {name}'
+
+    def fail(self) -> str:
+        raise ValueError('no greeting')
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    for micros in range(1, 1001):
+        histogram.record(micros / 1_000_000)
+    assert histogram.count == 1000
+    # within the 1/16 precision of the buckets
+    assert abs(histogram.percentile(0.5) - 0.0005) < 0.0005 / 16
+    assert abs(histogram.percentile(0.99) - 0.00099) < 0.00099 / 16
+    assert histogram.percentile(1.0) <= histogram.max == 0.001
+    assert histogram.cumulative_counts([0.000063, 0.01]) == [63, 1000]
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_call_metrics(mode):
+    metrics = MetricsRegistry()
+    provider = ProviderBootstrap(ServerConfig(mode=mode), metrics=metrics)
+    provider.add_service('greetingService', GreetingService(), '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    consumer = ConsumerBootstrap(metrics=metrics)
+    consumer.add_service('greetingService', GreetingService, registry_config=REGISTRY_CONFIG)
+    consumer.start()
+    try:
+        greeting_service = consumer.get_service('greetingService')
+        for name in ('a', 'b', 'c'):
+            greeting_service.greet(name)
+        with pytest.raises(RuntimeError):
+            greeting_service.fail()
+    finally:
+        consumer.stop()
+        provider.stop()
+
+    summary = metrics.summary()
+    for side in ('consumer', 'provider'):
+        greet = summary[side]['greetingService']['greet']
+        assert (greet['calls'], greet['errors'], greet['in_flight']) == (3, 0, 0)
+        assert greet['bytes_in'] > 0 and greet['bytes_out'] > 0
+        assert 0 < greet['p50'] <= greet['p99'] <= greet['max']
+        fail = summary[side]['greetingService']['fail']
+        assert (fail['calls'], fail['errors']) == (1, 1)
+    assert set(summary['consumer']['greetingService']['greet']['phases']) == {'serialize', 'network', 'deserialize'}
+    assert set(summary['provider']['greetingService']['greet']['phases']) == {'serialize', 'execute'}
+    # what one side sends the other receives
+    assert summary['consumer']['greetingService']['greet']['bytes_out'] == summary['provider']['greetingService']['greet']['bytes_in']
+
+
+def test_prometheus_exporter():
+    metrics = MetricsRegistry()
+    method_metrics = metrics.get(MetricsRegistry.CONSUMER, 'greetingService', 'greet')
+    method_metrics.on_call_start()
+    method_metrics.on_call_end(0.003, network=0.002)
+    exporter = PrometheusExporter(metrics).start(EXPORTER_PORT, host='127.0.0.1')
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{EXPORTER_PORT}/metrics') as response:
+            text = response.read().decode('utf-8')
+    finally:
+        exporter.stop()
+    labels = 'side="consumer",service="greetingService",method="greet"'
+    assert f'pyrpc_calls_total{{{labels}}} 1' in text
+    assert f'pyrpc_latency_seconds_bucket{{{labels},le="0.0025"}} 0' in text
+    assert f'pyrpc_latency_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'pyrpc_phase_seconds_count{{{labels},phase="network"}} 1' in text
+    assert '# TYPE pyrpc_latency_seconds histogram' in text
@@ -0,0 +1,47 @@
+import socket
+import threading
+from pyrpc_core.protocol import ProtocolConstants, ProtocolMessage
+from pyrpc_core.transport import Connection
+
+
+def create_message(body: bytes, request_id: int = 1) -> ProtocolMessage:
+    return ProtocolMessage(
+        magic_number=ProtocolConstants.MAGIC_NUMBER,
+        version=ProtocolConstants.VERSION,
+        serializer_type=ProtocolConstants.SERIALIZER_JSON,
+        message_type=ProtocolConstants.REQUEST_TYPE,
+        compressor_type=ProtocolConstants.COMPRESSOR_NONE,
+        request_id=request_id,
+        body_length=len(body),
+        body=body
+    )
+
+
+def test_to_bytes_and_from_bytes():
+    message = create_message(b'{"key": "value"}', request_id=2 ** 40)
+    data = message.to_bytes()
+    assert len(data) == ProtocolMessage.get_header_length() + message.body_length
+
+    decoded = ProtocolMessage.from_bytes(data)
+    assert decoded.request_id == 2 ** 40
+    assert bytes(decoded.body) == message.body
+
+
+def test_connection_frames_large_bodies():
+    left, right = socket.socketpair()
+    sender, receiver = Connection(left, 'left'), Connection(right, 'right')
+    body = bytes(range(256)) * 40000
+    try:
+        thread = threading.Thread(target=lambda: [sender.send_message(create_message(body, i)) for i in range(3)])
+        thread.start()
+        for i in range(3):
+            message = receiver.read_message()
+            assert message.request_id == i
+            assert message.body == body
+        thread.join()
+
+        sender.close()
+        assert receiver.read_message() is None
+    finally:
+        sender.close()
+        receiver.close()
@@ -0,0 +1,153 @@
+import functools
+import threading
+import time
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.registry import redis_registry
+from pyrpc_core.registry.redis_registry import RedisRegistry
+from pyrpc_core.registry.registry import ServiceInstance
+
+SERVICE = 'redisTestService'
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_registry.redis, 'Redis', functools.partial(fakeredis.FakeRedis, server=server))
+    return server
+
+
+@pytest.fixture
+def client(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+@pytest.fixture
+def open_registry(server):
+    registries = []
+
+    def open_registry(**properties):
+        registry = RedisRegistry(RegistryConfig(registry_type='redis', address='localhost:6379', properties=properties))
+        registries.append(registry)
+        return registry
+
+    yield open_registry
+    for registry in registries:
+        registry.close()
+
+
+def instance(port):
+    return ServiceInstance(service_name=SERVICE, host='127.0.0.1', port=port)
+
+
+def heartbeat_key(port):
+    return f'{RedisRegistry.HEARTBEAT_PREFIX}127.0.0.1:{port}'
+
+
+def wait_until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_events_refresh_the_cache(open_registry, client):
+    provider = open_registry()
+    consumer = open_registry(cache_ttl=60)
+    changes = []
+    changed = threading.Event()
+
+    def on_change(service_name, instances):
+        changes.append((service_name, [item.port for item in instances]))
+        changed.set()
+
+    consumer.subscribe(SERVICE, on_change)
+    assert consumer.list_instances(SERVICE) == []
+
+    provider.register(instance(7001))
+    assert changed.wait(3)
+    assert changes[-1] == (SERVICE, [7001])
+    assert [item.port for item in consumer.list_instances(SERVICE)] == [7001]
+
+    # a write without an event is not seen until the cache expires
+    client.hset(f'{RedisRegistry.SERVICE_PREFIX}{SERVICE}', '127.0.0.1:7002', '{"host": "127.0.0.1", "port": 7002}')
+    client.set(heartbeat_key(7002), '1')
+    assert [item.port for item in consumer.list_instances(SERVICE)] == [7001]
+
+    changed.clear()
+    provider.unregister(instance(7001))
+    assert changed.wait(3)
+    assert changes[-1] == (SERVICE, [7002])
+    assert [item.port for item in consumer.list_instances(SERVICE)] == [7002]
+
+
+def test_expired_heartbeat_is_filtered_out(open_registry, client):
+    provider = open_registry()
+    consumer = open_registry(cache_ttl=0)
+    provider.register(instance(7011))
+    provider.register(instance(7012))
+    assert sorted(item.port for item in consumer.list_instances(SERVICE)) == [7011, 7012]
+
+    client.pexpire(heartbeat_key(7011), 50)
+    assert wait_until(lambda: [item.port for item in consumer.list_instances(SERVICE)] == [7012])
+    # the hash entry stays until a reaper removes it
+    assert client.hexists(f'{RedisRegistry.SERVICE_PREFIX}{SERVICE}', '127.0.0.1:7011')
+
+
+def test_heartbeats_are_renewed(open_registry, client, monkeypatch):
+    monkeypatch.setattr(RedisRegistry, 'SERVICE_TTL', 1)
+    provider = open_registry(heartbeat_interval=0.2)
+    consumer = open_registry(cache_ttl=0)
+    provider.register(instance(7021))
+
+    time.sleep(1.5)
+    assert client.exists(heartbeat_key(7021))
+    assert [item.port for item in consumer.list_instances(SERVICE)] == [7021]
+
+    # without a renewer the heartbeat runs out
+    provider.close()
+    assert wait_until(lambda: not client.exists(heartbeat_key(7021)))
+    assert consumer.list_instances(SERVICE) == []
+
+
+def test_reaper_removes_dead_instances(open_registry, client):
+    provider = open_registry(heartbeat_interval=0.1)
+    provider.register(instance(7031))
+    service_key = f'{RedisRegistry.SERVICE_PREFIX}{SERVICE}'
+    # an instance that stopped without unregistering
+    client.hset(service_key, '127.0.0.1:7032', '{"host": "127.0.0.1", "port": 7032}')
+
+    reaper = open_registry(heartbeat_interval=0.1, reap_expired=True)
+    reaped = threading.Event()
+    reaper.subscribe(SERVICE, lambda service_name, instances: reaped.set())
+    assert wait_until(lambda: not client.hexists(service_key, '127.0.0.1:7032'))
+    assert client.hexists(service_key, '127.0.0.1:7031')
+    # consumers are told about the removal
+    assert reaped.wait(3)
+    assert [item.port for item in reaper.list_instances(SERVICE)] == [7031]
+
+
+def test_registries_share_one_renewer(open_registry, client, monkeypatch):
+    monkeypatch.setattr(RedisRegistry, 'SERVICE_TTL', 1)
+    first = open_registry(heartbeat_interval=0.2)
+    second = open_registry(heartbeat_interval=0.2)
+    first.register(instance(7041))
+    second.register(instance(7042))
+    renewer = first._renewer
+    assert renewer is second._renewer
+
+    time.sleep(1.5)
+    assert client.exists(heartbeat_key(7041)) and client.exists(heartbeat_key(7042))
+
+    # the other registry keeps the thread going
+    first.close()
+    assert renewer._thread.is_alive()
+    assert wait_until(lambda: not client.exists(heartbeat_key(7041)))
+    assert client.exists(heartbeat_key(7042))
+    second.close()
+    assert not renewer._thread.is_alive()
@@ -0,0 +1,234 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from pyrpc_core import idempotent
+from pyrpc_core.config import CircuitBreakerConfig, RetryConfig, RpcConfig, TransportConfig
+from pyrpc_core.registry import RegistryConfig, RegistryFactory
+from pyrpc_core.registry.registry import ServiceInstance
+from pyrpc_core.resilience import RetryBudget, RetryPolicy
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
+
+PORT = 20401
+RESET_PORT = 20402
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='retry-test')
+HEDGE_REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='hedge-test')
+
+
+class CounterService:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @idempotent
+    def get(self) -> int:
+        time.sleep(self.delay)
+        return self.calls
+
+    def increment(self) -> int:
+        with self.lock:
+            self.calls += 1
+            return self.calls
+
+
+def reset_connections(server_socket):
+    """
+    An instance that reads each request then drops the connection without answering
+    """
+    while True:
+        try:
+            client, _ = server_socket.accept()
+        except OSError:
+            return
+        client.recv(65536)
+        client.close()
+
+
+@pytest.fixture
+def services():
+    service = CounterService()
+    provider = ProviderBootstrap()
+    provider.add_service('counterService', service, '127.0.0.1', PORT, registry_config=REGISTRY_CONFIG)
+    provider.start()
+    server_socket = socket.create_server(('127.0.0.1', RESET_PORT))
+    threading.Thread(target=reset_connections, args=(server_socket,), daemon=True).start()
+    registry = RegistryFactory.get_registry(REGISTRY_CONFIG)
+    broken = ServiceInstance('counterService', '127.0.0.1', RESET_PORT)
+    registry.register(broken)
+    yield service
+    registry.unregister(broken)
+    # wake up the thread blocked in accept()
+    server_socket.shutdown(socket.SHUT_RDWR)
+    server_socket.close()
+    provider.stop()
+
+
+def start_consumer(retry_config=None, **rpc_options):
+    # no ejections, the broken instance keeps being selected
+    consumer = ConsumerBootstrap(circuit_breaker_config=CircuitBreakerConfig(enabled=False), retry_config=retry_config)
+    rpc_config = RpcConfig(service_name='counterService', load_balance='round_robin', **rpc_options)
+    consumer.add_service('counterService', CounterService, registry_config=REGISTRY_CONFIG, rpc_config=rpc_config)
+    consumer.start()
+    return consumer
+
+
+def test_budget():
+    budget = RetryBudget(ratio=0.5)
+    for _ in range(4):
+        budget.deposit()
+    assert budget.try_withdraw() and budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+    budget = RetryBudget(ratio=0, min_per_second=100)
+    assert all(budget.try_withdraw() for _ in range(100))
+    assert not budget.try_withdraw()
+    time.sleep(0.05)
+    assert budget.try_withdraw()
+
+
+def test_backoff():
+    policy = RetryPolicy(3, RetryConfig(backoff=100, max_backoff=200))
+    error = RuntimeError('Failed to invoke remote service')
+    error.__cause__ = ConnectionResetError()
+    assert policy.get_backoff(error, 1, idempotent=False) is None
+    assert all(0 <= policy.get_backoff(error, 3, idempotent=True) <= 0.2 for _ in range(5))
+    assert policy.get_backoff(error, 4, idempotent=True) is None
+    assert policy.get_backoff(error, 1, idempotent=True, deadline=time.monotonic()) is None
+    assert policy.get_backoff(RuntimeError('application error'), 1, idempotent=True) is None
+
+
+def test_only_idempotent_calls_are_retried(services):
+    consumer = start_consumer()
+    counter_service = consumer.get_service('counterService')
+    try:
+        assert all(counter_service.get() == 0 for _ in range(6))
+        failures = 0
+        for _ in range(6):
+            try:
+                counter_service.increment()
+            except RuntimeError:
+                failures += 1
+        assert 0 < failures < 6
+        assert services.calls == 6 - failures
+    finally:
+        consumer.stop()
+
+
+def test_retries_stop_when_the_budget_is_spent(services):
+    consumer = start_consumer(RetryConfig(budget_ratio=0, min_retries_per_second=0))
+    counter_service = consumer.get_service('counterService')
+    try:
+        with pytest.raises(RuntimeError):
+            for _ in range(2):
+                counter_service.get()
+    finally:
+        consumer.stop()
+
+
+@pytest.fixture
+def hedge_services():
+    providers = []
+    for port, delay in ((PORT + 2, 0.5), (PORT + 3, 0)):
+        provider = ProviderBootstrap()
+        provider.add_service('counterService', CounterService(delay), '127.0.0.1', port,
+                             registry_config=HEDGE_REGISTRY_CONFIG)
+        provider.start()
+        providers.append(provider)
+    yield
+    for provider in providers:
+        provider.stop()
+
+
+@pytest.mark.parametrize('bootstrap_type', [ConsumerBootstrap, AsyncConsumerBootstrap])
+def test_hedged_calls(hedge_services, bootstrap_type):
+    consumer = bootstrap_type(retry_config=RetryConfig(hedge=True, hedge_min_samples=5))
+    consumer.add_service('counterService', CounterService, registry_config=HEDGE_REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='counterService', load_balance='round_robin'))
+    consumer.start()
+    policy = consumer.consumers['counterService'].retry_policy
+    for _ in range(5):
+        policy.record_latency('get', 0.01)
+    counter_service = consumer.get_service('counterService')
+
+    async def call_async():
+        try:
+            return [await timed(counter_service.get) for _ in range(4)]
+        finally:
+            consumer.stop()
+
+    async def timed(method):
+        start = time.perf_counter()
+        assert await method() == 0
+        return time.perf_counter() - start
+
+    if bootstrap_type is AsyncConsumerBootstrap:
+        latencies = asyncio.run(call_async())
+    else:
+        try:
+            latencies = []
+            for _ in range(4):
+                start = time.perf_counter()
+                assert counter_service.get() == 0
+                latencies.append(time.perf_counter() - start)
+        finally:
+            consumer.stop()
+    # the slow instance is hedged after about 10 ms
+    assert max(latencies) < 0.3
+
+
+@pytest.mark.parametrize('multiplex', [False, True])
+def test_hedge_aborts_the_first_call(hedge_services, multiplex):
+    consumer = ConsumerBootstrap(transport_config=TransportConfig(multiplex=multiplex),
+                                 retry_config=RetryConfig(hedge=True, hedge_min_samples=5))
+    consumer.add_service('counterService', CounterService, registry_config=HEDGE_REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='counterService', load_balance='round_robin'))
+    consumer.start()
+    policy = consumer.consumers['counterService'].retry_policy
+    for _ in range(5):
+        policy.record_latency('get', 0.01)
+    threads = {}
+    invoke_remote = consumer._invoke_remote
+
+    def record_thread(instance, request, *args):
+        threads.setdefault(instance.port, set()).add(threading.current_thread())
+        return invoke_remote(instance, request, *args)
+
+    consumer._invoke_remote = record_thread
+    try:
+        for _ in range(4):
+            start = time.perf_counter()
+            assert consumer.get_service('counterService').get() == 0
+            assert time.perf_counter() - start < 0.3
+        # the slow instance is only ever called first, on this thread
+        assert threads[PORT + 2] == {threading.current_thread()}
+        # the aborted calls count neither as successes nor as failures
+        slow = consumer._instance_stats.get(f'127.0.0.1:{PORT + 2}')
+        assert slow.in_flight == 0 and slow.calls == 0 and slow.errors == 0
+        assert consumer.metrics.get('consumer', 'counterService', 'get').in_flight == 0
+    finally:
+        consumer.stop()
+
+
+def test_cancelled_hedge_is_not_counted(hedge_services):
+    consumer = AsyncConsumerBootstrap(retry_config=RetryConfig(hedge=True, hedge_min_samples=5))
+    consumer.add_service('counterService', CounterService, registry_config=HEDGE_REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='counterService', load_balance='round_robin'))
+    consumer.start()
+    policy = consumer.consumers['counterService'].retry_policy
+    for _ in range(5):
+        policy.record_latency('get', 0.01)
+
+    async def body():
+        try:
+            for _ in range(4):
+                assert await consumer.get_service('counterService').get() == 0
+        finally:
+            consumer.stop()
+
+    asyncio.run(body())
+    slow = consumer._instance_stats.get(f'127.0.0.1:{PORT + 2}')
+    assert slow.in_flight == 0 and slow.calls == 0 and slow.errors == 0
+    breaker = consumer._outlier_detector.get_breaker(f'127.0.0.1:{PORT + 2}')
+    assert not breaker._outcomes
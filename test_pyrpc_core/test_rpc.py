@@ -6,7 +6,7 @@ from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
 
 class UserServiceImpl(UserService):
     def __init__(self):
-        self.users = []
+        self.users = {}
 
     def get_user(self, id: int) -> User:
         return self.users.get(id)
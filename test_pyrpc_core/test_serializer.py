@@ -13,3 +13,62 @@ def test_serialize_and_deserialize(serializer):
     deserialized_data = serializer.deserialize(serialized_data)
 
     assert deserialized_data == data
+
+
+def test_msgpack_round_trips_dataclasses():
+    from dataclasses import dataclass
+    from typing import List
+    from pyrpc_core_example_common.model import User
+    from pyrpc_core.protocol import ProtocolConstants
+    from pyrpc_core.serializer import SerializerFactory, TypeRegistry
+
+    @dataclass
+    class Team:
+        name: str
+        members: List[User]
+
+    TypeRegistry.register(Team)
+    TypeRegistry.register(User)
+    serializer = SerializerFactory.get_serializer(ProtocolConstants.SERIALIZER_MSGPACK)
+
+    team = Team(name='core', members=[User(id=1, name='test', age=18)])
+    data = {'status': 'success', 'data': team}
+    assert serializer.deserialize(serializer.serialize(data)) == data
+
+
+def test_msgpack_keeps_unregistered_types_as_lists(monkeypatch):
+    from dataclasses import dataclass
+    from pyrpc_core.serializer.msgpack_serializer import MsgpackSerializer
+    from pyrpc_core.serializer.type_registry import TypeRegistry
+
+    @dataclass
+    class Point:
+        x: int
+        y: int
+
+    serializer = MsgpackSerializer()
+    data = serializer.serialize(Point(1, 2))
+    # restored after the test, later tests see the registry unchanged
+    monkeypatch.delitem(TypeRegistry._ids, TypeRegistry.get_type_id(TypeRegistry.get_name(Point)))
+    assert serializer.deserialize(data) == [1, 2]
+
+
+def test_compiled_codecs_round_trip_nested_dataclasses():
+    from dataclasses import dataclass, field
+    from typing import Dict, List, Optional
+    from pyrpc_core_example_common.model import User
+    from pyrpc_core.serializer import CodecCompiler, JsonSerializer
+
+    @dataclass
+    class Group:
+        name: str
+        members: List[User]
+        owner: Optional[User] = None
+        by_name: Dict[str, User] = field(default_factory=dict)
+
+    group = Group(name='core', members=[User(id=1, name='a', age=2)], by_name={'b': User(id=2, name='b', age=3)})
+    assert CodecCompiler.get_encoder(Group) is CodecCompiler.get_encoder(Group)
+
+    serializer = JsonSerializer()
+    assert serializer.deserialize(serializer.serialize(group), Group) == group
+    assert serializer.deserialize(serializer.serialize([group]), List[Group]) == [group]
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+import pytest
+from pyrpc_core.config import RpcConfig, ServerConfig, TransportConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap, AsyncConsumerBootstrap
+
+PORT = 19501
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='streaming-test')
+
+
+@dataclass
+class Row:
+    index: int
+    name: str
+
+
+class RowService:
+    def __init__(self):
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def rows(self, count: int) -> Iterator[Row]:
+        try:
+            for index in range(count):
+                self.produced += 1
+                yield Row(index, f'row-{index}')
+        finally:
+            self.closed.set()
+
+    def failing(self, count: int) -> Iterator[int]:
+        for index in range(count):
+            yield index
+        raise ValueError('broken stream')
+
+    async def countdown(self, start: int) -> AsyncIterator[int]:
+        for value in range(start, 0, -1):
+            await asyncio.sleep(0)
+            yield value
+
+
+def start_provider(mode, **options):
+    service = RowService()
+    provider = ProviderBootstrap(ServerConfig(mode=mode, stream_chunk_size=10, **options))
+    provider.add_service(
+        service_name='rowService',
+        service_instance=service,
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    return provider, service
+
+
+@pytest.fixture(params=['thread', 'asyncio'])
+def provider(request):
+    provider, service = start_provider(request.param)
+    yield service
+    provider.stop()
+
+
+@pytest.fixture(params=[False, True], ids=['pooled', 'multiplexed'])
+def row_service(request, provider):
+    consumer = ConsumerBootstrap(TransportConfig(multiplex=request.param, stream_window=2))
+    consumer.add_service(
+        service_name='rowService',
+        service_class=RowService,
+        registry_config=REGISTRY_CONFIG,
+        rpc_config=RpcConfig(service_name='rowService', serializer_type='json')
+    )
+    consumer.start()
+    yield consumer.get_service('rowService')
+    consumer.stop()
+
+
+def test_stream_items(row_service):
+    rows = list(row_service.rows(95))
+    assert rows == [Row(index, f'row-{index}') for index in range(95)]
+
+
+def test_stream_error_after_items(row_service):
+    received = []
+    with pytest.raises(RuntimeError, match='broken stream'):
+        for value in row_service.failing(25):
+            received.append(value)
+    assert received == list(range(20))
+
+
+def test_credit_bounds_provider(row_service, provider):
+    stream = row_service.rows(10000)
+    assert next(stream) == Row(0, 'row-0')
+    # window of 2 chunks of 10 rows, plus at most one chunk being pulled
+    assert provider.produced <= 40
+    stream.close()
+    assert provider.closed.wait(2)
+    # the connection is still usable afterwards
+    assert len(list(row_service.rows(3))) == 3
+
+
+def test_async_stream(provider):
+    async def body():
+        consumer = AsyncConsumerBootstrap(TransportConfig(stream_window=2))
+        consumer.add_service(
+            service_name='rowService',
+            service_class=RowService,
+            registry_config=REGISTRY_CONFIG
+        )
+        consumer.start()
+        try:
+            row_service = consumer.get_service('rowService')
+            rows = [row async for row in row_service.rows(35)]
+            countdown = [value async for value in row_service.countdown(5)]
+            return rows, countdown
+        finally:
+            consumer.stop()
+
+    rows, countdown = asyncio.run(body())
+    assert rows == [Row(index, f'row-{index}') for index in range(35)]
+    assert countdown == [5, 4, 3, 2, 1]
+
+
+class CollectedRowService:
+    """
+    RowService as seen by a consumer that does not ask for streams
+    """
+
+    def failing(self, count: int) -> list:
+        pass
+
+
+def test_collected_stream_error(provider):
+    consumer = ConsumerBootstrap(TransportConfig(read_timeout=2000))
+    consumer.add_service('rowService', CollectedRowService, registry_config=REGISTRY_CONFIG,
+                         rpc_config=RpcConfig(service_name='rowService', retries=0))
+    consumer.start()
+    try:
+        with pytest.raises(RuntimeError, match='broken stream'):
+            consumer.get_service('rowService').failing(5)
+    finally:
+        consumer.stop()
+
+
+@pytest.mark.parametrize('mode', ['thread', 'asyncio'])
+def test_stalled_consumer_ends_the_stream(mode):
+    provider, service = start_provider(mode, stream_idle_timeout=200)
+    consumer = ConsumerBootstrap(TransportConfig(stream_window=2))
+    consumer.add_service('rowService', RowService, registry_config=REGISTRY_CONFIG)
+    consumer.start()
+    try:
+        stream = consumer.get_service('rowService').rows(10000)
+        assert next(stream) == Row(0, 'row-0')
+        # the provider gives up on a consumer that grants no credit
+        assert service.closed.wait(2)
+        with pytest.raises(RuntimeError, match='No stream credit'):
+            list(stream)
+        assert not provider._streams
+    finally:
+        consumer.stop()
+        provider.stop()
@@ -0,0 +1,78 @@
+import os
+import signal
+import time
+import pytest
+from pyrpc_core.config import ServerConfig
+from pyrpc_core.registry import RegistryConfig
+from pyrpc_core.bootstrap import ProviderBootstrap, ConsumerBootstrap
+from pyrpc_core.bootstrap.worker_supervisor import STATS_INTERVAL
+
+PORT = 19801
+REGISTRY_CONFIG = RegistryConfig(registry_type='memory', address='workers-test')
+
+
+class PidService:
+    def pid(self) -> int:
+        return os.getpid()
+
+
+def call_pid():
+    # a fresh connection each time, so the kernel picks a worker per call
+    consumer = ConsumerBootstrap()
+    consumer.add_service(
+        service_name='pidService',
+        service_class=PidService,
+        registry_config=REGISTRY_CONFIG
+    )
+    consumer.start()
+    try:
+        return consumer.get_service('pidService').pid()
+    finally:
+        consumer.stop()
+
+
+@pytest.fixture(params=['thread', 'asyncio'])
+def provider(request):
+    provider = ProviderBootstrap(ServerConfig(mode=request.param, workers=2, shutdown_grace=1000))
+    provider.add_service(
+        service_name='pidService',
+        service_instance=PidService(),
+        host='127.0.0.1',
+        port=PORT,
+        registry_config=REGISTRY_CONFIG
+    )
+    provider.start()
+    yield provider
+    provider.stop()
+
+
+def worker_pids(provider):
+    return {worker['pid'] for worker in provider.stats()['workers']}
+
+
+def test_workers_share_port(provider):
+    pids = {call_pid() for _ in range(30)}
+    assert pids == worker_pids(provider)
+    assert os.getpid() not in pids
+    time.sleep(STATS_INTERVAL * 1.5)
+    assert provider.stats()['requests'] == 30
+
+
+def test_restart_workers(provider):
+    before = worker_pids(provider)
+    provider.restart_workers()
+    after = worker_pids(provider)
+    assert len(after) == 2 and not before & after
+    assert call_pid() in after
+
+
+def test_crashed_worker_is_replaced(provider):
+    pid = next(iter(worker_pids(provider)))
+    os.kill(pid, signal.SIGKILL)
+    deadline = time.monotonic() + 5
+    while provider.stats()['restarts'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    stats = provider.stats()
+    assert stats['restarts'] == 1
+    assert pid not in worker_pids(provider)
+    assert all(worker['alive'] for worker in stats['workers'])